@@ -0,0 +1,266 @@
+/**
+* This file is part of ORB-SLAM2.
+*
+* Copyright (C) 2014-2016 Raúl Mur-Artal <raulmur at unizar dot es> (University of Zaragoza)
+* For more information see <https://github.com/raulmur/ORB_SLAM2>
+*
+* ORB-SLAM2 is free software: you can redistribute it and/or modify
+* it under the terms of the GNU General Public License as published by
+* the Free Software Foundation, either version 3 of the License, or
+* (at your option) any later version.
+*
+* ORB-SLAM2 is distributed in the hope that it will be useful,
+* but WITHOUT ANY WARRANTY; without even the implied warranty of
+* MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+* GNU General Public License for more details.
+*
+* You should have received a copy of the GNU General Public License
+* along with ORB-SLAM2. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+// ORB extraction micro-benchmark: runs ORBextractor::operator() over frames
+// sampled from a sequence and writes the per-stage, per-pyramid-level wall
+// times of every timed call to a CSV file (aggregated by tools/extractor_bench.py).
+
+
+#include<iostream>
+#include<algorithm>
+#include<fstream>
+#include<sstream>
+#include<iomanip>
+#include<chrono>
+
+#include<opencv2/core/core.hpp>
+#include<opencv2/highgui/highgui.hpp>
+#include<opencv2/imgproc/imgproc.hpp>
+
+#include<ORBextractor.h>
+
+using namespace std;
+
+const char* STAGE_NAMES[ORB_SLAM2::ORBextractor::NUM_STAGES] =
+    {"pyramid", "fast", "distribute", "orientation", "blur", "descriptors"};
+
+void LoadImages(const string &strImagePath, const string &strPathTimes,
+                vector<string> &vstrImages, vector<double> &vTimeStamps);
+
+bool SameExtraction(const vector<cv::KeyPoint> &vKeys1, const cv::Mat &descriptors1,
+                    const vector<cv::KeyPoint> &vKeys2, const cv::Mat &descriptors2);
+
+int main(int argc, char **argv)
+{
+    if(argc < 5 || argc > 8)
+    {
+        cerr << endl << "Usage: ./bench_orb_extractor path_to_settings path_to_image_folder path_to_times_file output_csv [frames] [warmup] [repeats]" << endl;
+        return 1;
+    }
+
+    const int nSampleFrames = argc > 5 ? atoi(argv[5]) : 50;
+    const int nWarmup = argc > 6 ? atoi(argv[6]) : 2;
+    const int nRepeats = argc > 7 ? atoi(argv[7]) : 5;
+    if(nSampleFrames <= 0 || nWarmup < 0 || nRepeats <= 0)
+    {
+        cerr << "ERROR: frames and repeats must be positive, warmup not negative" << endl;
+        return 1;
+    }
+
+    // ORB parameters, read like Tracking does
+    cv::FileStorage fSettings(argv[1], cv::FileStorage::READ);
+    if(!fSettings.isOpened())
+    {
+        cerr << "ERROR: Failed to open settings file at: " << argv[1] << endl;
+        return 1;
+    }
+
+    int nFeatures = fSettings["ORBextractor.nFeatures"];
+    float fScaleFactor = fSettings["ORBextractor.scaleFactor"];
+    int nLevels = fSettings["ORBextractor.nLevels"];
+    int fIniThFAST = fSettings["ORBextractor.iniThFAST"];
+    int fMinThFAST = fSettings["ORBextractor.minThFAST"];
+    int nRGB = fSettings["Camera.RGB"];
+
+    int nExtractorThreads = 1;
+    cv::FileNode nodeExtractorThreads = fSettings["ORBextractor.nThreads"];
+    if(!nodeExtractorThreads.empty())
+        nExtractorThreads = (int)nodeExtractorThreads;
+
+    cout << endl  << "ORB Extractor Parameters: " << endl;
+    cout << "- Number of Features: " << nFeatures << endl;
+    cout << "- Scale Levels: " << nLevels << endl;
+    cout << "- Scale Factor: " << fScaleFactor << endl;
+    cout << "- Initial Fast Threshold: " << fIniThFAST << endl;
+    cout << "- Minimum Fast Threshold: " << fMinThFAST << endl;
+    cout << "- Extraction Threads: " << nExtractorThreads << endl;
+
+    // Retrieve paths to images
+    vector<string> vstrImageFilenames;
+    vector<double> vTimestamps;
+    LoadImages(string(argv[2]), string(argv[3]), vstrImageFilenames, vTimestamps);
+
+    int nImages = vstrImageFilenames.size();
+
+    if(nImages<=0)
+    {
+        cerr << "ERROR: Failed to load images" << endl;
+        return 1;
+    }
+
+    // Frames evenly spread over the sequence, loaded up front so disk reads are not timed
+    const int nFrames = min(nSampleFrames, nImages);
+    vector<int> vFrameIndices(nFrames);
+    vector<cv::Mat> vImages(nFrames);
+    for(int i=0; i<nFrames; i++)
+    {
+        vFrameIndices[i] = (int)((long)i*nImages/nFrames);
+        cv::Mat im = cv::imread(vstrImageFilenames[vFrameIndices[i]],CV_LOAD_IMAGE_UNCHANGED);
+        if(im.empty())
+        {
+            cerr << endl << "Failed to load image at: " << vstrImageFilenames[vFrameIndices[i]] << endl;
+            return 1;
+        }
+
+        // Same conversion as Tracking::GrabImageMonocular
+        if(im.channels()==3)
+            cvtColor(im,im,nRGB ? CV_RGB2GRAY : CV_BGR2GRAY);
+        else if(im.channels()==4)
+            cvtColor(im,im,nRGB ? CV_RGBA2GRAY : CV_BGRA2GRAY);
+        vImages[i] = im;
+    }
+
+    ofstream f(argv[4]);
+    if(!f.is_open())
+    {
+        cerr << "ERROR: Failed to open output file at: " << argv[4] << endl;
+        return 1;
+    }
+    f << "frame,repeat,level,keypoints,total_ms";
+    for(int s=0; s<ORB_SLAM2::ORBextractor::NUM_STAGES; s++)
+        f << "," << STAGE_NAMES[s] << "_ms";
+    f << endl;
+    f << fixed << setprecision(4);
+
+    ORB_SLAM2::ORBextractor extractor(nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST,nExtractorThreads);
+
+    cout << endl << "-------" << endl;
+    cout << "Start benchmark ..." << endl;
+    cout << "Frames: " << nFrames << ", warm-up calls: " << nWarmup << ", timed calls: " << nRepeats << endl << endl;
+
+    vector<cv::KeyPoint> vKeys;
+    cv::Mat descriptors;
+    vector<double> vTotalTimes;
+    vTotalTimes.reserve(nFrames*nRepeats);
+
+    // The parallel mode must reproduce the sequential extraction exactly
+    ORB_SLAM2::ORBextractor sequentialExtractor(nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST);
+    vector<cv::KeyPoint> vSequentialKeys;
+    cv::Mat sequentialDescriptors;
+
+    for(int i=0; i<nFrames; i++)
+    {
+        for(int w=0; w<nWarmup; w++)
+            extractor(vImages[i],cv::Mat(),vKeys,descriptors);
+
+        if(nExtractorThreads>1)
+        {
+            extractor(vImages[i],cv::Mat(),vKeys,descriptors);
+            sequentialExtractor(vImages[i],cv::Mat(),vSequentialKeys,sequentialDescriptors);
+            if(!SameExtraction(vKeys,descriptors,vSequentialKeys,sequentialDescriptors))
+            {
+                cerr << "ERROR: parallel extraction differs from the sequential one on frame " << vFrameIndices[i] << endl;
+                return 1;
+            }
+        }
+
+        for(int r=0; r<nRepeats; r++)
+        {
+#ifdef COMPILEDWITHC11
+            std::chrono::steady_clock::time_point t1 = std::chrono::steady_clock::now();
+#else
+            std::chrono::monotonic_clock::time_point t1 = std::chrono::monotonic_clock::now();
+#endif
+
+            extractor(vImages[i],cv::Mat(),vKeys,descriptors);
+
+#ifdef COMPILEDWITHC11
+            std::chrono::steady_clock::time_point t2 = std::chrono::steady_clock::now();
+#else
+            std::chrono::monotonic_clock::time_point t2 = std::chrono::monotonic_clock::now();
+#endif
+
+            double ttotal = std::chrono::duration_cast<std::chrono::duration<double> >(t2 - t1).count()*1e3;
+            vTotalTimes.push_back(ttotal);
+
+            vector<int> vKeysPerLevel(nLevels,0);
+            for(size_t k=0; k<vKeys.size(); k++)
+                vKeysPerLevel[vKeys[k].octave]++;
+
+            const vector<vector<double> > &vvStageTimes = extractor.GetStageTimes();
+            for(int level=0; level<nLevels; level++)
+            {
+                f << vFrameIndices[i] << "," << r << "," << level << "," << vKeysPerLevel[level] << "," << ttotal;
+                for(int s=0; s<ORB_SLAM2::ORBextractor::NUM_STAGES; s++)
+                    f << "," << vvStageTimes[s][level];
+                f << endl;
+            }
+        }
+    }
+
+    f.close();
+
+    // Extraction time statistics
+    sort(vTotalTimes.begin(),vTotalTimes.end());
+    double totaltime = 0;
+    for(size_t i=0; i<vTotalTimes.size(); i++)
+        totaltime+=vTotalTimes[i];
+
+    cout << "-------" << endl << endl;
+    cout << "median extraction time: " << vTotalTimes[vTotalTimes.size()/2] << " ms" << endl;
+    cout << "mean extraction time: " << totaltime/vTotalTimes.size() << " ms" << endl;
+    if(nExtractorThreads>1)
+        cout << "parallel extraction identical to the sequential one on all frames" << endl;
+    cout << endl << "Stage timings saved to " << argv[4] << endl;
+
+    return 0;
+}
+
+void LoadImages(const string &strImagePath, const string &strPathTimes,
+                vector<string> &vstrImages, vector<double> &vTimeStamps)
+{
+    ifstream fTimes;
+    fTimes.open(strPathTimes.c_str());
+    vTimeStamps.reserve(5000);
+    vstrImages.reserve(5000);
+    while(!fTimes.eof())
+    {
+        string s;
+        getline(fTimes,s);
+        if(!s.empty())
+        {
+            stringstream ss;
+            ss << s;
+            vstrImages.push_back(strImagePath + "/" + ss.str() + ".png");
+            double t;
+            ss >> t;
+            vTimeStamps.push_back(t/1e9);
+
+        }
+    }
+}
+
+bool SameExtraction(const vector<cv::KeyPoint> &vKeys1, const cv::Mat &descriptors1,
+                    const vector<cv::KeyPoint> &vKeys2, const cv::Mat &descriptors2)
+{
+    if(vKeys1.size()!=vKeys2.size() || descriptors1.size()!=descriptors2.size())
+        return false;
+
+    for(size_t i=0; i<vKeys1.size(); i++)
+    {
+        const cv::KeyPoint &kp1 = vKeys1[i];
+        const cv::KeyPoint &kp2 = vKeys2[i];
+        if(kp1.pt!=kp2.pt || kp1.octave!=kp2.octave || kp1.angle!=kp2.angle ||
+           kp1.response!=kp2.response || kp1.size!=kp2.size)
+            return false;
+    }
+
+    return descriptors1.empty() || cv::countNonZero(descriptors1!=descriptors2)==0;
+}
@@ -23,6 +23,7 @@
 #include<algorithm>
 #include<fstream>
 #include<chrono>
+#include<cstdlib>
 
 #include<opencv2/core/core.hpp>
 
@@ -35,9 +36,9 @@ void LoadImages(const string &strImagePath, const string &strPathTimes,
 
 int main(int argc, char **argv)
 {
-    if(argc != 5 && argc != 6)
+    if(argc < 5 || argc > 7)
     {
-        cerr << endl << "Usage: ./mono_tum path_to_vocabulary path_to_settings path_to_image_folder path_to_times_file [output_dir]" << endl;
+        cerr << endl << "Usage: ./mono_tum path_to_vocabulary path_to_settings path_to_image_folder path_to_times_file [output_dir] [frame_trajectory_file]" << endl;
         return 1;
     }
 
@@ -57,10 +58,16 @@ int main(int argc, char **argv)
     // Create SLAM system. It initializes all system threads and gets ready to process frames.
     ORB_SLAM2::System SLAM(argv[1],argv[2],ORB_SLAM2::System::MONOCULAR,true);
 
-    // Set output directory for failure videos if provided
-    if(argc == 6)
+    // Set output directory for failure videos and per-frame tracking states if provided
+    if(argc >= 6)
     {
         SLAM.SetFailureVideoOutputDir(string(argv[5]));
+        SLAM.SetTrackingStateFile(string(argv[5]) + "/tracking_states.bin");
+
+        // Thread timeline of the run (all_result/pipeline_trace.py), only when ORBSLAM_TRACE=1
+        const char* trace = getenv("ORBSLAM_TRACE");
+        if(trace && string(trace)=="1")
+            SLAM.SetTraceFile(string(argv[5]) + "/trace.json");
     }
 
     // Vector for tracking time statistics
@@ -71,6 +78,12 @@ int main(int argc, char **argv)
     cout << "Start processing sequence ..." << endl;
     cout << "Images in the sequence: " << nImages << endl << endl;
 
+#ifdef COMPILEDWITHC11
+    std::chrono::steady_clock::time_point tStart = std::chrono::steady_clock::now();
+#else
+    std::chrono::monotonic_clock::time_point tStart = std::chrono::monotonic_clock::now();
+#endif
+
     // Main loop
     cv::Mat im;
     for(int ni=0; ni<nImages; ni++)
@@ -116,6 +129,14 @@ int main(int argc, char **argv)
             usleep((T-ttrack)*1e6);
     }
 
+#ifdef COMPILEDWITHC11
+    std::chrono::steady_clock::time_point tEnd = std::chrono::steady_clock::now();
+#else
+    std::chrono::monotonic_clock::time_point tEnd = std::chrono::monotonic_clock::now();
+#endif
+
+    double walltime = std::chrono::duration_cast<std::chrono::duration<double> >(tEnd - tStart).count();
+
     // Stop all threads
     SLAM.Shutdown();
 
@@ -129,10 +150,19 @@ int main(int argc, char **argv)
     cout << "-------" << endl << endl;
     cout << "median tracking time: " << vTimesTrack[nImages/2] << endl;
     cout << "mean tracking time: " << totaltime/nImages << endl;
+    cout << "p99 tracking time: " << vTimesTrack[min(nImages-1,(nImages*99)/100)] << endl;
+    cout << "total wall time: " << walltime << endl;
+    cout << "effective fps: " << nImages/walltime << endl;
 
     // Save camera trajectory
     SLAM.SaveKeyFrameTrajectoryTUM("KeyFrameTrajectory.txt");
 
+    // Save one pose per tracked frame if requested
+    if(argc == 7)
+    {
+        SLAM.SaveTrajectoryTUM(string(argv[6]));
+    }
+
     return 0;
 }
 
@@ -3,6 +3,8 @@
  * Added functions: Save and Load from text files without using cv::FileStorage.
  * Date: August 2015
  * Raúl Mur-Artal
+ *
+ * Added functions: Save and Load from a compact memory-mapped binary file.
  */
 
 /**
@@ -26,6 +28,13 @@
 #include <algorithm>
 #include <opencv2/core/core.hpp>
 #include <limits>
+#include <cstring>
+#include <stdint.h>
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
 
 #include "FeatureVector.h"
 #include "BowVector.h"
@@ -246,6 +255,19 @@ public:
    */
   void saveToTextFile(const std::string &filename) const;  
 
+  /**
+   * Loads the vocabulary from a binary file written by saveToBinaryFile
+   * (or by tools/orbvoc_convert.py). The file is memory-mapped.
+   * @param filename
+   */
+  bool loadFromBinaryFile(const std::string &filename);
+
+  /**
+   * Saves the vocabulary into a binary file
+   * @param filename
+   */
+  void saveToBinaryFile(const std::string &filename) const;
+
   /**
    * Saves the vocabulary into a file
    * @param filename
@@ -1379,6 +1401,8 @@ bool TemplatedVocabulary<TDescriptor,F>::loadFromTextFile(const std::string &fil
     {
         string snode;
         getline(f,snode);
+        if(snode.empty())
+            continue;
         stringstream ssnode;
         ssnode << snode;
 
@@ -1450,6 +1474,158 @@ void TemplatedVocabulary<TDescriptor,F>::saveToTextFile(const std::string &filen
 
 // --------------------------------------------------------------------------
 
+// Binary vocabulary layout (little endian):
+//   header: char magic[8] = "ORBVBIN1", int32 k, int32 L, int32 scoring,
+//           int32 weighting, uint32 number of nodes (root excluded),
+//           uint32 descriptor length in bytes
+//   nodes:  uint32 parent, uint8 is_leaf, uint8 descriptor[length], float64 weight
+// Nodes are stored in the same order as in the text file.
+
+static const char BINARY_VOCABULARY_MAGIC[8] = {'O','R','B','V','B','I','N','1'};
+static const size_t BINARY_VOCABULARY_HEADER_SIZE = 8 + 6*sizeof(int32_t);
+
+template<class TDescriptor, class F>
+bool TemplatedVocabulary<TDescriptor,F>::loadFromBinaryFile(const std::string &filename)
+{
+    int fd = open(filename.c_str(), O_RDONLY);
+    if(fd < 0)
+        return false;
+
+    struct stat st;
+    if(fstat(fd, &st) != 0 || (size_t)st.st_size < BINARY_VOCABULARY_HEADER_SIZE)
+    {
+        close(fd);
+        return false;
+    }
+
+    const size_t fileSize = st.st_size;
+    void *pMap = mmap(NULL, fileSize, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if(pMap == MAP_FAILED)
+        return false;
+    madvise(pMap, fileSize, MADV_SEQUENTIAL);
+
+    const unsigned char *p = static_cast<const unsigned char*>(pMap);
+
+    int32_t header[4];
+    uint32_t nNodes, nDescBytes;
+    bool bOk = memcmp(p, BINARY_VOCABULARY_MAGIC, 8) == 0;
+    if(bOk)
+    {
+        memcpy(header, p + 8, sizeof(header));
+        memcpy(&nNodes, p + 8 + sizeof(header), sizeof(uint32_t));
+        memcpy(&nDescBytes, p + 8 + sizeof(header) + sizeof(uint32_t), sizeof(uint32_t));
+
+        const size_t recordSize = sizeof(uint32_t) + 1 + nDescBytes + sizeof(double);
+        bOk = header[0]>=0 && header[0]<=20 && header[1]>=1 && header[1]<=10 &&
+              header[2]>=0 && header[2]<=5 && header[3]>=0 && header[3]<=3 &&
+              nDescBytes == (uint32_t)F::L &&
+              fileSize == BINARY_VOCABULARY_HEADER_SIZE + (size_t)nNodes*recordSize;
+    }
+
+    if(!bOk)
+    {
+        std::cerr << "Vocabulary loading failure: This is not a correct binary file!" << endl;
+        munmap(pMap, fileSize);
+        return false;
+    }
+
+    m_k = header[0];
+    m_L = header[1];
+    m_scoring = (ScoringType)header[2];
+    m_weighting = (WeightingType)header[3];
+    createScoringObject();
+
+    m_words.clear();
+    m_nodes.clear();
+
+    // Node count is known in advance, so word pointers into m_nodes stay valid
+    m_nodes.resize(nNodes+1);
+    m_nodes[0].id = 0;
+    m_words.reserve(nNodes);
+
+    const unsigned char *pRecord = p + BINARY_VOCABULARY_HEADER_SIZE;
+    for(unsigned int nid=1; nid<=nNodes; nid++)
+    {
+        Node &node = m_nodes[nid];
+        node.id = nid;
+
+        uint32_t pid;
+        memcpy(&pid, pRecord, sizeof(uint32_t));
+        pRecord += sizeof(uint32_t);
+        if(pid >= nid)
+        {
+            std::cerr << "Vocabulary loading failure: Corrupted binary file!" << endl;
+            m_nodes.clear();
+            m_words.clear();
+            munmap(pMap, fileSize);
+            return false;
+        }
+        node.parent = pid;
+        m_nodes[pid].children.push_back(nid);
+
+        const bool bIsLeaf = *pRecord > 0;
+        pRecord += 1;
+
+        node.descriptor.create(1, F::L, CV_8U);
+        memcpy(node.descriptor.data, pRecord, nDescBytes);
+        pRecord += nDescBytes;
+
+        double weight;
+        memcpy(&weight, pRecord, sizeof(double));
+        pRecord += sizeof(double);
+        node.weight = weight;
+
+        if(bIsLeaf)
+        {
+            node.word_id = m_words.size();
+            m_words.push_back(&node);
+        }
+        else
+        {
+            node.children.reserve(m_k);
+        }
+    }
+
+    munmap(pMap, fileSize);
+    return true;
+}
+
+// --------------------------------------------------------------------------
+
+template<class TDescriptor, class F>
+void TemplatedVocabulary<TDescriptor,F>::saveToBinaryFile(const std::string &filename) const
+{
+    ofstream f;
+    f.open(filename.c_str(), ios_base::out | ios_base::binary);
+
+    const int32_t header[4] = {m_k, m_L, (int32_t)m_scoring, (int32_t)m_weighting};
+    const uint32_t nNodes = m_nodes.empty() ? 0 : m_nodes.size()-1;
+    const uint32_t nDescBytes = F::L;
+    f.write(BINARY_VOCABULARY_MAGIC, 8);
+    f.write(reinterpret_cast<const char*>(header), sizeof(header));
+    f.write(reinterpret_cast<const char*>(&nNodes), sizeof(uint32_t));
+    f.write(reinterpret_cast<const char*>(&nDescBytes), sizeof(uint32_t));
+
+    for(size_t i=1; i<m_nodes.size(); i++)
+    {
+        const Node& node = m_nodes[i];
+
+        const uint32_t pid = node.parent;
+        const unsigned char bIsLeaf = node.isLeaf() ? 1 : 0;
+        const double weight = node.weight;
+
+        f.write(reinterpret_cast<const char*>(&pid), sizeof(uint32_t));
+        f.write(reinterpret_cast<const char*>(&bIsLeaf), 1);
+        f.write(reinterpret_cast<const char*>(node.descriptor.data), nDescBytes);
+        f.write(reinterpret_cast<const char*>(&weight), sizeof(double));
+    }
+
+    f.close();
+}
+
+// --------------------------------------------------------------------------
+
 template<class TDescriptor, class F>
 void TemplatedVocabulary<TDescriptor,F>::save(const std::string &filename) const
 {
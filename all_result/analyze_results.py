@@ -11,6 +11,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 
+from results_table import (build_table, collect_campaign, group_mean, improvement_percent, match,
+                           percent_change, sequence_keys, write_csv)
+
 # Configuration
 BASELINE_DIR = Path("baseline_output")
 REFINE_DIR = Path("refine_output")
@@ -19,6 +22,15 @@ OUTPUT_DIR = Path("analysis_output")
 # Metrics to extract
 METRICS = ['max', 'mean', 'median', 'min', 'rmse', 'sse', 'std']
 
+# Runtime statistics printed by mono_euroc at the end of a run (seconds, fps)
+RUNTIME_PATTERNS = {
+    'median_time': r'^median tracking time: ([\d.eE+-]+)',
+    'mean_time': r'^mean tracking time: ([\d.eE+-]+)',
+    'p99_time': r'^p99 tracking time: ([\d.eE+-]+)',
+    'wall_time': r'^total wall time: ([\d.eE+-]+)',
+    'fps': r'^effective fps: ([\d.eE+-]+)',
+}
+
 def extract_metrics_from_file(filepath):
     """Extract APE metrics from evo_statistics.txt file"""
     with open(filepath, 'r') as f:
@@ -58,60 +70,47 @@ def extract_metrics_from_file(filepath):
         'metrics': metrics
     }
 
-def collect_all_results():
-    """Collect results from baseline and refine directories"""
-    baseline_results = []
-    refine_results = []
+def extract_runtime_from_log(filepath):
+    """Extract tracking time and throughput statistics from orbslam.log"""
+    with open(filepath, 'r', errors='replace') as f:
+        content = f.read()
 
-    # Collect baseline results
-    for stats_file in BASELINE_DIR.glob('**/evo_statistics.txt'):
-        data = extract_metrics_from_file(stats_file)
-        data['method'] = 'Baseline'
-        baseline_results.append(data)
+    runtime = {}
+    for name, pattern in RUNTIME_PATTERNS.items():
+        match = re.search(pattern, content, re.MULTILINE)
+        if match:
+            runtime[name] = float(match.group(1))
 
-    # Collect refine results
-    for stats_file in REFINE_DIR.glob('**/evo_statistics.txt'):
-        data = extract_metrics_from_file(stats_file)
-        data['method'] = 'Refined'
-        refine_results.append(data)
+    return runtime
 
+def collect_all_results():
+    """Collect results from baseline and refine directories"""
+    baseline_results = collect_campaign(BASELINE_DIR, 'Baseline')
+    refine_results = collect_campaign(REFINE_DIR, 'Refined')
     return baseline_results, refine_results
 
-def match_sequences(baseline_results, refine_results):
-    """Match baseline and refine results by sequence"""
-    matched = []
-
-    for baseline in baseline_results:
-        seq_key = f"{baseline['difficulty']}_{baseline['sequence']}"
-        for refine in refine_results:
-            refine_key = f"{refine['difficulty']}_{refine['sequence']}"
-            if seq_key == refine_key:
-                matched.append({
-                    'sequence': seq_key,
-                    'difficulty': baseline['difficulty'],
-                    'baseline': baseline,
-                    'refined': refine
-                })
-                break
-
-    return matched
-
-def create_comparison_plots(matched_results):
+def match_sequences(table):
+    """Baseline and refined rows of the sequences both campaigns ran, in baseline order"""
+    baseline_rows, refined_rows = match(table, 'Baseline', 'Refined')
+    return table[baseline_rows], table[refined_rows]
+
+def metric_values(rows, metric):
+    """APE metric column of rows, 0 where the metric was not reported"""
+    return np.nan_to_num(rows[metric])
+
+def create_comparison_plots(baseline, refined):
     """Create comparison plots for baseline vs refined"""
     OUTPUT_DIR.mkdir(exist_ok=True)
 
     # Extract data for plotting
-    sequences = [m['sequence'] for m in matched_results]
-    difficulties = [m['difficulty'] for m in matched_results]
+    sequences = sequence_keys(baseline['difficulty'], baseline['sequence'])
+    difficulties = baseline['difficulty']
 
-    baseline_rmse = [m['baseline']['metrics'].get('rmse', 0) for m in matched_results]
-    refined_rmse = [m['refined']['metrics'].get('rmse', 0) for m in matched_results]
+    baseline_rmse = metric_values(baseline, 'rmse')
+    refined_rmse = metric_values(refined, 'rmse')
 
-    baseline_mean = [m['baseline']['metrics'].get('mean', 0) for m in matched_results]
-    refined_mean = [m['refined']['metrics'].get('mean', 0) for m in matched_results]
-
-    baseline_max = [m['baseline']['metrics'].get('max', 0) for m in matched_results]
-    refined_max = [m['refined']['metrics'].get('max', 0) for m in matched_results]
+    baseline_mean = metric_values(baseline, 'mean')
+    refined_mean = metric_values(refined, 'mean')
 
     # Color mapping by difficulty
     colors = {'easy': '#2ecc71', 'medium': '#f39c12', 'hard': '#e74c3c'}
@@ -156,13 +155,7 @@ def create_comparison_plots(matched_results):
     plt.close()
 
     # 3. Improvement Percentage
-    improvements = []
-    for i in range(len(matched_results)):
-        if baseline_rmse[i] > 0:
-            improvement = ((baseline_rmse[i] - refined_rmse[i]) / baseline_rmse[i]) * 100
-            improvements.append(improvement)
-        else:
-            improvements.append(0)
+    improvements = np.nan_to_num(improvement_percent(baseline_rmse, refined_rmse))
 
     fig, ax = plt.subplots(figsize=(14, 6))
     bars = ax.bar(x, improvements, color=bar_colors, alpha=0.8)
@@ -202,11 +195,8 @@ def create_comparison_plots(matched_results):
     for idx, (metric, label) in enumerate(metrics_to_plot):
         ax = axes[idx // 2, idx % 2]
 
-        baseline_vals = [m['baseline']['metrics'].get(metric, 0) for m in matched_results]
-        refined_vals = [m['refined']['metrics'].get(metric, 0) for m in matched_results]
-
-        ax.bar(x - width/2, baseline_vals, width, label='Baseline', alpha=0.8, color='#3498db')
-        ax.bar(x + width/2, refined_vals, width, label='Refined', alpha=0.8, color='#e74c3c')
+        ax.bar(x - width/2, metric_values(baseline, metric), width, label='Baseline', alpha=0.8, color='#3498db')
+        ax.bar(x + width/2, metric_values(refined, metric), width, label='Refined', alpha=0.8, color='#e74c3c')
 
         ax.set_xlabel('Sequence', fontsize=10, fontweight='bold')
         ax.set_ylabel(f'{label} (meters)', fontsize=10, fontweight='bold')
@@ -221,28 +211,19 @@ def create_comparison_plots(matched_results):
     plt.close()
 
     # 5. Grouped by Difficulty
-    difficulties_unique = sorted(set(difficulties))
-
     fig, axes = plt.subplots(1, 3, figsize=(18, 5))
 
     for idx, diff in enumerate(['easy', 'medium', 'hard']):
         ax = axes[idx]
 
         # Filter by difficulty
-        diff_sequences = []
-        diff_baseline = []
-        diff_refined = []
-
-        for i, m in enumerate(matched_results):
-            if m['difficulty'] == diff:
-                diff_sequences.append(m['sequence'].replace(f'{diff}_', ''))
-                diff_baseline.append(baseline_rmse[i])
-                diff_refined.append(refined_rmse[i])
+        in_diff = difficulties == diff
+        diff_sequences = baseline['sequence'][in_diff]
 
-        if diff_sequences:
+        if len(diff_sequences):
             x_diff = np.arange(len(diff_sequences))
-            ax.bar(x_diff - width/2, diff_baseline, width, label='Baseline', alpha=0.8, color='#3498db')
-            ax.bar(x_diff + width/2, diff_refined, width, label='Refined', alpha=0.8, color='#e74c3c')
+            ax.bar(x_diff - width/2, baseline_rmse[in_diff], width, label='Baseline', alpha=0.8, color='#3498db')
+            ax.bar(x_diff + width/2, refined_rmse[in_diff], width, label='Refined', alpha=0.8, color='#e74c3c')
 
             ax.set_xlabel('Sequence', fontsize=11, fontweight='bold')
             ax.set_ylabel('RMSE (meters)', fontsize=11, fontweight='bold')
@@ -258,55 +239,46 @@ def create_comparison_plots(matched_results):
 
     print(f"✓ Generated 5 comparison plots in {OUTPUT_DIR}/")
 
-def generate_summary_statistics(matched_results, baseline_results, refine_results):
+def generate_summary_statistics(table, baseline, refined):
     """Generate summary statistics"""
+    methods = table['method']
     stats = {
-        'matched_sequences': len(matched_results),
-        'baseline_only': len(baseline_results) - len(matched_results),
-        'refined_only': len(refine_results) - len(matched_results),
+        'matched_sequences': len(baseline),
+        'baseline_only': np.count_nonzero(methods == 'Baseline') - len(baseline),
+        'refined_only': np.count_nonzero(methods == 'Refined') - len(refined),
         'by_difficulty': {},
         'improvements': {}
     }
 
+    baseline_rmse = metric_values(baseline, 'rmse')
+    refined_rmse = metric_values(refined, 'rmse')
+    improvements = np.nan_to_num(improvement_percent(baseline_rmse, refined_rmse))
+
     # Group by difficulty
-    for diff in ['easy', 'medium', 'hard']:
-        diff_matches = [m for m in matched_results if m['difficulty'] == diff]
-
-        if diff_matches:
-            baseline_rmse_vals = [m['baseline']['metrics'].get('rmse', 0) for m in diff_matches]
-            refined_rmse_vals = [m['refined']['metrics'].get('rmse', 0) for m in diff_matches]
-
-            stats['by_difficulty'][diff] = {
-                'count': len(diff_matches),
-                'baseline_rmse_avg': np.mean(baseline_rmse_vals),
-                'refined_rmse_avg': np.mean(refined_rmse_vals),
-                'improvement_avg': np.mean([
-                    ((b - r) / b * 100) if b > 0 else 0
-                    for b, r in zip(baseline_rmse_vals, refined_rmse_vals)
-                ])
-            }
+    labels, counts, (baseline_avg, refined_avg, improvement_avg) = group_mean(
+        baseline['difficulty'], baseline_rmse, refined_rmse, improvements)
+    for i, diff in enumerate(labels):
+        stats['by_difficulty'][diff] = {
+            'count': int(counts[i]),
+            'baseline_rmse_avg': baseline_avg[i],
+            'refined_rmse_avg': refined_avg[i],
+            'improvement_avg': improvement_avg[i]
+        }
 
     # Overall improvements
-    all_baseline_rmse = [m['baseline']['metrics'].get('rmse', 0) for m in matched_results]
-    all_refined_rmse = [m['refined']['metrics'].get('rmse', 0) for m in matched_results]
-
-    stats['improvements']['overall_avg'] = np.mean([
-        ((b - r) / b * 100) if b > 0 else 0
-        for b, r in zip(all_baseline_rmse, all_refined_rmse)
-    ])
-    stats['improvements']['best'] = max([
-        ((b - r) / b * 100) if b > 0 else 0
-        for b, r in zip(all_baseline_rmse, all_refined_rmse)
-    ])
-    stats['improvements']['worst'] = min([
-        ((b - r) / b * 100) if b > 0 else 0
-        for b, r in zip(all_baseline_rmse, all_refined_rmse)
-    ])
+    stats['improvements']['overall_avg'] = improvements.mean()
+    stats['improvements']['best'] = improvements.max()
+    stats['improvements']['worst'] = improvements.min()
 
     return stats
 
-def create_markdown_report(matched_results, baseline_results, refine_results, stats):
+def create_markdown_report(baseline, refined, baseline_results, refine_results, stats):
     """Create comprehensive markdown analysis report"""
+    sequences = sequence_keys(baseline['difficulty'], baseline['sequence'])
+    order = np.lexsort((sequences, baseline['difficulty']))
+    baseline_rmse = metric_values(baseline, 'rmse')
+    refined_rmse = metric_values(refined, 'rmse')
+    improvements = np.nan_to_num(improvement_percent(baseline_rmse, refined_rmse))
 
     report = f"""# ORB-SLAM2 INTR6000P Evaluation Analysis Report
 
@@ -360,16 +332,11 @@ The INTR6000P dataset consists of sequences with varying difficulty levels:
 |----------|------------|-------|---------------|--------------|-------------|--------------|
 """
 
-    for m in sorted(matched_results, key=lambda x: (x['difficulty'], x['sequence'])):
-        seq = m['sequence']
-        diff = m['difficulty'].capitalize()
-        poses = m['baseline']['num_poses']
-        b_rmse = m['baseline']['metrics'].get('rmse', 0)
-        r_rmse = m['refined']['metrics'].get('rmse', 0)
-        improvement = ((b_rmse - r_rmse) / b_rmse * 100) if b_rmse > 0 else 0
-        scale = m['baseline'].get('scale', 0)
-
-        report += f"| {seq} | {diff} | {poses} | {b_rmse:.4f} | {r_rmse:.4f} | {improvement:+.2f}% | {scale:.2f} |\n"
+    for i in order:
+        seq = sequences[i]
+        diff = baseline['difficulty'][i].capitalize()
+        report += (f"| {seq} | {diff} | {baseline['num_poses'][i]} | {baseline_rmse[i]:.4f} | "
+                   f"{refined_rmse[i]:.4f} | {improvements[i]:+.2f}% | {baseline['scale'][i]:.2f} |\n")
 
     report += """
 ---
@@ -422,19 +389,22 @@ All metrics are in meters and computed after Sim(3) Umeyama alignment (includes
 """
 
     # Add detailed analysis for each sequence
-    for m in sorted(matched_results, key=lambda x: (x['difficulty'], x['sequence'])):
-        seq = m['sequence']
-        diff = m['difficulty'].capitalize()
+    detail_metrics = ['rmse', 'mean', 'median', 'max', 'std']
+    changes = {metric: (metric_values(baseline, metric), metric_values(refined, metric),
+                        np.nan_to_num(percent_change(metric_values(baseline, metric),
+                                                     metric_values(refined, metric))))
+               for metric in detail_metrics}
 
-        b = m['baseline']['metrics']
-        r = m['refined']['metrics']
+    for i in order:
+        seq = sequences[i]
+        diff = baseline['difficulty'][i].capitalize()
 
         report += f"""### {seq} ({diff})
 
 **Tracking Quality:**
-- Baseline: {m['baseline']['num_poses']} poses tracked
-- Refined: {m['refined']['num_poses']} poses tracked
-- Scale Correction: {m['baseline'].get('scale', 0):.3f}x
+- Baseline: {baseline['num_poses'][i]} poses tracked
+- Refined: {refined['num_poses'][i]} poses tracked
+- Scale Correction: {baseline['scale'][i]:.3f}x
 
 **Performance Metrics:**
 
@@ -442,11 +412,10 @@ All metrics are in meters and computed after Sim(3) Umeyama alignment (includes
 |--------|----------|---------|--------|----------|
 """
 
-        for metric in ['rmse', 'mean', 'median', 'max', 'std']:
-            b_val = b.get(metric, 0)
-            r_val = r.get(metric, 0)
+        for metric in detail_metrics:
+            b_vals, r_vals, change_pcts = changes[metric]
+            b_val, r_val, change_pct = b_vals[i], r_vals[i], change_pcts[i]
             change = r_val - b_val
-            change_pct = (change / b_val * 100) if b_val > 0 else 0
 
             report += f"| {metric.upper()} | {b_val:.4f} | {r_val:.4f} | {change:+.4f} | {change_pct:+.2f}% |\n"
 
@@ -461,14 +430,8 @@ All metrics are in meters and computed after Sim(3) Umeyama alignment (includes
 """
 
     # Calculate winners and losers
-    improvements = []
-    for m in matched_results:
-        b_rmse = m['baseline']['metrics'].get('rmse', 0)
-        r_rmse = m['refined']['metrics'].get('rmse', 0)
-        imp = ((b_rmse - r_rmse) / b_rmse * 100) if b_rmse > 0 else 0
-        improvements.append((m['sequence'], imp))
-
-    improvements_sorted = sorted(improvements, key=lambda x: x[1], reverse=True)
+    ranking = np.argsort(-improvements, kind='stable')
+    improvements_sorted = list(zip(sequences[ranking], improvements[ranking]))
 
     report += f"""
 **Best Performing Sequences (Refined > Baseline):**
@@ -512,7 +475,7 @@ All metrics are in meters and computed after Sim(3) Umeyama alignment (includes
         report += f"""
 #### {result['sequence']} ({result['difficulty']})
 ```json
-{json.dumps(result, indent=2)}
+{json.dumps(result, indent=2, default=str)}
 ```
 """
 
@@ -527,7 +490,7 @@ All metrics are in meters and computed after Sim(3) Umeyama alignment (includes
         report += f"""
 #### {result['sequence']} ({result['difficulty']})
 ```json
-{json.dumps(result, indent=2)}
+{json.dumps(result, indent=2, default=str)}
 ```
 """
 
@@ -559,18 +522,21 @@ def main():
 
     # Match sequences
     print("\n[2/4] Matching baseline and refined sequences...")
-    matched_results = match_sequences(baseline_results, refine_results)
-    print(f"  - Matched {len(matched_results)} sequence pairs")
+    table = build_table(baseline_results + refine_results)
+    baseline, refined = match_sequences(table)
+    print(f"  - Matched {len(baseline)} sequence pairs")
 
     # Generate statistics
     print("\n[3/4] Computing summary statistics...")
-    stats = generate_summary_statistics(matched_results, baseline_results, refine_results)
+    stats = generate_summary_statistics(table, baseline, refined)
     print(f"  - Overall improvement: {stats['improvements']['overall_avg']:.2f}%")
 
     # Create visualizations
     print("\n[4/4] Generating visualizations and report...")
-    create_comparison_plots(matched_results)
-    create_markdown_report(matched_results, baseline_results, refine_results, stats)
+    create_comparison_plots(baseline, refined)
+    create_markdown_report(baseline, refined, baseline_results, refine_results, stats)
+    write_csv(table, OUTPUT_DIR / 'results_table.csv')
+    print(f"✓ Exported results table: {OUTPUT_DIR / 'results_table.csv'}")
 
     print("\n" + "=" * 60)
     print("Analysis complete!")
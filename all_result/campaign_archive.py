@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Consolidated campaign archive
+Packs the quick_eval_* run directories of a campaign into a single
+appendable ZIP container (campaign.zip) with one group per run:
+
+    campaign.json                     metadata stored once (GT root, ...)
+    runs/<run>/run.json               parsed metrics, runtime, run status
+    runs/<run>/trajectory.npy         estimated trajectory (N x 8, TUM)
+    runs/<run>/<array>.npy            evo arrays (error_array, timestamps, ...)
+    runs/<run>/tracking_states.npy    per-frame tracking states (uint8)
+    runs/<run>/trace.json             thread timeline (Chrome trace, ORBSLAM_TRACE=1)
+    runs/<run>/orbslam.log
+
+Entries are deflate-compressed and the ZIP central directory is the table of
+contents, so single runs and arrays are read with random access. PNGs and
+pickled figures are not stored; plots are rendered on demand.
+
+Packing works on a copy of the archive that replaces it once complete, so an
+interrupted pack leaves the previous archive intact. Only finished runs are
+packed: evaluated ones, and those whose run_status.json records the exit of
+quick_eval, a failed or aborted ORB-SLAM2 run or a run that ended without a
+trajectory (e.g. after the failure video). Runs still in flight are picked up
+by a later pack; runs without run_status.json (older than the status file)
+are packed with --include-legacy.
+
+Usage:
+    python campaign_archive.py pack baseline_output
+    python campaign_archive.py list baseline_output/campaign.zip
+    python campaign_archive.py plot baseline_output/campaign.zip RUN --output-dir plots
+    python campaign_archive.py plot-run baseline_output/RUN
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import zipfile
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+from plot_downsample import plot_series, scatter_series
+
+ARCHIVE_NAME = 'campaign.zip'
+FORMAT_VERSION = 1
+
+METADATA_ENTRY = 'campaign.json'
+RUNS_PREFIX = 'runs/'
+
+# Arrays copied from evo's ape_results.zip
+EVO_ARRAYS = ['error_array', 'timestamps', 'seconds_from_start',
+              'distances_from_start', 'alignment_transformation_sim3']
+
+# run_status.json states of runs that ended without an evaluation
+FINAL_FAILED_STATES = ('failed', 'aborted')
+
+# Trajectories ORB-SLAM2 saves on a normal shutdown (quick_eval renames them to trajectory.txt)
+TRAJECTORY_FILES = ['trajectory.txt', 'KeyFrameTrajectory.txt', 'CameraTrajectory.txt']
+
+GT_ROOT_PATTERN = re.compile(r'Loaded \d+ stamps and poses from: (\S*INTR6000P_GT_POSES)/(\w+/\w+\.txt)')
+
+def archive_path_for(campaign):
+    """Archive of a campaign directory (or the archive itself)"""
+    campaign = Path(campaign)
+    return campaign if campaign.suffix == '.zip' else campaign / ARCHIVE_NAME
+
+def _npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(array))
+    return buffer.getvalue()
+
+def read_run_record(run_dir):
+    """Parse a run directory into the record stored as run.json"""
+    # analyze_results reads archives as well, import here to avoid a cycle
+    from analyze_results import extract_metrics_from_file, extract_runtime_from_log
+
+    run_dir = Path(run_dir)
+    record = {
+        'run': run_dir.name,
+        'difficulty': 'unknown',
+        'sequence': 'unknown',
+        'num_poses': 0,
+        'scale': None,
+        'metrics': {},
+        'runtime': {},
+        'evaluated': False,
+        'ground_truth': None,
+        'run_status': None,
+        'scale_drift': None,
+    }
+
+    stats_file = run_dir / 'evo_statistics.txt'
+    if stats_file.exists():
+        record.update(extract_metrics_from_file(stats_file))
+        record['evaluated'] = True
+        gt_match = GT_ROOT_PATTERN.search(stats_file.read_text(errors='replace'))
+        if gt_match:
+            record['ground_truth'] = gt_match.group(2)
+
+    if (run_dir / 'orbslam.log').exists():
+        record['runtime'] = extract_runtime_from_log(run_dir / 'orbslam.log')
+
+    for key, filename in (('run_status', 'run_status.json'), ('scale_drift', 'scale_drift.json')):
+        if (run_dir / filename).exists():
+            with open(run_dir / filename, 'r') as f:
+                record[key] = json.load(f)
+    if record['scale_drift']:
+        record['scale_drift'].pop('series', None)
+
+    return record
+
+def run_is_final(run_dir, include_legacy=False):
+    """True once a run directory holds its final outputs"""
+    run_dir = Path(run_dir)
+    stats_file = run_dir / 'evo_statistics.txt'
+    if stats_file.exists() and stats_file.stat().st_size and (run_dir / 'ape_results.zip').exists():
+        return True
+
+    status_file = run_dir / 'run_status.json'
+    if not status_file.exists():
+        return include_legacy
+    try:
+        with open(status_file, 'r') as f:
+            status = json.load(f)
+    except ValueError:
+        return False
+
+    if 'quick_eval_exit' in status or status.get('state') in FINAL_FAILED_STATES:
+        return True
+    # ORB-SLAM2 exited without saving a trajectory (failure video): quick_eval stops right there
+    return (status.get('state') == 'finished' and
+            not any((run_dir / name).exists() for name in TRAJECTORY_FILES))
+
+def find_gt_root(run_dir):
+    """GT_POSES root recorded in a run's evo_statistics.txt, or None"""
+    stats_file = Path(run_dir) / 'evo_statistics.txt'
+    if not stats_file.exists():
+        return None
+    gt_match = GT_ROOT_PATTERN.search(stats_file.read_text(errors='replace'))
+    return gt_match.group(1) if gt_match else None
+
+class CampaignArchive:
+    """Random-access reader and appender for a campaign.zip"""
+
+    def __init__(self, path, mode='r'):
+        self.path = Path(path)
+        self.zip = zipfile.ZipFile(self.path, mode, compression=zipfile.ZIP_DEFLATED)
+        self._names = set(self.zip.namelist())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    @property
+    def metadata(self):
+        if METADATA_ENTRY not in self._names:
+            return {}
+        return json.loads(self.zip.read(METADATA_ENTRY))
+
+    def runs(self):
+        """Names of the archived runs (from the table of contents)"""
+        return sorted(name[len(RUNS_PREFIX):-len('/run.json')] for name in self._names
+                      if name.startswith(RUNS_PREFIX) and name.endswith('/run.json'))
+
+    def __contains__(self, run):
+        return f"{RUNS_PREFIX}{run}/run.json" in self._names
+
+    def record(self, run):
+        """Parsed metrics of a run, ground truth resolved against the metadata"""
+        record = json.loads(self.zip.read(f"{RUNS_PREFIX}{run}/run.json"))
+        gt_root = self.metadata.get('gt_root')
+        if gt_root and record.get('ground_truth'):
+            record['ground_truth'] = f"{gt_root}/{record['ground_truth']}"
+        return record
+
+    def records(self):
+        return [self.record(run) for run in self.runs()]
+
+    def has(self, run, entry):
+        return f"{RUNS_PREFIX}{run}/{entry}" in self._names
+
+    def array(self, run, name):
+        """Load one stored array of a run"""
+        return np.load(io.BytesIO(self.zip.read(f"{RUNS_PREFIX}{run}/{name}.npy")))
+
+    def log(self, run):
+        return self.zip.read(f"{RUNS_PREFIX}{run}/orbslam.log").decode(errors='replace')
+
+    def trace(self, run):
+        """Parsed Chrome trace of a run"""
+        return json.loads(self.zip.read(f"{RUNS_PREFIX}{run}/trace.json"))
+
+    def _write(self, name, data):
+        self.zip.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED)
+        self._names.add(name)
+
+    def write_metadata(self, campaign, gt_root):
+        """Store the campaign metadata, once per archive"""
+        if METADATA_ENTRY in self._names:
+            return
+        self._write(METADATA_ENTRY, json.dumps({
+            'format': FORMAT_VERSION,
+            'campaign': campaign,
+            'gt_root': gt_root,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }, indent=2))
+
+    def add_run(self, run_dir):
+        """Append a run directory, returns False when it is already archived"""
+        run_dir = Path(run_dir)
+        run = run_dir.name
+        if run in self:
+            return False
+
+        prefix = f"{RUNS_PREFIX}{run}/"
+        traj_file = run_dir / 'trajectory.txt'
+        if traj_file.exists() and traj_file.stat().st_size:
+            self._write(prefix + 'trajectory.npy', _npy_bytes(np.loadtxt(traj_file, ndmin=2)))
+
+        ape_file = run_dir / 'ape_results.zip'
+        if ape_file.exists():
+            with zipfile.ZipFile(ape_file) as ape:
+                for name in EVO_ARRAYS:
+                    if f"{name}.npy" in ape.namelist():
+                        self._write(prefix + f"{name}.npy", ape.read(f"{name}.npy"))
+
+        states_file = run_dir / 'tracking_states.bin'
+        if states_file.exists():
+            self._write(prefix + 'tracking_states.npy', _npy_bytes(np.fromfile(states_file, dtype=np.uint8)))
+
+        if (run_dir / 'trace.json').exists():
+            self._write(prefix + 'trace.json', (run_dir / 'trace.json').read_bytes())
+
+        if (run_dir / 'orbslam.log').exists():
+            self._write(prefix + 'orbslam.log', (run_dir / 'orbslam.log').read_bytes())
+
+        # run.json last: a run is only listed once all of its entries are written
+        self._write(prefix + 'run.json', json.dumps(read_run_record(run_dir), indent=2))
+        return True
+
+def archived_runs(campaign):
+    """{run name: record} of a campaign's archive, empty when there is none"""
+    path = archive_path_for(campaign)
+    if not path.exists():
+        return {}
+    with CampaignArchive(path) as archive:
+        return {record['run']: record for record in archive.records()}
+
+def pack_campaign(campaign_dir, archive_path=None, include_legacy=False):
+    """
+    Append all finished, not yet archived quick_eval_* runs of a campaign
+    directory; include_legacy also packs runs without run_status.json
+    """
+    campaign_dir = Path(campaign_dir)
+    archive_path = Path(archive_path) if archive_path else archive_path_for(campaign_dir)
+
+    run_dirs = sorted(p for p in campaign_dir.glob('**/quick_eval_*') if p.is_dir())
+    gt_root = next((root for root in map(find_gt_root, run_dirs) if root), None)
+
+    # The ZIP central directory is only written on close: append to a copy
+    # and replace the archive once it is complete
+    tmp_path = archive_path.with_name(archive_path.name + '.tmp')
+    if archive_path.exists():
+        shutil.copyfile(archive_path, tmp_path)
+    mode = 'a' if archive_path.exists() else 'w'
+
+    added = 0
+    try:
+        with CampaignArchive(tmp_path, mode) as archive:
+            archive.write_metadata(campaign_dir.name, gt_root)
+            for run_dir in run_dirs:
+                if run_dir.name in archive:
+                    continue
+                if not run_is_final(run_dir, include_legacy):
+                    reason = 'not finished' if (run_dir / 'run_status.json').exists() else \
+                        'no run_status.json, see --include-legacy'
+                    print(f"  - {run_dir.name} ({reason}, skipped)")
+                    continue
+                archive.add_run(run_dir)
+                added += 1
+                print(f"  + {run_dir.name}")
+            total = len(archive.runs())
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return added, total
+
+def render_run_plots(archive, run, output_dir):
+    """Render the APE plots of an archived run, returns the written files"""
+    arrays = {name: archive.array(run, name)
+              for name in ('error_array', 'timestamps', 'trajectory', 'alignment_transformation_sim3')
+              if archive.has(run, f'{name}.npy')}
+    output_dir = Path(output_dir)
+    return render_plots(arrays, run, output_dir / f'{run}_ape.png', output_dir / f'{run}_trajectory.png')
+
+def render_run_dir_plots(run_dir, output_dir=None):
+    """Render the APE plots of a run directory from its ape_results.zip, returns the written files"""
+    run_dir = Path(run_dir)
+    output_dir = run_dir if output_dir is None else Path(output_dir)
+    arrays = {}
+    ape_file = run_dir / 'ape_results.zip'
+    if ape_file.exists():
+        with zipfile.ZipFile(ape_file) as ape:
+            for name in ('error_array', 'timestamps', 'alignment_transformation_sim3'):
+                if f'{name}.npy' in ape.namelist():
+                    arrays[name] = np.load(io.BytesIO(ape.read(f'{name}.npy')))
+    traj_file = run_dir / 'trajectory.txt'
+    if traj_file.exists() and traj_file.stat().st_size:
+        arrays['trajectory'] = np.loadtxt(traj_file, ndmin=2)
+    return render_plots(arrays, run_dir.name, output_dir / 'ape_plot.png', output_dir / 'trajectory_plot.png')
+
+def render_plots(arrays, run, ape_file, trajectory_file):
+    """
+    APE over time and the aligned trajectory coloured by APE, from evo's
+    arrays and the TUM trajectory of a run; returns the written files
+    """
+    if 'error_array' not in arrays or 'timestamps' not in arrays:
+        return []
+    ape_file.parent.mkdir(parents=True, exist_ok=True)
+
+    errors = arrays['error_array']
+    stamps = arrays['timestamps']
+    written = []
+
+    fig, ax = plt.subplots(figsize=(14, 5))
+    plot_series(ax, stamps - stamps[0], errors, color='#3498db', linewidth=1.2)
+    ax.axhline(np.sqrt(np.mean(errors ** 2)), color='#e74c3c', linestyle='--', label='rmse')
+    ax.set_xlabel('Time since first pose (s)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('APE (m)', fontsize=12, fontweight='bold')
+    ax.set_title(f'APE over time: {run}', fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(alpha=0.3)
+    plt.tight_layout()
+    written.append(ape_file)
+    plt.savefig(written[-1], dpi=150, bbox_inches='tight')
+    plt.close()
+
+    if 'trajectory' in arrays and 'alignment_transformation_sim3' in arrays:
+        trajectory = arrays['trajectory']
+        sim3 = arrays['alignment_transformation_sim3']
+        index = np.clip(np.searchsorted(trajectory[:, 0], stamps), 0, len(trajectory) - 1)
+        aligned = trajectory[index, 1:4] @ sim3[:3, :3].T + sim3[:3, 3]
+
+        fig, ax = plt.subplots(figsize=(9, 8))
+        points = scatter_series(ax, aligned[:, 0], aligned[:, 1], c=errors, cmap='viridis', s=8)
+        fig.colorbar(points, ax=ax, label='APE (m)')
+        ax.set_xlabel('x (m)', fontsize=12, fontweight='bold')
+        ax.set_ylabel('y (m)', fontsize=12, fontweight='bold')
+        ax.set_title(f'Aligned trajectory: {run}', fontsize=14, fontweight='bold')
+        ax.set_aspect('equal', adjustable='datalim')
+        ax.grid(alpha=0.3)
+        plt.tight_layout()
+        written.append(trajectory_file)
+        plt.savefig(written[-1], dpi=150, bbox_inches='tight')
+        plt.close()
+
+    return written
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pack = subparsers.add_parser('pack', help='append new runs of a campaign directory')
+    pack.add_argument('campaign', type=Path, help='campaign directory (e.g. baseline_output)')
+    pack.add_argument('--archive', type=Path, default=None,
+                      help=f'archive path (default CAMPAIGN/{ARCHIVE_NAME})')
+    pack.add_argument('--include-legacy', action='store_true',
+                      help='also pack runs without run_status.json (recorded before run status tracking)')
+
+    listing = subparsers.add_parser('list', help='list the runs of an archive')
+    listing.add_argument('archive', type=Path)
+
+    plot = subparsers.add_parser('plot', help='render the plots of an archived run')
+    plot.add_argument('archive', type=Path)
+    plot.add_argument('run')
+    plot.add_argument('--output-dir', type=Path, default=Path('.'))
+
+    plot_run = subparsers.add_parser('plot-run', help='render the plots of a run directory')
+    plot_run.add_argument('run_dir', type=Path)
+    plot_run.add_argument('--output-dir', type=Path, default=None, help='default RUN_DIR')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'pack':
+            added, total = pack_campaign(args.campaign, args.archive, args.include_legacy)
+            print(f"✓ Added {added} runs, archive holds {total} runs: "
+                  f"{args.archive or archive_path_for(args.campaign)}")
+            return 0
+
+        if args.command == 'plot-run':
+            written = render_run_dir_plots(args.run_dir, args.output_dir)
+            if not written:
+                print(f"✗ No evo results in {args.run_dir / 'ape_results.zip'}")
+                return 1
+            for filepath in written:
+                print(f"✓ Saved {filepath}")
+            return 0
+
+        with CampaignArchive(archive_path_for(args.archive)) as archive:
+            if args.command == 'list':
+                print(f"{'Run':<48} {'Poses':>6} {'RMSE (m)':>10} {'Scale':>8}")
+                for record in archive.records():
+                    rmse = record['metrics'].get('rmse')
+                    scale = record.get('scale')
+                    print(f"{record['run']:<48} {record['num_poses']:>6} "
+                          f"{rmse if rmse is not None else float('nan'):>10.4f} "
+                          f"{scale if scale is not None else float('nan'):>8.3f}")
+                return 0
+
+            if args.run not in archive:
+                print(f"✗ Run not in archive: {args.run}")
+                return 1
+            for filepath in render_run_plots(archive, args.run, args.output_dir):
+                print(f"✓ Saved {filepath}")
+            return 0
+    except (OSError, zipfile.BadZipFile, KeyError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,112 +5,110 @@ Complete comparison of all sequences including failed ones
 
 import os
 import re
+import io
+import json
+import zipfile
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
 from pathlib import Path
 
+from campaign_archive import CampaignArchive, archived_runs
+from plot_downsample import plot_series
+from results_table import (MISSING, align, build_table, collect_campaign, export_cells, improvement_percent,
+                           percent_change, sequence_keys, take)
+
 # Configuration
 BASELINE_DIR = Path("baseline_output")
 REFINE_DIR = Path("refine_output")
 OUTPUT_DIR = Path("analysis_output")
 
-def extract_metrics_from_file(filepath):
-    """Extract APE metrics from evo_statistics.txt file"""
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-
-        # Extract sequence info
-        gt_match = re.search(r'INTR6000P_GT_POSES/(\w+)/(\w+)\.txt', content)
-        difficulty = gt_match.group(1) if gt_match else "unknown"
-        sequence = gt_match.group(2) if gt_match else "unknown"
-
-        # Extract number of poses
-        poses_match = re.search(r'Compared (\d+) absolute pose pairs', content)
-        num_poses = int(poses_match.group(1)) if poses_match else 0
-
-        # Extract scale correction
-        scale_match = re.search(r'Scale correction: ([\d.]+)', content)
-        scale = float(scale_match.group(1)) if scale_match else None
-
-        # Extract APE metrics (with Sim(3) Umeyama alignment)
-        metrics = {}
-        ape_section = re.search(r'APE w\.r\.t\. translation part \(m\)\s+\(with Sim\(3\) Umeyama alignment\)(.*?)---',
-                                content, re.DOTALL)
-
-        if ape_section:
-            ape_text = ape_section.group(1)
-            for metric in ['max', 'mean', 'median', 'min', 'rmse', 'sse', 'std']:
-                pattern = rf'{metric}\s+([\d.]+)'
-                match = re.search(pattern, ape_text)
-                if match:
-                    metrics[metric] = float(match.group(1))
-
-        return {
-            'difficulty': difficulty,
-            'sequence': sequence,
-            'num_poses': num_poses,
-            'scale': scale,
-            'metrics': metrics,
-            'status': 'success'
-        }
-    except Exception as e:
-        return {
-            'difficulty': 'unknown',
-            'sequence': 'unknown',
-            'num_poses': 0,
-            'scale': None,
-            'metrics': {},
-            'status': 'failed'
-        }
+# Built by tools/dataset_manifest.py
+DATASET_MANIFEST = Path(__file__).resolve().parent.parent / "INTR6000P" / "manifest.json"
+DIFFICULTIES = ['easy', 'medium', 'hard']
+METHODS = [('Baseline', '#3498db'), ('Refined', '#e74c3c')]
+
+# Successful runs that tracked less than this fraction of their sequence are flagged
+LOW_COVERAGE = 0.5
+
+# quick_eval_<difficulty>_<sequence>_<YYYYmmdd>_<HHMMSS>[_r<run index>_j<job id>] (tools/work_queue.py)
+RUN_DIR_PATTERN = re.compile(r'^quick_eval_(easy|medium|hard)_(\w+?)_\d{8}_\d{6}(?:_r\d+_j\d+)?$')
 
 def get_all_expected_sequences():
-    """Get all expected sequences from the dataset"""
-    return {
-        'easy': ['carwelding2', 'factory1', 'hospital'],
-        'medium': ['factory2', 'factory6'],
-        'hard': ['amusement1', 'amusement2']
-    }
+    """Get all expected sequences from the dataset manifest
+
+    Without a manifest (e.g. results copied away from the dataset), the
+    sequences are taken from the run directory names of both campaigns.
+    """
+    if DATASET_MANIFEST.exists():
+        with open(DATASET_MANIFEST, 'r') as f:
+            entries = [(s['difficulty'], s['sequence']) for s in json.load(f)['sequences']]
+    else:
+        entries = set()
+        for campaign_dir in (BASELINE_DIR, REFINE_DIR):
+            for name in list(archived_runs(campaign_dir)) + [p.name for p in campaign_dir.glob('**/quick_eval_*')]:
+                name_match = RUN_DIR_PATTERN.match(name)
+                if name_match:
+                    entries.add((name_match.group(1), name_match.group(2)))
+        entries = sorted(entries, key=lambda e: (DIFFICULTIES.index(e[0]), e[1]))
+
+    expected = {}
+    for difficulty, sequence in entries:
+        expected.setdefault(difficulty, []).append(sequence)
+    return expected
 
 def collect_all_results_complete():
-    """Collect all results including missing/failed sequences"""
+    """
+    Collect all results including missing/failed sequences.
+    Returns the expected (difficulties, sequences) columns sorted by
+    difficulty and name, and per method the table rows aligned to them.
+    """
     expected = get_all_expected_sequences()
-
-    # Create a complete list of all expected sequences
-    all_sequences = {}
-    for diff, seqs in expected.items():
-        for seq in seqs:
-            key = f"{diff}_{seq}"
-            all_sequences[key] = {
-                'difficulty': diff,
-                'sequence': seq,
-                'baseline': None,
-                'refined': None
-            }
-
-    # Collect baseline results
-    for stats_file in BASELINE_DIR.glob('**/evo_statistics.txt'):
-        data = extract_metrics_from_file(stats_file)
-        key = f"{data['difficulty']}_{data['sequence']}"
-        if key in all_sequences:
-            all_sequences[key]['baseline'] = data
-
-    # Collect refine results
-    for stats_file in REFINE_DIR.glob('**/evo_statistics.txt'):
-        data = extract_metrics_from_file(stats_file)
-        key = f"{data['difficulty']}_{data['sequence']}"
-        if key in all_sequences:
-            all_sequences[key]['refined'] = data
-
-    return all_sequences
-
-def create_complete_comparison_table(all_sequences):
+    keys = sorted((diff, seq) for diff, seqs in expected.items() for seq in seqs)
+    difficulties = np.array([diff for diff, _ in keys], dtype=str)
+    sequences = np.array([seq for _, seq in keys], dtype=str)
+
+    table = build_table(collect_campaign(BASELINE_DIR, 'Baseline') + collect_campaign(REFINE_DIR, 'Refined'))
+
+    # The last collected run of a sequence is the one compared
+    aligned = {method: take(table, align(table, method, difficulties, sequences)) for method, _ in METHODS}
+    return (difficulties, sequences), aligned
+
+def load_error_series(row):
+    """(seconds from start, APE) arrays of a table row's run, or None"""
+    if row['status'] != 'success':
+        return None
+    arrays = {}
+    if row['archived']:
+        with CampaignArchive(row['location']) as archive:
+            for name in ('seconds_from_start', 'error_array'):
+                if archive.has(row['run'], f'{name}.npy'):
+                    arrays[name] = archive.array(row['run'], name)
+    else:
+        ape_file = Path(row['location']) / 'ape_results.zip'
+        if ape_file.exists():
+            with zipfile.ZipFile(ape_file) as ape:
+                for name in ('seconds_from_start', 'error_array'):
+                    if f'{name}.npy' in ape.namelist():
+                        arrays[name] = np.load(io.BytesIO(ape.read(f'{name}.npy')))
+    if len(arrays) < 2:
+        return None
+    return arrays['seconds_from_start'], arrays['error_array']
+
+def succeeded(rows):
+    return rows['status'] == 'success'
+
+def success_values(rows, metric):
+    """APE metric of successful rows (0 where evo reported none), NaN for failed and missing rows"""
+    return np.where(succeeded(rows), np.nan_to_num(rows[metric]), np.nan)
+
+def int_values(rows, name):
+    """Integer column as floats, NaN where there is no value"""
+    return np.where(rows[name] == MISSING, np.nan, rows[name])
+
+def create_complete_comparison_table(keys, aligned):
     """Create comprehensive comparison table with all sequences"""
-
-    # Sort sequences by difficulty and name
-    sorted_keys = sorted(all_sequences.keys(),
-                        key=lambda x: (all_sequences[x]['difficulty'], all_sequences[x]['sequence']))
+    difficulties, sequences = keys
 
     fig, ax = plt.subplots(figsize=(20, 12))
     ax.axis('tight')
@@ -118,92 +116,56 @@ def create_complete_comparison_table(all_sequences):
 
     # Table headers
     headers = ['Sequence', 'Difficulty', 'Baseline\nStatus', 'Baseline\nPoses', 'Baseline\nRMSE (m)',
-               'Refined\nStatus', 'Refined\nPoses', 'Refined\nRMSE (m)', 'Improvement\n(%)', 'Notes']
+               'Baseline\nTrack (ms)', 'Refined\nStatus', 'Refined\nPoses', 'Refined\nRMSE (m)',
+               'Refined\nTrack (ms)', 'Improvement\n(%)', 'Notes']
+
+    # Prepare table data: status, poses, RMSE and tracking time cells of each method
+    status_labels = {'success': '✓ Success', 'failed': '✗ Failed', 'missing': '- Missing'}
+    method_cells = []
+    for rows in aligned.values():
+        status = rows['status'].tolist()
+        method_cells.append(list(zip(
+            [status_labels[s] for s in status],
+            np.where(succeeded(rows), rows['num_poses'].astype(str),
+                     np.where(rows['status'] == 'failed', '0', '-')).tolist(),
+            [f"{rmse:.4f}" if s == 'success' else ('N/A' if s == 'failed' else '-')
+             for rmse, s in zip(success_values(rows, 'rmse').tolist(), status)],
+            ['-' if np.isnan(t) else f"{t * 1000:.1f}" for t in rows['median_time'].tolist()])))
+
+    improvements = improvement_percent(success_values(aligned['Baseline'], 'rmse'),
+                                       success_values(aligned['Refined'], 'rmse'))
+    missing_notes = {'Baseline': 'No baseline', 'Refined': 'No refined'}
 
-    # Prepare table data
     table_data = []
-
-    for key in sorted_keys:
-        seq_data = all_sequences[key]
-        seq_name = seq_data['sequence']
-        difficulty = seq_data['difficulty'].capitalize()
-
-        baseline = seq_data['baseline']
-        refined = seq_data['refined']
-
-        # Baseline info
-        if baseline and baseline['num_poses'] > 0:
-            b_status = '✓ Success'
-            b_poses = str(baseline['num_poses'])
-            b_rmse = f"{baseline['metrics'].get('rmse', 0):.4f}"
-        elif baseline:
-            b_status = '✗ Failed'
-            b_poses = '0'
-            b_rmse = 'N/A'
-        else:
-            b_status = '- Missing'
-            b_poses = '-'
-            b_rmse = '-'
-
-        # Refined info
-        if refined and refined['num_poses'] > 0:
-            r_status = '✓ Success'
-            r_poses = str(refined['num_poses'])
-            r_rmse = f"{refined['metrics'].get('rmse', 0):.4f}"
-        elif refined:
-            r_status = '✗ Failed'
-            r_poses = '0'
-            r_rmse = 'N/A'
-        else:
-            r_status = '- Missing'
-            r_poses = '-'
-            r_rmse = '-'
-
-        # Calculate improvement
-        if (baseline and baseline['num_poses'] > 0 and
-            refined and refined['num_poses'] > 0):
-            b_rmse_val = baseline['metrics'].get('rmse', 0)
-            r_rmse_val = refined['metrics'].get('rmse', 0)
-            if b_rmse_val > 0:
-                improvement = ((b_rmse_val - r_rmse_val) / b_rmse_val) * 100
-                improvement_str = f"{improvement:+.2f}%"
-            else:
-                improvement_str = 'N/A'
-        else:
-            improvement_str = 'N/A'
-            improvement = None
-
+    for i in range(len(sequences)):
         # Notes
         notes = []
-        if not baseline:
-            notes.append('No baseline')
-        elif baseline['num_poses'] == 0:
-            notes.append('Baseline failed')
-
-        if not refined:
-            notes.append('No refined')
-        elif refined['num_poses'] == 0:
-            notes.append('Refined failed')
-
-        if improvement is not None:
-            if improvement > 50:
-                notes.append('Major improvement')
-            elif improvement > 20:
-                notes.append('Good improvement')
-            elif improvement < -20:
-                notes.append('Significant degradation')
+        for method, rows in aligned.items():
+            if rows['status'][i] == 'missing':
+                notes.append(missing_notes[method])
+            elif rows['status'][i] == 'failed':
+                notes.append(f'{method} failed')
+            elif rows['coverage'][i] < LOW_COVERAGE:
+                notes.append(f"{method} tracked {rows['coverage'][i] * 100:.0f}%")
+
+        improvement = improvements[i]
+        if improvement > 50:
+            notes.append('Major improvement')
+        elif improvement > 20:
+            notes.append('Good improvement')
+        elif improvement < -20:
+            notes.append('Significant degradation')
 
         notes_str = ', '.join(notes) if notes else 'OK'
+        improvement_str = 'N/A' if np.isnan(improvement) else f"{improvement:+.2f}%"
 
-        table_data.append([
-            seq_name, difficulty, b_status, b_poses, b_rmse,
-            r_status, r_poses, r_rmse, improvement_str, notes_str
-        ])
+        table_data.append([sequences[i], difficulties[i].capitalize(), *method_cells[0][i], *method_cells[1][i],
+                           improvement_str, notes_str])
 
     # Create table
     table = ax.table(cellText=table_data, colLabels=headers,
                     cellLoc='center', loc='center',
-                    colWidths=[0.12, 0.08, 0.10, 0.08, 0.10, 0.10, 0.08, 0.10, 0.10, 0.14])
+                    colWidths=[0.11, 0.07, 0.09, 0.07, 0.08, 0.08, 0.09, 0.07, 0.08, 0.08, 0.08, 0.10])
 
     table.auto_set_font_size(False)
     table.set_fontsize(9)
@@ -218,9 +180,7 @@ def create_complete_comparison_table(all_sequences):
     # Color code rows based on difficulty and status
     colors = {'easy': '#D5E8D4', 'medium': '#FFF4CC', 'hard': '#F8CECC'}
 
-    for i, key in enumerate(sorted_keys):
-        seq_data = all_sequences[key]
-        difficulty = seq_data['difficulty']
+    for i, difficulty in enumerate(difficulties):
         color = colors.get(difficulty, '#FFFFFF')
 
         for j in range(len(headers)):
@@ -242,26 +202,14 @@ def create_complete_comparison_table(all_sequences):
 
     print(f"✓ Generated complete comparison table")
 
-def create_success_rate_chart(all_sequences):
+def create_success_rate_chart(keys, aligned):
     """Create chart showing success rates"""
 
     difficulties = ['easy', 'medium', 'hard']
-    baseline_success = []
-    refined_success = []
-    total_counts = []
-
-    for diff in difficulties:
-        seqs_in_diff = [s for s in all_sequences.values() if s['difficulty'] == diff]
-        total = len(seqs_in_diff)
-        total_counts.append(total)
-
-        b_success = sum(1 for s in seqs_in_diff
-                       if s['baseline'] and s['baseline']['num_poses'] > 0)
-        r_success = sum(1 for s in seqs_in_diff
-                       if s['refined'] and s['refined']['num_poses'] > 0)
-
-        baseline_success.append(b_success)
-        refined_success.append(r_success)
+    in_diff = keys[0] == np.array(difficulties)[:, np.newaxis]
+    total_counts = in_diff.sum(axis=1).tolist()
+    baseline_success, refined_success = [(in_diff & succeeded(aligned[method])).sum(axis=1).tolist()
+                                         for method, _ in METHODS]
 
     fig, ax = plt.subplots(figsize=(12, 7))
 
@@ -297,36 +245,16 @@ def create_success_rate_chart(all_sequences):
 
     print(f"✓ Generated success rate chart")
 
-def create_rmse_comparison_all(all_sequences):
+def create_rmse_comparison_all(keys, aligned):
     """Create RMSE comparison including failed sequences"""
 
     fig, ax = plt.subplots(figsize=(16, 8))
 
-    # Sort sequences
-    sorted_keys = sorted(all_sequences.keys(),
-                        key=lambda x: (all_sequences[x]['difficulty'], all_sequences[x]['sequence']))
-
-    sequences = []
-    baseline_rmse = []
-    refined_rmse = []
-    colors_list = []
-
-    colors = {'easy': '#2ecc71', 'medium': '#f39c12', 'hard': '#e74c3c'}
-
-    for key in sorted_keys:
-        seq_data = all_sequences[key]
-        sequences.append(f"{seq_data['difficulty']}_{seq_data['sequence']}")
-        colors_list.append(colors.get(seq_data['difficulty'], '#95a5a6'))
-
-        baseline = seq_data['baseline']
-        refined = seq_data['refined']
+    sequences = sequence_keys(*keys)
 
-        # Get RMSE or use NaN for failed/missing
-        b_val = baseline['metrics'].get('rmse', np.nan) if baseline and baseline['num_poses'] > 0 else np.nan
-        r_val = refined['metrics'].get('rmse', np.nan) if refined and refined['num_poses'] > 0 else np.nan
-
-        baseline_rmse.append(b_val)
-        refined_rmse.append(r_val)
+    # Get RMSE or use NaN for failed/missing
+    baseline_rmse, refined_rmse = [np.where(succeeded(aligned[method]), aligned[method]['rmse'], np.nan)
+                                   for method, _ in METHODS]
 
     x = np.arange(len(sequences))
     width = 0.35
@@ -370,14 +298,231 @@ def create_rmse_comparison_all(all_sequences):
 
     print(f"✓ Generated RMSE comparison for all sequences")
 
-def generate_csv_export(all_sequences):
+def create_runtime_comparison_charts(keys, aligned):
+    """Create latency and throughput comparison charts"""
+
+    sequences = sequence_keys(*keys)
+
+    x = np.arange(len(sequences))
+    width = 0.35
+
+    # 1. Latency: median tracking time bars, mean tracking time markers
+    fig, ax = plt.subplots(figsize=(16, 8))
+    for i, (method, color) in enumerate(METHODS):
+        offset = (i - 0.5) * width
+        ax.bar(x + offset, aligned[method]['median_time'] * 1000, width, label=f'{method} (median)',
+               color=color, alpha=0.8)
+        ax.plot(x + offset, aligned[method]['mean_time'] * 1000, 'D', color='black', markersize=5,
+                label='Mean' if i == 0 else None)
+
+    ax.set_xlabel('Sequence', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Tracking Time per Frame (ms)', fontsize=12, fontweight='bold')
+    ax.set_title('Tracking Latency: Baseline vs Refined', fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels([s.replace('_', '\n') for s in sequences], rotation=45, ha='right', fontsize=9)
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(OUTPUT_DIR / 'latency_comparison.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+    # 2. Throughput: tracking capacity (1 / mean tracking time) and effective fps (frames / wall time)
+    fig, axes = plt.subplots(1, 2, figsize=(20, 7))
+    panels = [
+        (axes[0], lambda rows: 1.0 / rows['mean_time'], 'Tracking Throughput (1 / mean time)'),
+        (axes[1], lambda rows: rows['fps'], 'Effective FPS (frames / wall time)'),
+    ]
+
+    for ax, value_fn, title in panels:
+        for i, (method, color) in enumerate(METHODS):
+            ax.bar(x + (i - 0.5) * width, value_fn(aligned[method]), width, label=method, color=color, alpha=0.8)
+
+        ax.set_xlabel('Sequence', fontsize=11, fontweight='bold')
+        ax.set_ylabel('Frames per Second', fontsize=11, fontweight='bold')
+        ax.set_title(title, fontsize=12, fontweight='bold')
+        ax.set_xticks(x)
+        ax.set_xticklabels([s.replace('_', '\n') for s in sequences], rotation=45, ha='right', fontsize=8)
+        ax.legend()
+        ax.grid(axis='y', alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(OUTPUT_DIR / 'throughput_comparison.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Generated latency and throughput comparison charts")
+
+def create_speed_accuracy_scatter(keys, aligned):
+    """Create speed vs accuracy scatter plot across methods"""
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+
+    markers = {'easy': 'o', 'medium': 's', 'hard': '^'}
+    difficulties, sequences = keys
+
+    # (median tracking time in ms, RMSE) of each method, NaN where either is unknown
+    points = {}
+    for method, _ in METHODS:
+        rows = aligned[method]
+        valid = succeeded(rows) & ~np.isnan(rows['median_time']) & ~np.isnan(rows['rmse'])
+        points[method] = (np.where(valid, rows['median_time'] * 1000, np.nan), np.where(valid, rows['rmse'], np.nan))
+
+    for i in range(len(sequences)):
+        plotted = [method for method, _ in METHODS if not np.isnan(points[method][0][i])]
+        for method, color in METHODS:
+            if method in plotted:
+                ax.scatter(points[method][0][i], points[method][1][i], color=color,
+                           marker=markers.get(difficulties[i], 'o'), s=80, alpha=0.8,
+                           edgecolors='black', linewidths=0.5)
+
+        # Connect both methods of the same sequence
+        if len(plotted) == 2:
+            ax.annotate('', xy=(points['Refined'][0][i], points['Refined'][1][i]),
+                        xytext=(points['Baseline'][0][i], points['Baseline'][1][i]),
+                        arrowprops=dict(arrowstyle='->', color='gray', alpha=0.6))
+        if plotted:
+            px, py = points[plotted[-1]]
+            ax.annotate(sequences[i], (px[i], py[i]), textcoords='offset points',
+                        xytext=(6, 4), fontsize=8)
+
+    from matplotlib.lines import Line2D
+    legend_elements = [Line2D([0], [0], marker='o', color='w', markerfacecolor=color,
+                              markersize=10, label=method) for method, color in METHODS]
+    legend_elements += [Line2D([0], [0], marker=marker, color='w', markerfacecolor='#95a5a6',
+                               markersize=10, label=diff.capitalize()) for diff, marker in markers.items()]
+
+    ax.set_xlabel('Median Tracking Time (ms)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('APE RMSE (meters)', fontsize=12, fontweight='bold')
+    ax.set_title('Speed vs Accuracy (lower-left is better)', fontsize=14, fontweight='bold')
+    ax.legend(handles=legend_elements)
+    ax.grid(alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(OUTPUT_DIR / 'speed_vs_accuracy.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Generated speed vs accuracy scatter")
+
+def create_error_over_time_comparison(keys, aligned):
+    """Create APE over time panels of every sequence, both methods overlaid"""
+
+    panels = []
+    for i, key in enumerate(sequence_keys(*keys)):
+        series = {method: load_error_series(aligned[method][i]) for method, _ in METHODS}
+        if any(s is not None for s in series.values()):
+            panels.append((key, series))
+    if not panels:
+        print("  - No evo error arrays found, skipped")
+        return
+
+    cols = 3
+    rows = (len(panels) + cols - 1) // cols
+    fig, axes = plt.subplots(rows, cols, figsize=(18, 4 * rows), squeeze=False)
+
+    for ax, (key, series) in zip(axes.flat, panels):
+        for method, color in METHODS:
+            if series[method] is None:
+                continue
+            seconds, errors = series[method]
+            # Downsampled, the max error spike of each run stays visible
+            plot_series(ax, seconds, errors, color=color, linewidth=1.0,
+                        label=f'{method} (max {errors.max():.2f} m)')
+        ax.set_title(key, fontsize=11, fontweight='bold')
+        ax.set_xlabel('Time (s)', fontsize=10)
+        ax.set_ylabel('APE (m)', fontsize=10)
+        ax.legend(fontsize=8)
+        ax.grid(alpha=0.3)
+    for ax in axes.flat[len(panels):]:
+        ax.axis('off')
+
+    fig.suptitle('APE over Time: Baseline vs Refined', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(OUTPUT_DIR / 'ape_over_time_all_sequences.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Generated APE over time comparison ({len(panels)} sequences)")
+
+def create_tracking_coverage_chart(keys, aligned):
+    """Create tracking coverage and failure count charts"""
+
+    if all(np.isnan(rows['coverage']).all() for rows in aligned.values()):
+        print("  - No per-frame tracking states found, skipped")
+        return
+
+    sequences = sequence_keys(*keys)
+    x = np.arange(len(sequences))
+    width = 0.35
+
+    fig, axes = plt.subplots(2, 1, figsize=(16, 11), sharex=True)
+    for i, (method, color) in enumerate(METHODS):
+        rows = aligned[method]
+        offset = (i - 0.5) * width
+        axes[0].bar(x + offset, rows['coverage'] * 100, width, label=method, color=color, alpha=0.8)
+        axes[1].bar(x + offset, int_values(rows, 'failures'), width, label=f'{method} failures',
+                    color=color, alpha=0.8)
+        axes[1].bar(x + offset, int_values(rows, 'recoveries'), width * 0.5, label=f'{method} relocalized',
+                    color='black', alpha=0.4)
+
+    axes[0].axhline(LOW_COVERAGE * 100, color='gray', linestyle='--', linewidth=1,
+                    label=f'{LOW_COVERAGE * 100:.0f}% coverage')
+    axes[0].set_ylabel('Frames Tracked (%)', fontsize=12, fontweight='bold')
+    axes[0].set_title('Tracking Coverage: Baseline vs Refined', fontsize=14, fontweight='bold')
+    axes[0].set_ylim(0, 105)
+    axes[1].set_ylabel('Tracking Failures', fontsize=12, fontweight='bold')
+    axes[1].set_title('Tracking Failures and Relocalizations', fontsize=14, fontweight='bold')
+    axes[1].set_xticks(x)
+    axes[1].set_xticklabels([s.replace('_', '\n') for s in sequences], rotation=45, ha='right', fontsize=9)
+    for ax in axes:
+        ax.legend()
+        ax.grid(axis='y', alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(OUTPUT_DIR / 'tracking_coverage_comparison.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Generated tracking coverage comparison")
+
+def generate_csv_export(keys, aligned):
     """Export complete data to CSV"""
     import csv
 
     csv_path = OUTPUT_DIR / 'complete_comparison_data.csv'
-
-    sorted_keys = sorted(all_sequences.keys(),
-                        key=lambda x: (all_sequences[x]['difficulty'], all_sequences[x]['sequence']))
+    baseline, refined = aligned['Baseline'], aligned['Refined']
+
+    # Columns of the export, '' where a value is missing or not meaningful
+    columns = [keys[1].tolist(), keys[0].tolist()]
+
+    # Status, poses and APE metrics
+    for rows in (baseline, refined):
+        ok = succeeded(rows)
+        columns.append(np.char.capitalize(rows['status']).tolist())
+        columns.append(export_cells(rows['num_poses'], rows['status'] != 'missing'))
+        for metric in ('rmse', 'mean', 'median', 'max', 'std', 'scale'):
+            columns.append(export_cells(rows[metric], ok & ~np.isnan(rows[metric])))
+
+    # Improvements (both runs succeeded)
+    for metric in ('rmse', 'mean'):
+        improvement = improvement_percent(success_values(baseline, metric), success_values(refined, metric))
+        columns.append(export_cells(improvement, ~np.isnan(improvement)))
+
+    # Runtime data (available whenever the run produced a log)
+    for rows in (baseline, refined):
+        for values in (np.round(rows['median_time'] * 1000, 4), np.round(rows['mean_time'] * 1000, 4),
+                       rows['wall_time'], rows['fps']):
+            columns.append(export_cells(values, ~np.isnan(values)))
+
+    time_change = percent_change(baseline['median_time'], refined['median_time'])
+    columns.append(export_cells(time_change, ~np.isnan(time_change)))
+
+    # Tracking coverage (available when the run recorded per-frame tracking states)
+    for rows in (baseline, refined):
+        tracked = ~np.isnan(rows['coverage'])
+        columns.append(export_cells(np.round(rows['coverage'] * 100, 2), tracked))
+        columns.append(export_cells(rows['failures'], tracked))
+        columns.append(export_cells(rows['recoveries'], tracked))
+        columns.append(export_cells(rows['time_to_init_frames'], rows['time_to_init_frames'] != MISSING))
+        columns.append(export_cells(np.round(rows['reloc_latency_mean_frames'], 2),
+                                    ~np.isnan(rows['reloc_latency_mean_frames'])))
 
     with open(csv_path, 'w', newline='') as f:
         writer = csv.writer(f)
@@ -387,66 +532,16 @@ def generate_csv_export(all_sequences):
             'Sequence', 'Difficulty',
             'Baseline_Status', 'Baseline_Poses', 'Baseline_RMSE', 'Baseline_Mean', 'Baseline_Median', 'Baseline_Max', 'Baseline_Std', 'Baseline_Scale',
             'Refined_Status', 'Refined_Poses', 'Refined_RMSE', 'Refined_Mean', 'Refined_Median', 'Refined_Max', 'Refined_Std', 'Refined_Scale',
-            'RMSE_Improvement_Percent', 'Mean_Improvement_Percent'
+            'RMSE_Improvement_Percent', 'Mean_Improvement_Percent',
+            'Baseline_Median_Track_ms', 'Baseline_Mean_Track_ms', 'Baseline_Wall_Time_s', 'Baseline_FPS',
+            'Refined_Median_Track_ms', 'Refined_Mean_Track_ms', 'Refined_Wall_Time_s', 'Refined_FPS',
+            'Median_Track_Time_Change_Percent',
+            'Baseline_Coverage_Percent', 'Baseline_Failures', 'Baseline_Relocalizations',
+            'Baseline_Time_To_Init_Frames', 'Baseline_Reloc_Latency_Frames',
+            'Refined_Coverage_Percent', 'Refined_Failures', 'Refined_Relocalizations',
+            'Refined_Time_To_Init_Frames', 'Refined_Reloc_Latency_Frames'
         ])
-
-        for key in sorted_keys:
-            seq_data = all_sequences[key]
-            baseline = seq_data['baseline']
-            refined = seq_data['refined']
-
-            row = [seq_data['sequence'], seq_data['difficulty']]
-
-            # Baseline data
-            if baseline and baseline['num_poses'] > 0:
-                row.extend([
-                    'Success',
-                    baseline['num_poses'],
-                    baseline['metrics'].get('rmse', ''),
-                    baseline['metrics'].get('mean', ''),
-                    baseline['metrics'].get('median', ''),
-                    baseline['metrics'].get('max', ''),
-                    baseline['metrics'].get('std', ''),
-                    baseline.get('scale', '')
-                ])
-            elif baseline:
-                row.extend(['Failed', 0, '', '', '', '', '', ''])
-            else:
-                row.extend(['Missing', '', '', '', '', '', '', ''])
-
-            # Refined data
-            if refined and refined['num_poses'] > 0:
-                row.extend([
-                    'Success',
-                    refined['num_poses'],
-                    refined['metrics'].get('rmse', ''),
-                    refined['metrics'].get('mean', ''),
-                    refined['metrics'].get('median', ''),
-                    refined['metrics'].get('max', ''),
-                    refined['metrics'].get('std', ''),
-                    refined.get('scale', '')
-                ])
-            elif refined:
-                row.extend(['Failed', 0, '', '', '', '', '', ''])
-            else:
-                row.extend(['Missing', '', '', '', '', '', '', ''])
-
-            # Calculate improvements
-            if (baseline and baseline['num_poses'] > 0 and
-                refined and refined['num_poses'] > 0):
-                b_rmse = baseline['metrics'].get('rmse', 0)
-                r_rmse = refined['metrics'].get('rmse', 0)
-                rmse_imp = ((b_rmse - r_rmse) / b_rmse * 100) if b_rmse > 0 else ''
-
-                b_mean = baseline['metrics'].get('mean', 0)
-                r_mean = refined['metrics'].get('mean', 0)
-                mean_imp = ((b_mean - r_mean) / b_mean * 100) if b_mean > 0 else ''
-
-                row.extend([rmse_imp, mean_imp])
-            else:
-                row.extend(['', ''])
-
-            writer.writerow(row)
+        writer.writerows(zip(*columns))
 
     print(f"✓ Exported data to CSV: {csv_path}")
 
@@ -458,35 +553,43 @@ def main():
 
     OUTPUT_DIR.mkdir(exist_ok=True)
 
-    print("\n[1/5] Collecting all results (including failed)...")
-    all_sequences = collect_all_results_complete()
-    print(f"  - Total sequences: {len(all_sequences)}")
+    print("\n[1/9] Collecting all results (including failed)...")
+    keys, aligned = collect_all_results_complete()
+    print(f"  - Total sequences: {len(keys[0])}")
+
+    print("\n[2/9] Creating complete comparison table...")
+    create_complete_comparison_table(keys, aligned)
 
-    print("\n[2/5] Creating complete comparison table...")
-    create_complete_comparison_table(all_sequences)
+    print("\n[3/9] Creating success rate chart...")
+    create_success_rate_chart(keys, aligned)
 
-    print("\n[3/5] Creating success rate chart...")
-    create_success_rate_chart(all_sequences)
+    print("\n[4/9] Creating RMSE comparison for all sequences...")
+    create_rmse_comparison_all(keys, aligned)
 
-    print("\n[4/5] Creating RMSE comparison for all sequences...")
-    create_rmse_comparison_all(all_sequences)
+    print("\n[5/9] Creating latency and throughput comparison...")
+    create_runtime_comparison_charts(keys, aligned)
 
-    print("\n[5/5] Exporting data to CSV...")
-    generate_csv_export(all_sequences)
+    print("\n[6/9] Creating speed vs accuracy scatter...")
+    create_speed_accuracy_scatter(keys, aligned)
+
+    print("\n[7/9] Creating APE over time comparison...")
+    create_error_over_time_comparison(keys, aligned)
+
+    print("\n[8/9] Creating tracking coverage comparison...")
+    create_tracking_coverage_chart(keys, aligned)
+
+    print("\n[9/9] Exporting data to CSV...")
+    generate_csv_export(keys, aligned)
 
     # Print summary
     print("\n" + "=" * 60)
     print("Summary Statistics")
     print("=" * 60)
 
-    baseline_success = sum(1 for s in all_sequences.values()
-                          if s['baseline'] and s['baseline']['num_poses'] > 0)
-    refined_success = sum(1 for s in all_sequences.values()
-                         if s['refined'] and s['refined']['num_poses'] > 0)
-
-    print(f"Total sequences: {len(all_sequences)}")
-    print(f"Baseline successful: {baseline_success}/{len(all_sequences)}")
-    print(f"Refined successful: {refined_success}/{len(all_sequences)}")
+    total = len(keys[0])
+    print(f"Total sequences: {total}")
+    for method, _ in METHODS:
+        print(f"{method} successful: {np.count_nonzero(succeeded(aligned[method]))}/{total}")
 
     print("\n" + "=" * 60)
     print("Analysis complete!")
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+Local results dashboard
+Serves per-sequence and per-method metrics, tracking time distributions and
+trajectories of evaluation campaigns as JSON (plus a small offline HTML page)
+from a local HTTP server.
+
+Aggregates are computed once per refresh and served as pre-serialized bodies
+with ETags, so browsers revalidate with a conditional request and get a 304
+while nothing changed. Parsed run records are cached in
+analysis_output/dashboard_index.json and only re-parsed when a run's files
+change, which keeps restarts fast with tens of thousands of runs.
+Trajectories are served downsampled for overview plots; a time window (zoom)
+is served at full resolution. Both reductions keep error spikes
+(plot_downsample.py).
+
+Usage:
+    python dashboard.py [--port 8765] [--campaign refined=refine_output ...]
+
+Endpoints:
+    /api/summary                         per method counts, success rate, RMSE, tracking time
+    /api/sequences                       per sequence and method aggregates
+    /api/tracking-times?method=M         tracking time histograms and quantiles
+    /api/runs?method=&difficulty=&sequence=&offset=&limit=
+    /api/runs/METHOD/RUN                 full run record
+    /api/runs/METHOD/RUN/series?t0=&t1=&points=
+"""
+
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+import numpy as np
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+from campaign_archive import CampaignArchive, archive_path_for, read_run_record
+from plot_downsample import downsample_indices
+
+# Configuration
+BASELINE_DIR = Path("baseline_output")
+REFINE_DIR = Path("refine_output")
+OUTPUT_DIR = Path("analysis_output")
+
+INDEX_CACHE = 'dashboard_index.json'
+DEFAULT_PORT = 8765
+DEFAULT_REFRESH = 30.0
+
+# Points of an overview series, and the most points a zoomed window returns unreduced
+OVERVIEW_POINTS = 1000
+ZOOM_MAX_POINTS = 20000
+TIME_BINS = 40
+SERIES_CACHE_SIZE = 64
+
+# Files whose change means a run directory has to be parsed again
+RUN_FILES = ['evo_statistics.txt', 'orbslam.log', 'run_status.json', 'scale_drift.json']
+
+# quick_eval_<difficulty>_<sequence>_<YYYYmmdd>_<HHMMSS>[_r<run index>_j<job id>] (tools/work_queue.py)
+RUN_DIR_PATTERN = re.compile(r'^quick_eval_(easy|medium|hard)_(\w+?)_\d{8}_\d{6}(?:_r\d+_j\d+)?$')
+
+TIME_STATS = ['median_time', 'mean_time', 'p99_time']
+
+def run_signature(run_dir):
+    """mtime_ns and size of the files a run record is parsed from"""
+    signature = []
+    for name in RUN_FILES:
+        try:
+            st = (run_dir / name).stat()
+            signature.append([st.st_mtime_ns, st.st_size])
+        except FileNotFoundError:
+            signature.append(None)
+    return signature
+
+def file_signature(path):
+    st = Path(path).stat()
+    return [st.st_mtime_ns, st.st_size]
+
+def scan_campaign(method, campaign_dir, cache):
+    """Run records of a campaign (archive and directories), re-parsing only changed runs"""
+    records = []
+    archive_path = archive_path_for(campaign_dir)
+    archived = set()
+    if archive_path.exists():
+        signature = file_signature(archive_path)
+        with CampaignArchive(archive_path) as archive:
+            for run in archive.runs():
+                key = f"{method}/{run}"
+                entry = cache.get(key)
+                if entry is None or entry['signature'] != signature:
+                    entry = {'signature': signature, 'source': 'archive', 'record': archive.record(run)}
+                cache[key] = entry
+                records.append((key, entry))
+                archived.add(run)
+
+    for run_dir in sorted(p for p in campaign_dir.glob('**/quick_eval_*') if p.is_dir()):
+        if run_dir.name in archived:
+            continue
+        key = f"{method}/{run_dir.name}"
+        signature = run_signature(run_dir)
+        entry = cache.get(key)
+        if entry is None or entry['signature'] != signature or entry.get('path') != str(run_dir):
+            entry = {'signature': signature, 'source': 'directory', 'path': str(run_dir),
+                     'record': read_run_record(run_dir)}
+        cache[key] = entry
+        records.append((key, entry))
+    return records
+
+def quantiles(values):
+    """Five-number summary plus mean of a list of values, None when empty"""
+    if not values:
+        return None
+    values = np.asarray(values, dtype=float)
+    p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95])
+    return {'count': len(values), 'min': float(values.min()), 'p5': p5, 'p25': p25, 'median': p50,
+            'p75': p75, 'p95': p95, 'max': float(values.max()), 'mean': float(values.mean())}
+
+def slim_run(method, entry):
+    """Row of the run listing"""
+    record = entry['record']
+    name_match = RUN_DIR_PATTERN.match(record['run'])
+    difficulty, sequence = record['difficulty'], record['sequence']
+    if difficulty == 'unknown' and name_match:
+        difficulty, sequence = name_match.group(1), name_match.group(2)
+    return {
+        'method': method,
+        'run': record['run'],
+        'difficulty': difficulty,
+        'sequence': sequence,
+        'success': record['num_poses'] > 0,
+        'num_poses': record['num_poses'],
+        'rmse': record['metrics'].get('rmse'),
+        'scale': record['scale'],
+        'median_time': record['runtime'].get('median_time'),
+        'fps': record['runtime'].get('fps'),
+        'source': entry['source'],
+    }
+
+def aggregate(rows):
+    """Precomputed endpoint payloads of a list of run rows"""
+    methods = sorted({row['method'] for row in rows})
+
+    summary = {}
+    for method in methods:
+        method_rows = [row for row in rows if row['method'] == method]
+        successes = [row for row in method_rows if row['success']]
+        summary[method] = {
+            'runs': len(method_rows),
+            'successes': len(successes),
+            'success_rate': len(successes) / len(method_rows),
+            'sequences': len({(row['difficulty'], row['sequence']) for row in method_rows}),
+            'rmse': quantiles([row['rmse'] for row in successes if row['rmse'] is not None]),
+            'median_time': quantiles([row['median_time'] for row in method_rows
+                                      if row['median_time'] is not None]),
+        }
+
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['difficulty'], row['sequence']), {}).setdefault(row['method'], []).append(row)
+    sequences = []
+    for (difficulty, sequence), by_method in sorted(groups.items()):
+        entry = {'difficulty': difficulty, 'sequence': sequence, 'methods': {}}
+        for method, method_rows in sorted(by_method.items()):
+            successes = [row for row in method_rows if row['success']]
+            entry['methods'][method] = {
+                'runs': len(method_rows),
+                'successes': len(successes),
+                'rmse': quantiles([row['rmse'] for row in successes if row['rmse'] is not None]),
+                'median_time': quantiles([row['median_time'] for row in method_rows
+                                          if row['median_time'] is not None]),
+                'latest_run': max(row['run'] for row in method_rows),
+            }
+        sequences.append(entry)
+
+    return {'/api/summary': {'methods': summary}, '/api/sequences': {'sequences': sequences}}
+
+def tracking_time_histograms(records, method=None):
+    """Histograms (shared bins, milliseconds) and quantiles of per-run tracking time statistics"""
+    payload = {}
+    for stat in TIME_STATS:
+        values = {}
+        for key, entry in records.items():
+            run_method = key.split('/', 1)[0]
+            value = entry['record']['runtime'].get(stat)
+            if value is not None and (method is None or run_method == method):
+                values.setdefault(run_method, []).append(value * 1e3)
+        if not values:
+            continue
+        everything = np.concatenate([np.asarray(v) for v in values.values()])
+        edges = np.histogram_bin_edges(everything, bins=TIME_BINS)
+        payload[stat] = {
+            'unit': 'ms',
+            'bin_edges': edges.tolist(),
+            'methods': {m: {'counts': np.histogram(v, bins=edges)[0].tolist(), 'quantiles': quantiles(v)}
+                        for m, v in sorted(values.items())},
+        }
+    return {'method': method, 'statistics': payload}
+
+def encode(payload):
+    """JSON body and its ETag"""
+    body = json.dumps(payload, separators=(',', ':'), default=float).encode()
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+class ResultsIndex:
+    """Run records and precomputed aggregates of the served campaigns"""
+
+    def __init__(self, campaigns, cache_path=None):
+        self.campaigns = campaigns
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.records = {}
+        self.rows = []
+        self.bodies = {}
+        self.updated_at = None
+        self.lock = threading.Lock()
+        self._stamp = None
+
+        self._cache = {}
+        if self.cache_path and self.cache_path.exists():
+            with open(self.cache_path, 'r') as f:
+                self._cache = json.load(f)
+
+    def _campaign_stamp(self):
+        """
+        Change check without parsing: the archive signatures plus the run
+        signature of every run directory (files written into an existing run
+        directory do not change the campaign directory's mtime)
+        """
+        stamp = []
+        for campaign_dir in self.campaigns.values():
+            archive_path = archive_path_for(campaign_dir)
+            stamp.append(file_signature(archive_path) if archive_path.exists() else None)
+            for run_dir in sorted(p for p in campaign_dir.glob('**/quick_eval_*') if p.is_dir()):
+                stamp.append([str(run_dir), run_signature(run_dir)])
+        return stamp
+
+    def refresh(self, force=False):
+        """Rescan the campaigns when they changed, returns True when the index was rebuilt"""
+        with self.lock:
+            stamp = self._campaign_stamp()
+            if not force and stamp == self._stamp:
+                return False
+
+            records = {}
+            for method, campaign_dir in self.campaigns.items():
+                records.update(scan_campaign(method, campaign_dir, self._cache))
+            rows = [slim_run(key.split('/', 1)[0], entry) for key, entry in sorted(records.items())]
+
+            bodies = {path: encode(payload) for path, payload in aggregate(rows).items()}
+            bodies['/api/tracking-times'] = encode(tracking_time_histograms(records))
+
+            # Swapped in one step, requests in flight keep the previous index
+            self.records, self.rows, self.bodies = records, rows, bodies
+            self.updated_at = datetime.now().isoformat(timespec='seconds')
+            self._stamp = stamp
+            self._cache = dict(records)
+            self._save_cache()
+            return True
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(f"{self.cache_path}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._cache, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def watch(self, interval):
+        """Refresh in a daemon thread every interval seconds"""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    if self.refresh():
+                        print(f"  Index refreshed: {len(self.rows)} runs")
+                except (OSError, ValueError, zipfile.BadZipFile) as e:
+                    print(f"✗ Refresh failed: {e}")
+        threading.Thread(target=loop, daemon=True).start()
+
+    def series_source(self, method, run):
+        """(source kind, location, signature) of a run's series, None when unknown"""
+        entry = self.records.get(f"{method}/{run}")
+        if entry is None:
+            return None
+        if entry['source'] == 'archive':
+            location = archive_path_for(self.campaigns[method])
+            return 'archive', str(location), tuple(file_signature(location))
+        run_dir = Path(entry['path'])
+        signature = tuple(tuple(file_signature(run_dir / name)) if (run_dir / name).exists() else None
+                          for name in ('trajectory.txt', 'ape_results.zip'))
+        return 'directory', str(run_dir), signature
+
+@functools.lru_cache(maxsize=SERIES_CACHE_SIZE)
+def load_series(kind, location, run, signature):
+    """(stamps, xyz, errors or None) of a run; positions Sim(3) aligned when evo results exist"""
+    arrays = {}
+    if kind == 'archive':
+        with CampaignArchive(location) as archive:
+            for name in ('trajectory', 'error_array', 'timestamps', 'alignment_transformation_sim3'):
+                if archive.has(run, f'{name}.npy'):
+                    arrays[name] = archive.array(run, name)
+    else:
+        run_dir = Path(location)
+        if (run_dir / 'trajectory.txt').exists() and (run_dir / 'trajectory.txt').stat().st_size:
+            arrays['trajectory'] = np.loadtxt(run_dir / 'trajectory.txt', ndmin=2)
+        if (run_dir / 'ape_results.zip').exists():
+            with zipfile.ZipFile(run_dir / 'ape_results.zip') as ape:
+                for name in ('error_array', 'timestamps', 'alignment_transformation_sim3'):
+                    if f'{name}.npy' in ape.namelist():
+                        arrays[name] = np.load(io.BytesIO(ape.read(f'{name}.npy')))
+
+    if 'trajectory' not in arrays:
+        return None
+    trajectory = arrays['trajectory']
+    if 'error_array' in arrays and 'timestamps' in arrays and 'alignment_transformation_sim3' in arrays:
+        stamps = arrays['timestamps']
+        sim3 = arrays['alignment_transformation_sim3']
+        index = np.clip(np.searchsorted(trajectory[:, 0], stamps), 0, len(trajectory) - 1)
+        xyz = trajectory[index, 1:4] @ sim3[:3, :3].T + sim3[:3, 3]
+        return stamps, xyz, arrays['error_array']
+    return trajectory[:, 0], trajectory[:, 1:4], None
+
+def series_payload(series, t0=None, t1=None, points=OVERVIEW_POINTS):
+    """Overview (downsampled) or zoomed window (full resolution) of a series"""
+    stamps, xyz, errors = series
+    start, stop = 0, len(stamps)
+    zoomed = t0 is not None or t1 is not None
+    if t0 is not None:
+        start = int(np.searchsorted(stamps, t0, side='left'))
+    if t1 is not None:
+        stop = int(np.searchsorted(stamps, t1, side='right'))
+
+    # Error spikes (or the path extremes) survive the reduction
+    budget = ZOOM_MAX_POINTS if zoomed else points
+    window = slice(start, stop)
+    if errors is not None:
+        index = start + downsample_indices(stamps[window], errors[window], budget, method='lttb')
+    else:
+        index = start + downsample_indices(stamps[window], xyz[window], budget, method='minmax')
+    return {
+        'total_points': len(stamps),
+        'window_points': stop - start,
+        'returned_points': len(index),
+        'full_resolution': len(index) == stop - start,
+        'aligned': errors is not None,
+        'stamps': np.round(stamps[index], 6).tolist(),
+        'xyz': np.round(xyz[index], 4).tolist(),
+        'error': np.round(errors[index], 5).tolist() if errors is not None else None,
+    }
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """JSON endpoints with ETag / If-None-Match revalidation"""
+
+    index = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body, etag, content_type='application/json'):
+        if etag and etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        body = json.dumps({'error': message}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path.rstrip('/') or '/'
+        index = self.index
+
+        try:
+            if path == '/':
+                self.send_body(PAGE.encode(), f'"{hashlib.sha1(PAGE.encode()).hexdigest()}"',
+                               'text/html; charset=utf-8')
+            elif path == '/api/tracking-times' and query.get('method'):
+                self.send_body(*encode(tracking_time_histograms(index.records, query['method'])))
+            elif path in index.bodies:
+                self.send_body(*index.bodies[path])
+            elif path == '/api/runs':
+                self.handle_runs(query)
+            elif path.startswith('/api/runs/'):
+                parts = [unquote(part) for part in path[len('/api/runs/'):].split('/')]
+                if len(parts) == 2:
+                    entry = index.records.get('/'.join(parts))
+                    if entry is None:
+                        return self.send_error_json(HTTPStatus.NOT_FOUND, 'unknown run')
+                    self.send_body(*encode(entry['record']))
+                elif len(parts) == 3 and parts[2] == 'series':
+                    self.handle_series(parts[0], parts[1], query)
+                else:
+                    self.send_error_json(HTTPStatus.NOT_FOUND, 'unknown endpoint')
+            else:
+                self.send_error_json(HTTPStatus.NOT_FOUND, 'unknown endpoint')
+        except ValueError as e:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+        except (OSError, zipfile.BadZipFile) as e:
+            self.send_error_json(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+    def handle_runs(self, query):
+        """Paginated, filtered run listing"""
+        offset = int(query.get('offset', 0))
+        limit = min(int(query.get('limit', 100)), 1000)
+        rows = [row for row in self.index.rows
+                if all(query.get(field) in (None, row[field]) for field in ('method', 'difficulty', 'sequence'))]
+        self.send_body(*encode({'total': len(rows), 'offset': offset, 'runs': rows[offset:offset + limit]}))
+
+    def handle_series(self, method, run, query):
+        source = self.index.series_source(method, run)
+        if source is None:
+            return self.send_error_json(HTTPStatus.NOT_FOUND, 'unknown run')
+
+        # The ETag only depends on the source files and the query: revalidation never loads the series
+        etag = '"' + hashlib.sha1(repr((source, sorted(query.items()))).encode()).hexdigest() + '"'
+        if etag in self.headers.get('If-None-Match', ''):
+            return self.send_body(b'', etag)
+
+        series = load_series(*source[:2], run, source[2])
+        if series is None:
+            return self.send_error_json(HTTPStatus.NOT_FOUND, 'run has no trajectory')
+        t0 = float(query['t0']) if 't0' in query else None
+        t1 = float(query['t1']) if 't1' in query else None
+        points = min(int(query.get('points', OVERVIEW_POINTS)), ZOOM_MAX_POINTS)
+        payload = series_payload(series, t0, t1, points)
+        payload.update({'method': method, 'run': run})
+        body, _ = encode(payload)
+        self.send_body(body, etag)
+
+# Offline single page: no external scripts, plots drawn on canvases
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>ORB-SLAM2 results</title>
+<style>
+body { font-family: sans-serif; margin: 1em 2em; }
+table { border-collapse: collapse; font-size: 13px; }
+td, th { border-bottom: 1px solid #ddd; padding: 3px 8px; text-align: right; }
+td:first-child, th:first-child { text-align: left; }
+tr.seq:hover { background: #eef; cursor: pointer; }
+canvas { border: 1px solid #ccc; margin: 4px; }
+</style></head>
+<body>
+<h2>ORB-SLAM2 evaluation results</h2>
+<div id="summary"></div>
+<table id="sequences"></table>
+<h3 id="title"></h3>
+<canvas id="traj" width="500" height="500"></canvas>
+<canvas id="error" width="800" height="300"></canvas>
+<p>Drag on the error plot to zoom (full resolution), double-click to reset.</p>
+<script>
+const fmt = (v, d) => v == null ? '-' : v.toFixed(d);
+const get = url => fetch(url).then(r => r.json());
+let current = null, dragStart = null;
+
+function line(ctx, xs, ys, color, w, h) {
+  const xmin = Math.min(...xs), xmax = Math.max(...xs), ymin = Math.min(...ys), ymax = Math.max(...ys);
+  ctx.strokeStyle = color; ctx.beginPath();
+  xs.forEach((x, i) => {
+    const px = 10 + (w - 20) * (x - xmin) / ((xmax - xmin) || 1);
+    const py = h - 10 - (h - 20) * (ys[i] - ymin) / ((ymax - ymin) || 1);
+    i ? ctx.lineTo(px, py) : ctx.moveTo(px, py);
+  });
+  ctx.stroke();
+  return [xmin, xmax];
+}
+
+function draw(series) {
+  const t = document.getElementById('traj').getContext('2d');
+  t.clearRect(0, 0, 500, 500);
+  line(t, series.xyz.map(p => p[0]), series.xyz.map(p => p[1]), '#3498db', 500, 500);
+  const e = document.getElementById('error').getContext('2d');
+  e.clearRect(0, 0, 800, 300);
+  if (series.error) current.range = line(e, series.stamps, series.error, '#e74c3c', 800, 300);
+  document.getElementById('title').textContent = `${series.method} / ${series.run}: ` +
+    `${series.returned_points} of ${series.window_points} points` + (series.full_resolution ? ' (full resolution)' : '');
+}
+
+function load(method, run, t0, t1) {
+  current = {method, run};
+  const q = t0 != null ? `?t0=${t0}&t1=${t1}` : '';
+  get(`/api/runs/${method}/${run}/series${q}`).then(draw);
+}
+
+const canvas = document.getElementById('error');
+canvas.onmousedown = ev => dragStart = ev.offsetX;
+canvas.onmouseup = ev => {
+  if (!current || !current.range || dragStart == null || Math.abs(ev.offsetX - dragStart) < 5) return;
+  const [a, b] = [dragStart, ev.offsetX].sort((x, y) => x - y).map(px =>
+    current.range[0] + (current.range[1] - current.range[0]) * (px - 10) / 780);
+  dragStart = null;
+  load(current.method, current.run, a, b);
+};
+canvas.ondblclick = () => current && load(current.method, current.run);
+
+get('/api/summary').then(s => {
+  document.getElementById('summary').innerHTML = Object.entries(s.methods).map(([m, v]) =>
+    `<b>${m}</b>: ${v.successes}/${v.runs} runs succeeded, median RMSE ${fmt(v.rmse && v.rmse.median, 4)} m, ` +
+    `median tracking time ${fmt(v.median_time && v.median_time.median * 1000, 1)} ms`).join('<br>');
+});
+get('/api/sequences').then(s => {
+  const methods = [...new Set(s.sequences.flatMap(q => Object.keys(q.methods)))].sort();
+  let html = '<tr><th>Sequence</th>' + methods.map(m => `<th>${m} runs</th><th>${m} RMSE (m)</th>` +
+    `<th>${m} track (ms)</th>`).join('') + '</tr>';
+  s.sequences.forEach(q => {
+    html += `<tr class="seq" data-q='${JSON.stringify(q.methods)}'><td>${q.difficulty}/${q.sequence}</td>` +
+      methods.map(m => { const v = q.methods[m];
+        return v ? `<td>${v.successes}/${v.runs}</td><td>${fmt(v.rmse && v.rmse.median, 4)}</td>` +
+          `<td>${fmt(v.median_time && v.median_time.median * 1000, 1)}</td>` : '<td>-</td><td>-</td><td>-</td>';
+      }).join('') + '</tr>';
+  });
+  const table = document.getElementById('sequences');
+  table.innerHTML = html;
+  table.querySelectorAll('tr.seq').forEach(row => row.onclick = () => {
+    const [method, v] = Object.entries(JSON.parse(row.dataset.q))[0];
+    load(method, v.latest_run);
+  });
+});
+</script>
+</body></html>
+"""
+
+def parse_campaigns(specs):
+    """{method: campaign dir} from NAME=PATH arguments"""
+    if not specs:
+        return {'baseline': BASELINE_DIR, 'refined': REFINE_DIR}
+    campaigns = {}
+    for spec in specs:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            raise ValueError(f"Expected NAME=PATH, got {spec}")
+        campaigns[name] = Path(path)
+    return campaigns
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--campaign', action='append', default=None, metavar='NAME=PATH',
+                        help='campaign directory or archive to serve (default: baseline and refined)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--refresh', type=float, default=DEFAULT_REFRESH, metavar='SECONDS',
+                        help='interval of the campaign change check, 0 disables it')
+    parser.add_argument('--index-cache', type=Path, default=OUTPUT_DIR / INDEX_CACHE)
+    args = parser.parse_args()
+
+    try:
+        campaigns = parse_campaigns(args.campaign)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    index = ResultsIndex(campaigns, args.index_cache)
+    started = time.monotonic()
+    index.refresh(force=True)
+    print(f"✓ Indexed {len(index.rows)} runs of {len(campaigns)} campaigns in {time.monotonic() - started:.1f}s")
+    if args.refresh > 0:
+        index.watch(args.refresh)
+
+    DashboardHandler.index = index
+    server = ThreadingHTTPServer((args.host, args.port), DashboardHandler)
+    print(f"✓ Serving on http://{args.host}:{args.port}/ (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
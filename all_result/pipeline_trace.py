@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Pipeline trace analysis
+Reads the thread timelines written by ORB-SLAM2 with ORBSLAM_TRACE=1
+(trace.json, Chrome trace format, see include/Tracer.h) and summarises where
+the Tracking, LocalMapping, LoopClosing and Viewer threads spend their time:
+per-stage call counts and durations, thread utilisation, time blocked on the
+map update mutex, local BA aborts and how much of the tracking time overlaps
+local BA. The thread with the highest utilisation is the one that limits
+throughput; its stage with the most time of its own (nested stages excluded)
+is reported as the limiting stage.
+
+Usage:
+    python pipeline_trace.py [CAMPAIGN_OR_RUN_DIR ...]
+
+Without arguments baseline_output and refine_output are analysed; CSVs and a
+stage load chart are written to analysis_output.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from pathlib import Path
+
+from campaign_archive import CampaignArchive, archive_path_for
+from tracking_states import sequence_of
+
+# Configuration
+CAMPAIGN_DIRS = [Path("baseline_output"), Path("refine_output")]
+OUTPUT_DIR = Path("analysis_output")
+
+TRACE_FILE = 'trace.json'
+
+# Threads named by Tracer::SetThreadName
+THREADS = ['Tracking', 'LocalMapping', 'LoopClosing', 'Viewer', 'GlobalBA']
+
+# Category of the events recording time blocked on a mutex or another thread
+LOCK_CATEGORY = 'lock'
+
+CAMPAIGN_COLORS = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6']
+
+def parse_trace(trace):
+    """
+    Events of a parsed Chrome trace as columns.
+
+    Returns a dict of arrays, one entry per complete ('X') or instant ('i')
+    event: thread (thread name), name, category, phase, start and duration
+    in ms, arg (value of the event's argument, NaN when it has none).
+    """
+    events = trace['traceEvents'] if isinstance(trace, dict) else trace
+    thread_names = {e['tid']: e['args']['name'] for e in events
+                    if e.get('ph') == 'M' and e.get('name') == 'thread_name'}
+    timed = [e for e in events if e.get('ph') in ('X', 'i')]
+    return {
+        'thread': np.array([thread_names.get(e['tid'], f"Thread {e['tid']}") for e in timed], dtype=str),
+        'name': np.array([e['name'] for e in timed], dtype=str),
+        'category': np.array([e.get('cat', '') for e in timed], dtype=str),
+        'phase': np.array([e['ph'] for e in timed], dtype=str),
+        'start': np.array([e['ts'] for e in timed], dtype=float) * 1e-3,
+        'duration': np.array([e.get('dur', 0.0) for e in timed], dtype=float) * 1e-3,
+        'arg': np.array([next(iter(e['args'].values())) if e.get('args') else np.nan for e in timed],
+                        dtype=float),
+    }
+
+def union_length(starts, ends):
+    """Total length covered by a set of (possibly nested or overlapping) intervals"""
+    if not len(starts):
+        return 0.0
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    # A new block of overlapping intervals starts where an interval begins after all previous ones ended
+    block = np.concatenate([[0], np.cumsum(starts[1:] > reach[:-1])])
+    first = np.flatnonzero(np.diff(np.append(-1, block)))
+    last = np.append(first[1:], len(starts)) - 1
+    return float(np.sum(reach[last] - starts[first]))
+
+def overlap_length(starts_a, ends_a, starts_b, ends_b):
+    """Length of the intersection of the unions of two interval sets"""
+    both = union_length(np.concatenate([starts_a, starts_b]), np.concatenate([ends_a, ends_b]))
+    return union_length(starts_a, ends_a) + union_length(starts_b, ends_b) - both
+
+def stage_statistics(events):
+    """Per (thread, stage) call count and duration statistics of the complete events"""
+    complete = events['phase'] == 'X'
+    threads, names, durations = events['thread'][complete], events['name'][complete], events['duration'][complete]
+    keys = np.char.add(np.char.add(threads, '/'), names)
+    labels, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    groups = np.split(durations[order], np.cumsum(np.bincount(inverse, minlength=len(labels)))[:-1])
+    stats = []
+    for label, index, values in zip(labels, first, groups):
+        thread, name = label.split('/', 1)
+        stats.append({
+            'thread': thread,
+            'stage': name,
+            'category': events['category'][complete][index],
+            'calls': len(values),
+            'total_ms': float(values.sum()),
+            'mean_ms': float(values.mean()),
+            'p95_ms': float(np.percentile(values, 95)),
+            'max_ms': float(values.max()),
+        })
+    return stats
+
+def analyze_trace(events):
+    """Per-stage statistics and pipeline metrics of one run"""
+    complete = events['phase'] == 'X'
+    starts = events['start'][complete]
+    ends = starts + events['duration'][complete]
+    span = float(ends.max() - starts.min()) if len(starts) else 0.0
+
+    def select(thread=None, name=None, category=None):
+        mask = complete.copy()
+        if thread is not None:
+            mask &= events['thread'] == thread
+        if name is not None:
+            mask &= events['name'] == name
+        if category is not None:
+            mask &= events['category'] == category
+        return events['start'][mask], events['start'][mask] + events['duration'][mask], events['arg'][mask]
+
+    stats = stage_statistics(events)
+    busy = {}
+    for thread in np.unique(events['thread'][complete]):
+        thread_starts, thread_ends, _ = select(thread=thread)
+        busy[str(thread)] = union_length(thread_starts, thread_ends)
+    for stage in stats:
+        stage['load'] = stage['total_ms'] / span if span else 0.0
+        stage['share_of_thread'] = stage['total_ms'] / busy[stage['thread']] if busy[stage['thread']] else 0.0
+
+    frames = int(np.sum(complete & (events['name'] == 'Track')))
+    frame_ms = sum(s['total_ms'] for s in stats if s['thread'] == 'Tracking' and s['stage'] in ('ExtractFrame', 'Track'))
+    track = select(thread='Tracking', name='Track')
+    local_ba = select(name='LocalBA')
+    ba_aborted = local_ba[2]
+
+    metrics = {
+        'span_s': span * 1e-3,
+        'frames': frames,
+        'frame_ms_mean': frame_ms / frames if frames else None,
+        'keyframes': int(np.sum(complete & (events['name'] == 'ProcessNewKeyFrame'))),
+        'local_ba': len(ba_aborted),
+        'local_ba_aborted': int(np.sum(ba_aborted == 1)),
+        'ba_interrupts': int(np.sum((events['phase'] == 'i') & (events['name'] == 'InterruptBA'))),
+        'loops_closed': int(np.sum(complete & (events['name'] == 'CorrectLoop'))),
+        'track_during_local_ba': overlap_length(track[0], track[1], local_ba[0], local_ba[1]) /
+        union_length(track[0], track[1]) if len(track[0]) else None,
+    }
+    for thread in THREADS:
+        metrics[f'utilisation_{thread}'] = busy[thread] / span if thread in busy and span else None
+        lock_starts, lock_ends, _ = select(thread=thread, category=LOCK_CATEGORY)
+        metrics[f'lock_wait_ms_{thread}'] = float(np.sum(lock_ends - lock_starts)) if thread in busy else None
+
+    # Bottleneck: busiest thread and its stage with the most time of its own (not a wait)
+    if busy:
+        bottleneck = max(busy, key=busy.get)
+        candidates = [s for s in stats if s['thread'] == bottleneck and s['category'] != LOCK_CATEGORY]
+        metrics['bottleneck_thread'] = bottleneck
+        metrics['limiting_stage'] = max(candidates, key=lambda s: _self_time(events, s))['stage'] \
+            if candidates else None
+    else:
+        metrics['bottleneck_thread'] = metrics['limiting_stage'] = None
+    return stats, metrics
+
+def _self_time(events, stage):
+    """Time of a stage not spent in stages nested inside it on the same thread"""
+    complete = (events['phase'] == 'X') & (events['thread'] == stage['thread'])
+    outer = complete & (events['name'] == stage['stage'])
+    order = np.argsort(events['start'][outer], kind='stable')
+    outer_starts = events['start'][outer][order]
+    outer_ends = outer_starts + events['duration'][outer][order]
+    inner = complete & ~outer
+    inner_starts = events['start'][inner]
+    inner_ends = inner_starts + events['duration'][inner]
+    # Inner events lie inside an outer one when they start within it (scopes nest on one thread)
+    position = np.searchsorted(outer_starts, inner_starts, side='right') - 1
+    nested = (position >= 0) & (inner_starts < outer_ends[np.maximum(position, 0)]) & \
+        (inner_starts >= outer_starts[np.maximum(position, 0)])
+    return stage['total_ms'] - union_length(inner_starts[nested], inner_ends[nested])
+
+def load_trace(run_dir=None, archive=None, run=None):
+    """Parsed trace of a run directory or an archived run, None when not recorded"""
+    if archive is not None:
+        return archive.trace(run) if archive.has(run, TRACE_FILE) else None
+    trace_file = Path(run_dir) / TRACE_FILE
+    if not trace_file.exists():
+        return None
+    with open(trace_file, 'r') as f:
+        return json.load(f)
+
+def collect_traces(paths):
+    """(campaign, run, trace) of every run with a recorded trace below the given paths"""
+    found = []
+    for path in paths:
+        path = Path(path)
+        if (path / TRACE_FILE).exists():
+            found.append((path.parent.name, path.name, load_trace(path)))
+            continue
+
+        archived = set()
+        if archive_path_for(path).exists():
+            with CampaignArchive(archive_path_for(path)) as archive:
+                for run in archive.runs():
+                    trace = load_trace(archive=archive, run=run)
+                    archived.add(run)
+                    if trace is not None:
+                        found.append((path.name, run, trace))
+        for trace_file in sorted(path.glob(f'**/quick_eval_*/{TRACE_FILE}')):
+            if trace_file.parent.name not in archived:
+                found.append((path.name, trace_file.parent.name, load_trace(trace_file.parent)))
+    return found
+
+def _cell(value):
+    if value is None:
+        return ''
+    return f'{value:.4f}' if isinstance(value, float) else value
+
+def write_runs_csv(rows, filepath):
+    """Write one row of pipeline metrics per run"""
+    fields = ['Campaign', 'Difficulty', 'Sequence', 'Run'] + list(rows[0]['metrics'].keys())
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([row['campaign'], row['difficulty'], row['sequence'], row['run']] +
+                            [_cell(v) for v in row['metrics'].values()])
+
+def write_stages_csv(rows, filepath):
+    """Write one row per run, thread and stage"""
+    fields = ['thread', 'stage', 'category', 'calls', 'total_ms', 'mean_ms', 'p95_ms', 'max_ms', 'load', 'share_of_thread']
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Campaign', 'Difficulty', 'Sequence', 'Run'] + fields)
+        for row in rows:
+            for stage in row['stages']:
+                writer.writerow([row['campaign'], row['difficulty'], row['sequence'], row['run']] +
+                                [_cell(stage[field]) for field in fields])
+
+def campaign_stage_load(rows):
+    """{campaign: {'thread/stage': mean load over the campaign's runs}}, runs without a stage count as 0"""
+    campaigns = {}
+    for row in rows:
+        campaigns.setdefault(row['campaign'], []).append(
+            {f"{s['thread']}/{s['stage']}": s['load'] for s in row['stages']})
+    return {campaign: {key: float(np.mean([run.get(key, 0.0) for run in runs]))
+                       for key in set().union(*runs)}
+            for campaign, runs in campaigns.items()}
+
+def plot_stage_load(rows, output_dir):
+    """Mean stage load (busy ms per ms of run) per campaign, largest stages first"""
+    loads = campaign_stage_load(rows)
+    campaigns = sorted(loads)
+    keys = sorted(set().union(*loads.values()), key=lambda k: max(loads[c].get(k, 0.0) for c in campaigns))
+
+    fig, ax = plt.subplots(figsize=(12, max(4, 0.35 * len(keys) * len(campaigns) + 1.5)))
+    y = np.arange(len(keys))
+    height = 0.8 / len(campaigns)
+    for i, campaign in enumerate(campaigns):
+        ax.barh(y + (i - (len(campaigns) - 1) / 2) * height, [loads[campaign].get(k, 0.0) for k in keys],
+                height, label=campaign, color=CAMPAIGN_COLORS[i % len(CAMPAIGN_COLORS)], alpha=0.8)
+
+    ax.set_yticks(y)
+    ax.set_yticklabels(keys, fontsize=8)
+    ax.set_xlabel('Stage load (busy time / run time)', fontsize=12, fontweight='bold')
+    ax.set_title('Pipeline Stage Load per Thread', fontsize=14, fontweight='bold')
+    ax.legend(loc='lower right')
+    ax.grid(axis='x', alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(output_dir / 'pipeline_stage_load.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', type=Path, default=CAMPAIGN_DIRS,
+                        help='campaign or run directories (default: baseline and refine output)')
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    found = collect_traces(args.paths)
+    if not found:
+        print(f"✗ No {TRACE_FILE} found (run with ORBSLAM_TRACE=1)")
+        return 1
+
+    rows = []
+    for campaign, run, trace in found:
+        stats, metrics = analyze_trace(parse_trace(trace))
+        difficulty, sequence = sequence_of(run)
+        rows.append({'campaign': campaign, 'run': run, 'difficulty': difficulty, 'sequence': sequence,
+                     'stages': stats, 'metrics': metrics})
+        m = metrics
+        print(f"  {campaign}/{run}: {m['frames']} frames, "
+              + ', '.join(f"{thread} {m[f'utilisation_{thread}'] * 100:.0f}%" for thread in THREADS
+                          if m[f'utilisation_{thread}'] is not None)
+              + f", local BA aborted {m['local_ba_aborted']}/{m['local_ba']}"
+              + f" → limited by {m['bottleneck_thread']}/{m['limiting_stage']}")
+
+    for campaign, loads in sorted(campaign_stage_load(rows).items()):
+        top = sorted(loads.items(), key=lambda item: -item[1])[:5]
+        print(f"{campaign}: " + ', '.join(f"{key} {load:.2f}" for key, load in top))
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    write_runs_csv(rows, args.output_dir / 'pipeline_runs.csv')
+    write_stages_csv(rows, args.output_dir / 'pipeline_stages.csv')
+    plot_stage_load(rows, args.output_dir)
+    print(f"✓ Analysed {len(rows)} traces: {args.output_dir / 'pipeline_runs.csv'}, "
+          f"{args.output_dir / 'pipeline_stages.csv'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
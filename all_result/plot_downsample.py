@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Shape-preserving downsampling for plots
+Reduces long series to a point budget before they are handed to matplotlib,
+so trajectory and error-over-time plots of long sequences render quickly and
+stay small at dpi=300. Two downsamplers are available:
+
+    lttb     Largest-Triangle-Three-Buckets, keeps the visual shape of a
+             line; the global minimum and maximum are always kept as well
+    minmax   per bucket the smallest and largest value of every column,
+             guarantees every spike survives (used for 2D paths and scatters)
+
+The budget defaults to PLOT_POINT_BUDGET points (environment variable,
+default 2000, 0 disables downsampling).
+
+Usage:
+    from plot_downsample import plot_series, scatter_series
+    plot_series(ax, stamps, errors, color='#3498db')
+    scatter_series(ax, xyz[:, 0], xyz[:, 1], c=errors, cmap='viridis')
+"""
+
+import os
+import numpy as np
+
+POINT_BUDGET = int(os.environ.get('PLOT_POINT_BUDGET', 2000))
+
+def lttb_indices(x, y, budget):
+    """Indices of the Largest-Triangle-Three-Buckets selection, extremes of y included"""
+    n = len(x)
+    if budget <= 0 or n <= budget or budget < 3:
+        return np.arange(n)
+
+    # First and last point are kept, budget - 2 buckets in between
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    selected = np.empty(budget, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(budget - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i == budget - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x = x[stop:edges[i + 2]].mean()
+            avg_y = y[stop:edges[i + 2]].mean()
+        # Twice the triangle area between the previous selection, each candidate and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return np.unique(np.concatenate([selected, [np.argmin(y), np.argmax(y)]]))
+
+def minmax_indices(values, budget):
+    """Indices of the minimum and maximum of every column within equal index buckets"""
+    values = np.asarray(values)
+    n = len(values)
+    if n == 0:
+        return np.arange(0)
+    columns = values.reshape(n, -1)
+    buckets = budget // (2 * columns.shape[1])
+    if budget <= 0 or n <= budget or buckets < 1:
+        return np.arange(n)
+
+    bucket = np.arange(n) * buckets // n
+    starts = np.searchsorted(bucket, np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+
+    keep = [np.array([0, n - 1])]
+    for column in columns.T:
+        # Sorted by bucket, then by value: each bucket's first / last entry is its min / max
+        order = np.lexsort((column, bucket))
+        keep.extend([order[starts], order[ends]])
+    return np.unique(np.concatenate(keep))
+
+def downsample_indices(x, y, budget=None, method='lttb'):
+    """Indices of the points to draw of a series"""
+    budget = POINT_BUDGET if budget is None else budget
+    if method == 'lttb' and np.ndim(y) == 1:
+        return lttb_indices(np.asarray(x, dtype=float), np.asarray(y, dtype=float), budget)
+    if method in ('lttb', 'minmax'):
+        return minmax_indices(y, budget)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+def downsample(x, y, budget=None, method='lttb'):
+    """(x, y) reduced to about budget points"""
+    x, y = np.asarray(x), np.asarray(y)
+    index = downsample_indices(x, y, budget, method)
+    return x[index], y[index]
+
+def plot_series(ax, x, y, *args, budget=None, method='lttb', **kwargs):
+    """ax.plot of a downsampled series"""
+    x, y = downsample(x, y, budget, method)
+    return ax.plot(x, y, *args, **kwargs)
+
+def scatter_series(ax, x, y, c=None, budget=None, **kwargs):
+    """ax.scatter of a downsampled point set, keeping the extremes of c (or of x and y)"""
+    x, y = np.asarray(x), np.asarray(y)
+    index = minmax_indices(np.column_stack([x, y]) if c is None else np.asarray(c),
+                           POINT_BUDGET if budget is None else budget)
+    if c is not None:
+        kwargs['c'] = np.asarray(c)[index]
+    return ax.scatter(x[index], y[index], **kwargs)
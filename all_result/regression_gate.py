@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Performance regression gate
+Compares a fresh evaluation campaign against a stored reference campaign
+(per-sequence tracking time, throughput, success rate and APE RMSE) and exits
+non-zero when any metric got worse by more than its tolerance.
+
+Usage:
+    python regression_gate.py REFERENCE CURRENT [--save-summary current.json]
+
+REFERENCE and CURRENT are campaign directories (e.g. baseline_output),
+campaign archives (campaign.zip) or JSON summaries written earlier with
+--save-summary.
+"""
+
+import argparse
+import json
+import re
+import sys
+import numpy as np
+from pathlib import Path
+
+from analyze_results import extract_metrics_from_file, extract_runtime_from_log
+from campaign_archive import archived_runs
+
+# quick_eval_<difficulty>_<sequence>_<YYYYmmdd>_<HHMMSS>[_r<run index>_j<job id>] (tools/work_queue.py)
+RUN_DIR_PATTERN = re.compile(r'^quick_eval_(easy|medium|hard)_(\w+?)_(\d{8}_\d{6})(?:_r\d+_j\d+)?$')
+
+# metric -> (label, unit scale, lower is better, per-sequence aggregate)
+GATE_METRICS = {
+    'median_time': ('Median time (ms)', 1e3, True, 'median'),
+    'p99_time': ('P99 time (ms)', 1e3, True, 'median'),
+    'throughput': ('Throughput (fps)', 1.0, False, 'median'),
+    'success_rate': ('Success rate', 1.0, False, 'mean'),
+    'rmse': ('APE RMSE (m)', 1.0, True, 'median'),
+}
+
+# Default relative tolerance per metric; success rate uses an absolute one
+DEFAULT_TOLERANCES = {
+    'median_time': 0.10,
+    'p99_time': 0.20,
+    'throughput': 0.10,
+    'success_rate': 0.0,
+    'rmse': 0.10,
+}
+
+# Robust standard deviations of run-to-run noise allowed on top of the tolerance
+DEFAULT_NOISE_SIGMA = 3.0
+
+# Normal-consistent scale factor for the median absolute deviation
+MAD_TO_STD = 1.4826
+
+def make_run(name, data, runtime):
+    """Gate metrics of a run from its parsed evo statistics and runtime"""
+    name_match = RUN_DIR_PATTERN.match(name)
+    run = {
+        'run': name,
+        'difficulty': name_match.group(1) if name_match else 'unknown',
+        'sequence': name_match.group(2) if name_match else 'unknown',
+        'num_poses': 0,
+        'rmse': None,
+        'median_time': runtime.get('median_time'),
+        'p99_time': runtime.get('p99_time'),
+        'throughput': 1.0 / runtime['mean_time'] if runtime.get('mean_time') else None,
+    }
+
+    if data:
+        if data['difficulty'] != 'unknown':
+            run['difficulty'], run['sequence'] = data['difficulty'], data['sequence']
+        run['num_poses'] = data['num_poses']
+        run['rmse'] = data['metrics'].get('rmse')
+
+    run['success_rate'] = 1.0 if run['num_poses'] > 0 else 0.0
+    return run
+
+def extract_run(run_dir):
+    """Extract the gate metrics of a single quick_eval_* run directory"""
+    run_dir = Path(run_dir)
+    stats_file = run_dir / 'evo_statistics.txt'
+    log_file = run_dir / 'orbslam.log'
+    data = extract_metrics_from_file(stats_file) if stats_file.exists() else None
+    runtime = extract_runtime_from_log(log_file) if log_file.exists() else {}
+    return make_run(run_dir.name, data, runtime)
+
+def collect_campaign(path):
+    """Load per-run records from a campaign directory or a JSON summary"""
+    path = Path(path)
+    if path.is_file() and path.suffix == '.json':
+        with open(path, 'r') as f:
+            return json.load(f)['runs']
+
+    archived = archived_runs(path)
+    runs = [make_run(name, record if record['evaluated'] else None,
+                     record['runtime'])
+            for name, record in sorted(archived.items())]
+    if path.is_file():
+        return runs
+
+    for run_dir in sorted(p for p in path.glob('**/quick_eval_*') if p.is_dir()):
+        if run_dir.name in archived:
+            continue
+        if (run_dir / 'orbslam.log').exists() or (run_dir / 'evo_statistics.txt').exists():
+            runs.append(extract_run(run_dir))
+    return runs
+
+def group_by_sequence(runs):
+    """Group run records by '<difficulty>_<sequence>'"""
+    groups = {}
+    for run in runs:
+        groups.setdefault(f"{run['difficulty']}_{run['sequence']}", []).append(run)
+    return groups
+
+def robust_noise(values):
+    """Robust run-to-run standard deviation (scaled MAD), 0 for a single run"""
+    if len(values) < 2:
+        return 0.0
+    return MAD_TO_STD * float(np.median(np.abs(values - np.median(values))))
+
+def compare_metric(metric, ref_runs, cur_runs, tolerance, sigma):
+    """Compare one metric of one sequence, returns a result row or None"""
+    _, _, lower_is_better, aggregate = GATE_METRICS[metric]
+    ref = np.array([r[metric] for r in ref_runs if r[metric] is not None], dtype=float)
+    cur = np.array([r[metric] for r in cur_runs if r[metric] is not None], dtype=float)
+    if ref.size == 0 or cur.size == 0:
+        return None
+
+    if aggregate == 'mean':
+        ref_value, cur_value = float(ref.mean()), float(cur.mean())
+        # Binomial standard error of the current success rate
+        noise = float(np.sqrt(ref_value * (1 - ref_value) / cur.size))
+        allowed = max(tolerance, sigma * noise)
+    else:
+        ref_value, cur_value = float(np.median(ref)), float(np.median(cur))
+        noise = max(robust_noise(ref), robust_noise(cur))
+        allowed = max(tolerance * abs(ref_value), sigma * noise)
+
+    delta = cur_value - ref_value
+    worse_by = delta if lower_is_better else -delta
+
+    return {
+        'metric': metric,
+        'reference': ref_value,
+        'current': cur_value,
+        'delta': delta,
+        'allowed': allowed,
+        'regression': worse_by > allowed,
+        'improvement': -worse_by > allowed,
+    }
+
+def run_gate(ref_runs, cur_runs, tolerances, sigma, allow_missing=False):
+    """Compare two campaigns, returns (rows, passed)"""
+    ref_groups = group_by_sequence(ref_runs)
+    cur_groups = group_by_sequence(cur_runs)
+
+    rows = []
+    for key in sorted(ref_groups):
+        if key not in cur_groups:
+            rows.append({'sequence': key, 'metric': None, 'missing': True,
+                         'regression': not allow_missing})
+            continue
+        for metric in GATE_METRICS:
+            result = compare_metric(metric, ref_groups[key], cur_groups[key],
+                                    tolerances[metric], sigma)
+            if result:
+                result['sequence'] = key
+                rows.append(result)
+
+    passed = not any(row['regression'] for row in rows)
+    return rows, passed
+
+def format_table(rows):
+    """Format the comparison as a compact text table"""
+    lines = [f"{'Sequence':<22} {'Metric':<18} {'Reference':>10} {'Current':>10} "
+             f"{'Delta':>9} {'Allowed':>9}  Status",
+             '-' * 92]
+
+    for row in rows:
+        if row.get('missing'):
+            status = 'FAIL' if row['regression'] else 'skip'
+            lines.append(f"{row['sequence']:<22} {'(missing run)':<18} {'':>10} {'':>10} "
+                         f"{'':>9} {'':>9}  {status}")
+            continue
+
+        label, scale, _, aggregate = GATE_METRICS[row['metric']]
+        if aggregate == 'mean':
+            delta = f"{row['delta'] * 100:+.1f}pp"
+            allowed = f"{row['allowed'] * 100:.1f}pp"
+        else:
+            delta = f"{row['delta'] / row['reference'] * 100:+.1f}%" if row['reference'] else 'n/a'
+            allowed = f"{row['allowed'] * scale:.3g}"
+
+        status = 'FAIL' if row['regression'] else ('better' if row['improvement'] else 'ok')
+        lines.append(f"{row['sequence']:<22} {label:<18} {row['reference'] * scale:>10.4g} "
+                     f"{row['current'] * scale:>10.4g} {delta:>9} {allowed:>9}  {status}")
+
+    return '\n'.join(lines)
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('reference', type=Path, help='reference campaign directory or JSON summary')
+    parser.add_argument('current', type=Path, help='current campaign directory or JSON summary')
+    for metric, default in DEFAULT_TOLERANCES.items():
+        parser.add_argument(f"--{metric.replace('_', '-')}-tol", type=float, default=default,
+                            dest=f'{metric}_tol',
+                            help=f'allowed worsening of {GATE_METRICS[metric][0]} (default {default})')
+    parser.add_argument('--sigma', type=float, default=DEFAULT_NOISE_SIGMA,
+                        help='run-to-run noise multiplier (default %(default)s)')
+    parser.add_argument('--allow-missing', action='store_true',
+                        help='do not fail when a reference sequence has no current run')
+    parser.add_argument('--save-summary', type=Path, default=None,
+                        help='store the current campaign as a JSON summary (future reference)')
+    args = parser.parse_args()
+
+    ref_runs = collect_campaign(args.reference)
+    cur_runs = collect_campaign(args.current)
+    if not ref_runs:
+        print(f"✗ No runs found in reference: {args.reference}")
+        return 2
+
+    if args.save_summary:
+        with open(args.save_summary, 'w') as f:
+            json.dump({'source': str(args.current), 'runs': cur_runs}, f, indent=2)
+        print(f"✓ Saved campaign summary: {args.save_summary}")
+
+    tolerances = {metric: getattr(args, f'{metric}_tol') for metric in GATE_METRICS}
+    rows, passed = run_gate(ref_runs, cur_runs, tolerances, args.sigma, args.allow_missing)
+
+    print(f"Reference: {args.reference} ({len(ref_runs)} runs)")
+    print(f"Current:   {args.current} ({len(cur_runs)} runs)")
+    print()
+    print(format_table(rows))
+    print()
+
+    regressions = sum(1 for row in rows if row['regression'])
+    if passed:
+        print("✓ PASS: no performance regressions")
+        return 0
+    print(f"✗ FAIL: {regressions} regression(s)")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Columnar results table
+One NumPy structured array holds the results of every run of every campaign,
+one row per (method, difficulty, sequence, run), with a typed column for each
+APE metric, runtime statistic and tracking metric. The analysis scripts build
+it once from the collected results and compute matches, improvements,
+group-bys and exports as whole-column operations on it.
+
+Missing values are NaN in float columns and -1 in integer columns; rows of
+sequences a method has no run for (see take) have status 'missing'.
+
+Usage:
+    from results_table import build_table, collect_campaign, align, take, improvement_percent
+    table = build_table(collect_campaign(BASELINE_DIR, 'Baseline') + collect_campaign(REFINE_DIR, 'Refined'))
+    rows = take(table, align(table, 'Baseline', difficulties, sequences))
+"""
+
+import csv
+import numpy as np
+from pathlib import Path
+
+from campaign_archive import CampaignArchive, archive_path_for, archived_runs, read_run_record
+from tracking_states import analyze_campaign, load_sequence_info, load_states
+
+METRIC_COLUMNS = ['max', 'mean', 'median', 'min', 'rmse', 'sse', 'std']
+RUNTIME_COLUMNS = ['median_time', 'mean_time', 'p99_time', 'wall_time', 'fps']
+TRACKING_FLOAT_COLUMNS = ['coverage', 'reloc_latency_mean_frames']
+TRACKING_INT_COLUMNS = ['failures', 'recoveries', 'time_to_init_frames']
+
+# Value of an integer column without data
+MISSING = -1
+
+RESULT_DTYPE = np.dtype(
+    [('method', 'U16'), ('difficulty', 'U16'), ('sequence', 'U64'), ('run', 'U128'),
+     ('status', 'U8'), ('run_state', 'U16'), ('archived', '?'), ('location', 'O'),
+     ('num_poses', 'i8'), ('scale', 'f8')]
+    + [(name, 'f8') for name in METRIC_COLUMNS + RUNTIME_COLUMNS + TRACKING_FLOAT_COLUMNS]
+    + [(name, 'i8') for name in TRACKING_INT_COLUMNS])
+
+def _missing_row():
+    row = np.zeros((), dtype=RESULT_DTYPE)
+    row['status'] = 'missing'
+    for name in RESULT_DTYPE.names:
+        kind = RESULT_DTYPE[name].kind
+        if kind == 'f':
+            row[name] = np.nan
+        elif kind == 'i':
+            row[name] = MISSING
+        elif kind == 'O':
+            row[name] = ''
+    return row
+
+MISSING_ROW = _missing_row()
+
+def _value(value, missing):
+    return missing if value is None else value
+
+def collect_campaign(campaign_dir, method, sequence_info=None):
+    """
+    Result dicts of the evaluated runs of one campaign, read from its archive
+    and its unarchived run directories: APE metrics, runtime, run status and,
+    for runs that recorded tracking states, tracking metrics.
+    """
+    campaign_dir = Path(campaign_dir)
+    archived = archived_runs(campaign_dir)
+    results = []
+    for record in archived.values():
+        if record['evaluated']:
+            record['archive'] = archive_path_for(campaign_dir)
+            results.append(record)
+
+    for stats_file in sorted(campaign_dir.glob('**/evo_statistics.txt')):
+        if stats_file.parent.name not in archived:
+            record = read_run_record(stats_file.parent)
+            record['run_dir'] = stats_file.parent
+            results.append(record)
+
+    extract_tracking(results, load_sequence_info() if sequence_info is None else sequence_info)
+    for record in results:
+        record['method'] = method
+    return results
+
+def load_run_states(result):
+    """Per-frame tracking states of a result's run, or None"""
+    if 'archive' in result:
+        with CampaignArchive(result['archive']) as archive:
+            return load_states(archive=archive, run=result['run'])
+    return load_states(result['run_dir'])
+
+def extract_tracking(results, sequence_info):
+    """Add coverage and failure metrics to the results whose runs recorded tracking states"""
+    states = [load_run_states(result) for result in results]
+    recorded = [i for i, s in enumerate(states) if s is not None]
+    info = [sequence_info.get((results[i]['difficulty'], results[i]['sequence']), (None, None))
+            for i in recorded]
+
+    # All runs in one pass; unknown sequence lengths count as the recorded frames
+    metrics, _ = analyze_campaign([states[i] for i in recorded],
+                                  [total or 0 for total, _ in info],
+                                  [np.nan if period is None else period for _, period in info])
+    for i, tracking in zip(recorded, metrics):
+        results[i]['tracking'] = tracking
+
+def build_table(results):
+    """
+    Table of collected result dicts (see collect_campaign: difficulty,
+    sequence, num_poses, scale, metrics, method and optionally run, runtime,
+    run_status, tracking, archive or run_dir). A run is 'success' when evo
+    compared at least one pose, else 'failed'; run_state is the final state
+    tools/run_orbslam.py recorded, empty for runs without a run_status.json.
+    """
+    rows = []
+    for result in results:
+        metrics = result.get('metrics', {})
+        runtime = result.get('runtime', {})
+        tracking = result.get('tracking') or {}
+        run_status = result.get('run_status') or {}
+        location = result.get('archive', result.get('run_dir', ''))
+        rows.append(
+            (result['method'], result['difficulty'], result['sequence'], result.get('run', ''),
+             'success' if result['num_poses'] > 0 else 'failed', run_status.get('state', ''),
+             'archive' in result, str(location),
+             result['num_poses'], _value(result.get('scale'), np.nan))
+            + tuple(metrics.get(name, np.nan) for name in METRIC_COLUMNS)
+            + tuple(runtime.get(name, np.nan) for name in RUNTIME_COLUMNS)
+            + tuple(_value(tracking.get(name), np.nan) for name in TRACKING_FLOAT_COLUMNS)
+            + tuple(_value(tracking.get(name), MISSING) for name in TRACKING_INT_COLUMNS))
+    return np.array(rows, dtype=RESULT_DTYPE)
+
+def sequence_keys(difficulties, sequences):
+    """'<difficulty>_<sequence>' labels of columns or lists"""
+    return np.char.add(np.char.add(np.asarray(difficulties, dtype=str), '_'), np.asarray(sequences, dtype=str))
+
+def _sequence_codes(*columns):
+    """Integer codes of (difficulty, sequence) pairs, comparable across the given column pairs"""
+    sizes = [len(difficulties) for difficulties, _ in columns]
+    _, difficulty_codes = np.unique(np.concatenate([np.asarray(d, dtype=str) for d, _ in columns]),
+                                    return_inverse=True)
+    sequence_labels, sequence_codes = np.unique(np.concatenate([np.asarray(s, dtype=str) for _, s in columns]),
+                                                return_inverse=True)
+    codes = difficulty_codes.astype(np.int64) * len(sequence_labels) + sequence_codes
+    return np.split(codes, np.cumsum(sizes)[:-1])
+
+def match(table, method_a, method_b):
+    """
+    (rows of method_a, rows of method_b) of the sequences both methods ran,
+    in table order of method_a; a sequence run several times by method_b
+    is matched to its first run.
+    """
+    rows_a = np.flatnonzero(table['method'] == method_a)
+    rows_b = np.flatnonzero(table['method'] == method_b)
+    if not len(rows_b):
+        return rows_a[:0], rows_b
+    codes_a, codes_b = _sequence_codes((table['difficulty'][rows_a], table['sequence'][rows_a]),
+                                       (table['difficulty'][rows_b], table['sequence'][rows_b]))
+    codes_b, first_b = np.unique(codes_b, return_index=True)
+    position = np.minimum(np.searchsorted(codes_b, codes_a), len(codes_b) - 1)
+    found = codes_b[position] == codes_a
+    return rows_a[found], rows_b[first_b[position[found]]]
+
+def align(table, method, difficulties, sequences):
+    """
+    Row of the last collected run of method for each (difficulty, sequence),
+    -1 where there is none. Repeated runs of a sequence are not combined:
+    only one represents it (regression_gate.py compares all repeats).
+    """
+    rows = np.flatnonzero(table['method'] == method)
+    if not len(rows):
+        return np.full(len(difficulties), MISSING)
+    codes, wanted = _sequence_codes((table['difficulty'][rows], table['sequence'][rows]),
+                                    (difficulties, sequences))
+
+    order = np.argsort(codes, kind='stable')
+    position = np.maximum(np.searchsorted(codes[order], wanted, side='right') - 1, 0)
+    found = codes[order][position] == wanted
+    return np.where(found, rows[order[position]], MISSING)
+
+def take(table, index):
+    """Rows of table at index, MISSING_ROW where the index is -1"""
+    index = np.asarray(index)
+    if not len(table):
+        return np.full(len(index), MISSING_ROW, dtype=RESULT_DTYPE)
+    rows = table[np.maximum(index, 0)]
+    rows[index < 0] = MISSING_ROW
+    return rows
+
+def percent_change(base, new):
+    """(new - base) / base in percent, NaN where base is not positive or either value is missing"""
+    base, new = np.asarray(base, dtype=float), np.asarray(new, dtype=float)
+    return _percent(new - base, base)
+
+def improvement_percent(base, new):
+    """(base - new) / base in percent, NaN where base is not positive or either value is missing"""
+    base, new = np.asarray(base, dtype=float), np.asarray(new, dtype=float)
+    return _percent(base - new, base)
+
+def _percent(delta, base):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(base > 0, delta / base * 100, np.nan)
+
+def group_mean(groups, *columns):
+    """(group labels, row counts, mean of each column per group)"""
+    labels, inverse = np.unique(groups, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(labels))
+    means = [np.bincount(inverse, weights=column, minlength=len(labels)) / counts for column in columns]
+    return labels, counts, means
+
+def export_cells(values, present):
+    """Python values of a column for csv.writer, '' where there is no value"""
+    return [value if keep else '' for value, keep in zip(np.asarray(values).tolist(), present.tolist())]
+
+def write_csv(table, filepath):
+    """Write the table, one row per run"""
+    columns = [name for name in RESULT_DTYPE.names if name != 'location']
+    cells = []
+    for name in columns:
+        values = table[name]
+        if values.dtype.kind == 'f':
+            cells.append(export_cells(values, ~np.isnan(values)))
+        elif values.dtype.kind == 'i':
+            cells.append(export_cells(values, values != MISSING))
+        else:
+            cells.append(values.tolist())
+
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(zip(*cells))
+
+def to_dataframe(table):
+    """pandas DataFrame of the table, missing values as NaN (requires pandas)"""
+    import pandas as pd
+    frame = pd.DataFrame({name: table[name] for name in RESULT_DTYPE.names})
+    for name in RESULT_DTYPE.names:
+        if RESULT_DTYPE[name].kind == 'i':
+            frame[name] = frame[name].where(frame[name] != MISSING).astype('Int64')
+    return frame
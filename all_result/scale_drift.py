@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Sliding-window scale drift analysis
+Aligns every window of N consecutive poses to the ground truth with Umeyama's
+Sim(3) method and reports how the local scale, rotation, translation and
+alignment error drift along the trajectory. All windows are solved together
+from cumulative moments, so the cost is linear in the trajectory length.
+
+Usage:
+    python scale_drift.py [RUN_OR_CAMPAIGN_DIR ...] [--window 30] [--gt-root DIR]
+    python scale_drift.py RUN_DIR --gt GT_FILE --output-dir RUN_DIR
+
+Without arguments baseline_output and refine_output are analysed and one
+drift plot per sequence is written to analysis_output/scale_drift.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from pathlib import Path
+
+from plot_downsample import plot_series
+from umeyama import window_sums, windowed_umeyama
+
+# Configuration
+CAMPAIGN_DIRS = [Path("baseline_output"), Path("refine_output")]
+OUTPUT_DIR = Path("analysis_output") / "scale_drift"
+GT_ROOT = Path(__file__).resolve().parent.parent / "INTR6000P" / "INTR6000P_GT_POSES"
+
+RESULT_FILE = 'scale_drift.json'
+DEFAULT_WINDOW = 30
+
+# Same association tolerance as evo_ape's default (seconds)
+DEFAULT_MAX_DIFF = 0.01
+
+# quick_eval_<difficulty>_<sequence>_<YYYYmmdd>_<HHMMSS>[_r<run index>_j<job id>] (tools/work_queue.py)
+RUN_DIR_PATTERN = re.compile(r'^quick_eval_(easy|medium|hard)_(\w+?)_(\d{8}_\d{6})(?:_r\d+_j\d+)?$')
+GT_PATTERN = re.compile(r'Loaded \d+ stamps and poses from: (\S*INTR6000P_GT_POSES/(\w+)/(\w+)\.txt)')
+
+def load_tum_positions(filepath):
+    """Load timestamps and positions of a TUM trajectory file"""
+    data = np.loadtxt(filepath, comments='#', ndmin=2)
+    return data[:, 0], data[:, 1:4]
+
+def associate(ref_stamps, est_stamps, max_diff=DEFAULT_MAX_DIFF):
+    """Match every estimated pose to the closest reference stamp within max_diff"""
+    right = np.clip(np.searchsorted(ref_stamps, est_stamps), 1, len(ref_stamps) - 1)
+    left = right - 1
+    closest = np.where(np.abs(ref_stamps[left] - est_stamps) <= np.abs(ref_stamps[right] - est_stamps),
+                       left, right)
+    valid = np.abs(ref_stamps[closest] - est_stamps) <= max_diff
+    return closest[valid], np.flatnonzero(valid)
+
+def rotation_angle_deg(r_a, r_b):
+    """Angle of the relative rotation between two (batches of) rotation matrices"""
+    cos = (np.einsum('...ij,...ij->...', r_a, r_b) - 1) / 2
+    return np.degrees(np.arccos(np.clip(cos, -1, 1)))
+
+def analyze_drift(est_stamps, est, ref, window=DEFAULT_WINDOW):
+    """Local alignment along the trajectory relative to the global Sim(3) alignment"""
+    n = len(est)
+    if n < 3:
+        raise ValueError(f"Need at least 3 matched poses, got {n}")
+    window = min(window, n)
+
+    glob = {k: v[0] for k, v in windowed_umeyama(est, ref, n).items()}
+    local = windowed_umeyama(est, ref, window)
+
+    # Where the globally aligned window centroid lands w.r.t. the ground truth
+    aligned_centroid = glob['scale'] * local['centroid_est'] @ glob['rotation'].T + glob['translation']
+    offset = np.linalg.norm(local['centroid_ref'] - aligned_centroid, axis=1)
+
+    return {
+        'time': window_sums(est_stamps - est_stamps[0], window) / window,
+        'scale': local['scale'],
+        'scale_ratio': local['scale'] / glob['scale'],
+        'rotation_drift_deg': rotation_angle_deg(local['rotation'], glob['rotation']),
+        'translation_drift_m': offset,
+        'local_rmse': local['rmse'],
+        'global_scale': float(glob['scale']),
+        'global_rmse': float(glob['rmse']),
+        'window': window,
+        'num_poses': n,
+    }
+
+def summarize_drift(drift):
+    """Scalar summary of a drift analysis"""
+    ratio = drift['scale_ratio']
+    finite = np.isfinite(ratio)
+    if not finite.any():
+        return None
+    worst = int(np.nanargmax(np.abs(np.log(np.where(finite, ratio, 1.0)))))
+    return {
+        'num_poses': drift['num_poses'],
+        'window': drift['window'],
+        'num_windows': int(len(ratio)),
+        'global_scale': drift['global_scale'],
+        'global_rmse': drift['global_rmse'],
+        'local_scale_min': float(np.nanmin(drift['scale'])),
+        'local_scale_max': float(np.nanmax(drift['scale'])),
+        'scale_spread': float((np.nanmax(ratio) - np.nanmin(ratio))),
+        'worst_scale_ratio': float(ratio[worst]),
+        'worst_scale_time_s': float(drift['time'][worst]),
+        'max_rotation_drift_deg': float(np.nanmax(drift['rotation_drift_deg'])),
+        'max_translation_drift_m': float(np.nanmax(drift['translation_drift_m'])),
+        'max_local_rmse': float(np.nanmax(drift['local_rmse'])),
+    }
+
+def find_ground_truth(run_dir, gt_root=GT_ROOT):
+    """Ground truth file of a run, taken from its evo_statistics.txt"""
+    stats_file = run_dir / 'evo_statistics.txt'
+    if not stats_file.exists():
+        return None
+    match = GT_PATTERN.search(stats_file.read_text(errors='replace'))
+    if not match:
+        return None
+
+    recorded = Path(match.group(1))
+    if recorded.exists():
+        return recorded
+    local = Path(gt_root) / match.group(2) / f"{match.group(3)}.txt"
+    return local if local.exists() else None
+
+def find_runs(paths):
+    """Expand campaign directories into quick_eval_* run directories"""
+    runs = []
+    for path in paths:
+        path = Path(path)
+        if RUN_DIR_PATTERN.match(path.name) or (path / 'trajectory.txt').exists():
+            runs.append((path.parent.name, path))
+        else:
+            runs.extend((path.name, p) for p in sorted(path.glob('**/quick_eval_*')) if p.is_dir())
+    return runs
+
+def analyze_run(run_dir, gt_file, window=DEFAULT_WINDOW, max_diff=DEFAULT_MAX_DIFF):
+    """Drift analysis of one run directory, also stored as scale_drift.json"""
+    est_stamps, est = load_tum_positions(run_dir / 'trajectory.txt')
+    ref_stamps, ref = load_tum_positions(gt_file)
+
+    ref_idx, est_idx = associate(ref_stamps, est_stamps, max_diff)
+    drift = analyze_drift(est_stamps[est_idx], est[est_idx], ref[ref_idx], window)
+    summary = summarize_drift(drift)
+
+    result = dict(summary or {}, ground_truth=str(gt_file))
+    result['series'] = {k: np.round(drift[k], 6).tolist()
+                        for k in ('time', 'scale', 'rotation_drift_deg', 'translation_drift_m', 'local_rmse')}
+    with open(run_dir / RESULT_FILE, 'w') as f:
+        json.dump(result, f)
+
+    return drift, summary
+
+def plot_sequence_drift(sequence, entries, output_dir):
+    """Plot local scale, rotation, translation and error drift of one sequence"""
+    fig, axes = plt.subplots(4, 1, figsize=(12, 11), sharex=True)
+    colors = plt.cm.tab10.colors
+
+    for i, (label, drift) in enumerate(entries):
+        color = colors[i % len(colors)]
+        plot_series(axes[0], drift['time'], drift['scale'], color=color, linewidth=1.5,
+                    label=f"{label} (global {drift['global_scale']:.3f})")
+        axes[0].axhline(drift['global_scale'], color=color, linestyle='--', linewidth=0.8)
+        plot_series(axes[1], drift['time'], drift['rotation_drift_deg'], color=color, linewidth=1.5)
+        plot_series(axes[2], drift['time'], drift['translation_drift_m'], color=color, linewidth=1.5)
+        plot_series(axes[3], drift['time'], drift['local_rmse'], color=color, linewidth=1.5)
+
+    window = entries[0][1]['window']
+    axes[0].set_ylabel('Local scale', fontsize=11, fontweight='bold')
+    axes[0].set_title(f'Scale Drift: {sequence} (window = {window} poses)', fontsize=14, fontweight='bold')
+    axes[0].legend()
+    axes[1].set_ylabel('Rotation drift (°)', fontsize=11, fontweight='bold')
+    axes[2].set_ylabel('Centroid offset (m)', fontsize=11, fontweight='bold')
+    axes[3].set_ylabel('Local RMSE (m)', fontsize=11, fontweight='bold')
+    axes[3].set_xlabel('Time since first pose (s)', fontsize=12, fontweight='bold')
+    for ax in axes:
+        ax.grid(alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(output_dir / f'scale_drift_{sequence}.png', dpi=150, bbox_inches='tight')
+    plt.close()
+
+def write_summary_csv(rows, filepath):
+    """Write one summary row per analysed run"""
+    fields = ['Campaign', 'Sequence', 'Run'] + list(rows[0]['summary'].keys())
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            values = [round(v, 6) if isinstance(v, float) else v for v in row['summary'].values()]
+            writer.writerow([row['campaign'], row['sequence'], row['run']] + values)
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', type=Path, default=CAMPAIGN_DIRS,
+                        help='campaign or quick_eval_* run directories')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help='poses per alignment window (default %(default)s)')
+    parser.add_argument('--gt', type=Path, default=None,
+                        help='ground truth file (single run only)')
+    parser.add_argument('--gt-root', type=Path, default=GT_ROOT,
+                        help='INTR6000P_GT_POSES directory used when the recorded path is missing')
+    parser.add_argument('--max-diff', type=float, default=DEFAULT_MAX_DIFF,
+                        help='maximum timestamp difference for association (s)')
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    if args.window < 3:
+        parser.error('--window must be at least 3')
+    runs = find_runs(args.paths)
+    if args.gt and len(runs) != 1:
+        parser.error('--gt requires exactly one run directory')
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    rows, by_sequence = [], {}
+    for campaign, run_dir in runs:
+        name_match = RUN_DIR_PATTERN.match(run_dir.name)
+        sequence = f"{name_match.group(1)}_{name_match.group(2)}" if name_match else run_dir.name
+
+        gt_file = args.gt or find_ground_truth(run_dir, args.gt_root)
+        if not (run_dir / 'trajectory.txt').exists() or gt_file is None:
+            print(f"  - Skipping {run_dir}: trajectory or ground truth not found")
+            continue
+
+        try:
+            drift, summary = analyze_run(run_dir, gt_file, args.window, args.max_diff)
+        except ValueError as e:
+            print(f"  - Skipping {run_dir}: {e}")
+            continue
+        if summary is None:
+            continue
+
+        rows.append({'campaign': campaign, 'sequence': sequence, 'run': run_dir.name, 'summary': summary})
+        by_sequence.setdefault(sequence, []).append((campaign, drift))
+        print(f"  ✓ {campaign}/{sequence}: global scale {summary['global_scale']:.3f}, "
+              f"local {summary['local_scale_min']:.3f}-{summary['local_scale_max']:.3f}, "
+              f"max rotation drift {summary['max_rotation_drift_deg']:.2f}°")
+
+    if not rows:
+        print("✗ No runs with trajectory and ground truth found")
+        return 1
+
+    for sequence, entries in sorted(by_sequence.items()):
+        plot_sequence_drift(sequence, entries, args.output_dir)
+    write_summary_csv(rows, args.output_dir / 'scale_drift_summary.csv')
+
+    print(f"✓ Analysed {len(rows)} runs, results saved to: {args.output_dir.absolute()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+Memory-bounded streaming APE/RPE statistics
+Reads trajectories (or stored error arrays) in fixed-size blocks and
+accumulates mergeable statistics: exact moments (mean, std, rmse, min, max,
+sse), relative-error quantile sketches and a binned error profile. Partial
+results from chunks or workers combine exactly, so peak memory only depends
+on the chunk size, not on the sequence length.
+
+Each partial's APE is taken under its own Sim(3) alignment, so the merged APE
+statistics combine those per-partial errors. The merged alignment sums still
+give the exact APE RMSE of the combined data under a single alignment, which
+merge reports separately.
+
+Usage:
+    python streaming_stats.py evaluate trajectory.txt GT.txt [--save partial.json] [--plot profile.png]
+    python streaming_stats.py errors RUN_DIR/ape_results.zip [...]
+    python streaming_stats.py merge partial_a.json partial_b.json [--save merged.json]
+"""
+
+import argparse
+import json
+import math
+import sys
+import zipfile
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from itertools import islice
+from pathlib import Path
+
+DEFAULT_CHUNK_SIZE = 100000
+
+# Same association tolerance as evo_ape's default (seconds)
+DEFAULT_MAX_DIFF = 0.01
+
+# Quantile sketch: values are reported within this relative error
+DEFAULT_RELATIVE_ACCURACY = 0.005
+REPORTED_QUANTILES = {'median': 0.5, 'p90': 0.9, 'p95': 0.95, 'p99': 0.99}
+
+DEFAULT_PROFILE_BINS = 500
+
+class RunningMoments:
+    """Count, mean, M2, min, max and sum of squares, merged with Chan's formula"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sse = 0.0
+
+    @classmethod
+    def from_array(cls, values):
+        moments = cls()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size:
+            moments.count = int(values.size)
+            moments.mean = float(values.mean())
+            moments.m2 = float(np.square(values - moments.mean).sum())
+            moments.min = float(values.min())
+            moments.max = float(values.max())
+            moments.sse = float(np.square(values).sum())
+        return moments
+
+    def update(self, values):
+        return self.merge(RunningMoments.from_array(values))
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sse += other.sse
+        return self
+
+    def stats(self):
+        """Statistics with the same names and definitions as evo"""
+        if self.count == 0:
+            return {}
+        return {
+            'rmse': math.sqrt(self.sse / self.count),
+            'mean': self.mean,
+            'std': math.sqrt(self.m2 / self.count),
+            'min': self.min,
+            'max': self.max,
+            'sse': self.sse,
+        }
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        moments = cls()
+        moments.__dict__.update(data)
+        return moments
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch for non-negative values.
+
+    Values are counted in logarithmic buckets (gamma = (1 + a) / (1 - a)), so
+    every quantile is returned within relative accuracy a. Merging adds the
+    bucket counts, which is exact and order independent.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.count = 0
+        self.buckets = {}
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        positive = values[values > 0]
+        self.zero_count += int(values.size - positive.size)
+        self.count += int(values.size)
+
+        keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        return self
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different accuracies")
+        self.zero_count += other.zero_count
+        self.count += other.count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        return self
+
+    def quantile(self, q):
+        """Value at quantile q (0..1), None when empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'buckets': {str(k): v for k, v in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['relative_accuracy'])
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.buckets = {int(k): v for k, v in data['buckets'].items()}
+        return sketch
+
+class ErrorProfile:
+    """
+    Fixed number of time bins holding count, sum, min and max of the errors.
+
+    Profiles over different time ranges merge on the union of the ranges:
+    every bin is moved whole into the bin holding its center.
+    """
+
+    def __init__(self, start, end, bins=DEFAULT_PROFILE_BINS):
+        self.start, self.end, self.bins = float(start), float(end), int(bins)
+        self.count = np.zeros(self.bins, dtype=np.int64)
+        self.sum = np.zeros(self.bins)
+        self.min = np.full(self.bins, np.inf)
+        self.max = np.full(self.bins, -np.inf)
+
+    def update(self, stamps, values):
+        width = (self.end - self.start) / self.bins or 1.0
+        index = np.clip(((stamps - self.start) / width).astype(np.int64), 0, self.bins - 1)
+        self.count += np.bincount(index, minlength=self.bins)
+        self.sum += np.bincount(index, weights=values, minlength=self.bins)
+        np.minimum.at(self.min, index, values)
+        np.maximum.at(self.max, index, values)
+        return self
+
+    def rebinned(self, start, end, bins):
+        """Profile over another range and bin count"""
+        profile = ErrorProfile(start, end, bins)
+        filled = self.count > 0
+        width = (profile.end - profile.start) / profile.bins or 1.0
+        index = np.clip(((self.centers()[filled] - profile.start) / width).astype(np.int64),
+                        0, profile.bins - 1)
+        np.add.at(profile.count, index, self.count[filled])
+        np.add.at(profile.sum, index, self.sum[filled])
+        np.minimum.at(profile.min, index, self.min[filled])
+        np.maximum.at(profile.max, index, self.max[filled])
+        return profile
+
+    def merge(self, other):
+        if (other.start, other.end, other.bins) != (self.start, self.end, self.bins):
+            start, end = min(self.start, other.start), max(self.end, other.end)
+            bins = max(self.bins, other.bins)
+            self.__dict__.update(self.rebinned(start, end, bins).__dict__)
+            other = other.rebinned(start, end, bins)
+        self.count += other.count
+        self.sum += other.sum
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        return self
+
+    def centers(self):
+        return self.start + (np.arange(self.bins) + 0.5) * (self.end - self.start) / self.bins
+
+    def to_dict(self):
+        filled = self.count > 0
+        return {
+            'start': self.start, 'end': self.end, 'bins': self.bins,
+            'index': np.flatnonzero(filled).tolist(),
+            'count': self.count[filled].tolist(),
+            'sum': self.sum[filled].tolist(),
+            'min': self.min[filled].tolist(),
+            'max': self.max[filled].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(data['start'], data['end'], data['bins'])
+        index = np.asarray(data['index'], dtype=np.int64)
+        profile.count[index] = data['count']
+        profile.sum[index] = data['sum']
+        profile.min[index] = data['min']
+        profile.max[index] = data['max']
+        return profile
+
+class ErrorAccumulator:
+    """Moments plus quantile sketch (and optionally a time profile) of one error"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, profile=None):
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.profile = profile
+
+    def update(self, values, stamps=None):
+        self.moments.update(values)
+        self.sketch.update(values)
+        if self.profile is not None and stamps is not None:
+            self.profile.update(stamps, values)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        if self.profile is not None and other.profile is not None:
+            self.profile.merge(other.profile)
+        return self
+
+    def summary(self):
+        stats = self.moments.stats()
+        for name, q in REPORTED_QUANTILES.items():
+            stats[name] = self.sketch.quantile(q)
+        stats['count'] = self.moments.count
+        return stats
+
+    def to_dict(self):
+        data = {'moments': self.moments.to_dict(), 'sketch': self.sketch.to_dict()}
+        if self.profile is not None:
+            data['profile'] = self.profile.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        accumulator = cls(data['sketch']['relative_accuracy'])
+        accumulator.moments = RunningMoments.from_dict(data['moments'])
+        accumulator.sketch = QuantileSketch.from_dict(data['sketch'])
+        if 'profile' in data:
+            accumulator.profile = ErrorProfile.from_dict(data['profile'])
+        return accumulator
+
+class AlignmentMoments:
+    """
+    Sums needed by Umeyama's Sim(3) alignment, accumulated chunk by chunk.
+
+    Points are shifted by a fixed origin (the first chunk's centroids) to keep
+    the sums well conditioned; merging re-expresses the other sums in this
+    origin, which is exact.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.origin_x = np.zeros(3)
+        self.origin_y = np.zeros(3)
+        self.sum_x = np.zeros(3)
+        self.sum_y = np.zeros(3)
+        self.sum_xx = 0.0
+        self.sum_yy = 0.0
+        self.sum_yx = np.zeros((3, 3))
+
+    def update(self, est, ref):
+        if self.count == 0 and len(est):
+            self.origin_x, self.origin_y = est.mean(axis=0), ref.mean(axis=0)
+        x, y = est - self.origin_x, ref - self.origin_y
+        self.count += len(x)
+        self.sum_x += x.sum(axis=0)
+        self.sum_y += y.sum(axis=0)
+        self.sum_xx += float(np.einsum('ij,ij->', x, x))
+        self.sum_yy += float(np.einsum('ij,ij->', y, y))
+        self.sum_yx += y.T @ x
+        return self
+
+    def _moved(self, origin_x, origin_y):
+        """Sums expressed relative to another origin"""
+        dx, dy, n = origin_x - self.origin_x, origin_y - self.origin_y, self.count
+        moved = AlignmentMoments()
+        moved.count = n
+        moved.origin_x, moved.origin_y = origin_x, origin_y
+        moved.sum_x = self.sum_x - n * dx
+        moved.sum_y = self.sum_y - n * dy
+        moved.sum_xx = self.sum_xx - 2 * dx @ self.sum_x + n * dx @ dx
+        moved.sum_yy = self.sum_yy - 2 * dy @ self.sum_y + n * dy @ dy
+        moved.sum_yx = (self.sum_yx - np.outer(self.sum_y, dx) - np.outer(dy, self.sum_x)
+                        + n * np.outer(dy, dx))
+        return moved
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other._moved(other.origin_x, other.origin_y).__dict__)
+            return self
+        other = other._moved(self.origin_x, self.origin_y)
+        self.count += other.count
+        self.sum_x += other.sum_x
+        self.sum_y += other.sum_y
+        self.sum_xx += other.sum_xx
+        self.sum_yy += other.sum_yy
+        self.sum_yx += other.sum_yx
+        return self
+
+    def solve(self):
+        """Umeyama Sim(3) alignment of est onto ref, returns (scale, R, t)"""
+        if self.count < 3:
+            raise ValueError(f"Need at least 3 matched poses, got {self.count}")
+        n = self.count
+        mean_x, mean_y = self.sum_x / n, self.sum_y / n
+        var_x = self.sum_xx / n - mean_x @ mean_x
+        cov = self.sum_yx / n - np.outer(mean_y, mean_x)
+
+        u, d, vt = np.linalg.svd(cov)
+        sign = np.array([1.0, 1.0, np.sign(np.linalg.det(u) * np.linalg.det(vt))])
+        rotation = (u * sign) @ vt
+        scale = float(d @ sign / var_x)
+        translation = mean_y + self.origin_y - scale * rotation @ (mean_x + self.origin_x)
+        return scale, rotation, translation
+
+    def aligned_sse(self, scale, rotation, translation):
+        """Sum of squared APE translation errors of all points under (scale, R, t)"""
+        # Residual of a point: scale * R @ x + c - y with x, y relative to the origins
+        c = scale * rotation @ self.origin_x + translation - self.origin_y
+        return float(scale * scale * self.sum_xx + self.count * c @ c + self.sum_yy
+                     + 2 * scale * c @ rotation @ self.sum_x - 2 * c @ self.sum_y
+                     - 2 * scale * np.sum(rotation * self.sum_yx))
+
+    def to_dict(self):
+        return {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in self.__dict__.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        moments = cls()
+        for key, value in data.items():
+            setattr(moments, key, np.asarray(value, dtype=float) if isinstance(value, list) else value)
+        return moments
+
+def iter_tum_chunks(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (k, 8) blocks of a TUM trajectory file"""
+    with open(filepath, 'r') as f:
+        lines = (line for line in f if line.strip() and not line.startswith('#'))
+        while True:
+            block = list(islice(lines, chunk_size))
+            if not block:
+                break
+            yield np.array(' '.join(block).split(), dtype=np.float64).reshape(len(block), -1)[:, :8]
+
+def iter_npy_chunks(fileobj, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield blocks of a 1-D .npy array read from an open (possibly compressed) stream"""
+    version = np.lib.format.read_magic(fileobj)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(fileobj)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(fileobj)
+    if len(shape) != 1:
+        raise ValueError(f"Expected a 1-D array, got shape {shape}")
+
+    remaining = shape[0]
+    while remaining:
+        count = min(chunk_size, remaining)
+        data = fileobj.read(count * dtype.itemsize)
+        if len(data) != count * dtype.itemsize:
+            raise ValueError("Truncated .npy array")
+        yield np.frombuffer(data, dtype=dtype)
+        remaining -= count
+
+def _nearest(ref_stamps, est_stamps, max_diff):
+    """Indices of matched (ref, est) pairs, closest reference stamp within max_diff"""
+    right = np.clip(np.searchsorted(ref_stamps, est_stamps), 0, len(ref_stamps) - 1)
+    left = np.clip(right - 1, 0, len(ref_stamps) - 1)
+    closest = np.where(np.abs(ref_stamps[left] - est_stamps) <= np.abs(ref_stamps[right] - est_stamps),
+                       left, right)
+    valid = np.abs(ref_stamps[closest] - est_stamps) <= max_diff
+    return closest[valid], np.flatnonzero(valid)
+
+def associated_chunks(est_path, ref_path, chunk_size=DEFAULT_CHUNK_SIZE, max_diff=DEFAULT_MAX_DIFF):
+    """
+    Stream both (time-sorted) trajectories and yield matched blocks as
+    (stamps, est rows, ref rows); only a window of the reference is buffered.
+    """
+    ref_chunks = iter_tum_chunks(ref_path, chunk_size)
+    buffer = np.empty((0, 8))
+    ref_done = False
+
+    for est in iter_tum_chunks(est_path, chunk_size):
+        horizon = est[-1, 0] + max_diff
+        while not ref_done and (not len(buffer) or buffer[-1, 0] < horizon):
+            block = next(ref_chunks, None)
+            if block is None:
+                ref_done = True
+            else:
+                buffer = np.concatenate([buffer, block])
+        if not len(buffer):
+            break
+
+        ref_idx, est_idx = _nearest(buffer[:, 0], est[:, 0], max_diff)
+        if len(est_idx):
+            yield est[est_idx, 0], est[est_idx], buffer[ref_idx]
+
+        # Later estimated stamps are larger, older reference rows are no longer needed
+        buffer = buffer[buffer[:, 0] >= est[-1, 0] - max_diff]
+
+def quaternion_to_matrix(q):
+    """Batch of TUM quaternions (qx qy qz qw) to rotation matrices"""
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    x, y, z, w = q.T
+    return np.stack([
+        1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w),
+        2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w),
+        2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y),
+    ], axis=1).reshape(-1, 3, 3)
+
+def relative_translation_errors(est, ref, scale):
+    """RPE translation part between consecutive matched poses (delta = 1 frame)"""
+    est_rot, ref_rot = quaternion_to_matrix(est[:, 4:8]), quaternion_to_matrix(ref[:, 4:8])
+    est_step = scale * np.einsum('nji,nj->ni', est_rot[:-1], np.diff(est[:, 1:4], axis=0))
+    ref_step = np.einsum('nji,nj->ni', ref_rot[:-1], np.diff(ref[:, 1:4], axis=0))
+    return np.linalg.norm(est_step - ref_step, axis=1)
+
+def stream_evaluate(est_path, ref_path, chunk_size=DEFAULT_CHUNK_SIZE, max_diff=DEFAULT_MAX_DIFF,
+                    relative_accuracy=DEFAULT_RELATIVE_ACCURACY, bins=DEFAULT_PROFILE_BINS):
+    """
+    Two streaming passes: accumulate the Sim(3) alignment, then the APE/RPE
+    (translation part) statistics under that alignment.
+    """
+    alignment = AlignmentMoments()
+    start, end = math.inf, -math.inf
+    for stamps, est, ref in associated_chunks(est_path, ref_path, chunk_size, max_diff):
+        alignment.update(est[:, 1:4], ref[:, 1:4])
+        start, end = min(start, stamps[0]), max(end, stamps[-1])
+
+    scale, rotation, translation = alignment.solve()
+    ape = ErrorAccumulator(relative_accuracy, ErrorProfile(start, end, bins))
+    rpe = ErrorAccumulator(relative_accuracy)
+
+    previous = None
+    for stamps, est, ref in associated_chunks(est_path, ref_path, chunk_size, max_diff):
+        aligned = scale * est[:, 1:4] @ rotation.T + translation
+        ape.update(np.linalg.norm(aligned - ref[:, 1:4], axis=1), stamps)
+
+        # Carry the last pose over so pairs spanning two chunks are not lost
+        if previous is not None:
+            est, ref = np.concatenate([previous[0], est]), np.concatenate([previous[1], ref])
+        rpe.update(relative_translation_errors(est, ref, scale))
+        previous = (est[-1:], ref[-1:])
+
+    return {
+        'alignment': alignment,
+        'scale': scale,
+        'ape': ape,
+        'rpe': rpe,
+    }
+
+def stream_error_array(archive_path, chunk_size=DEFAULT_CHUNK_SIZE,
+                       relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Statistics of the error_array.npy stored in an evo results zip, read in blocks"""
+    accumulator = ErrorAccumulator(relative_accuracy)
+    with zipfile.ZipFile(archive_path) as archive, archive.open('error_array.npy') as f:
+        for block in iter_npy_chunks(f, chunk_size):
+            accumulator.update(block)
+    return accumulator
+
+def results_to_dict(results):
+    """Serializable form of stream_evaluate results (for merging later)"""
+    return {name: value.to_dict() if hasattr(value, 'to_dict') else value
+            for name, value in results.items()}
+
+def merge_partials(filepaths):
+    """
+    Merge saved partial results, returns {name: accumulator}. With alignment
+    sums, 'scale' and 'joint_ape' (count, rmse and sse of the APE under the
+    merged Sim(3) alignment) are added.
+    """
+    merged = {}
+    for filepath in filepaths:
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        for name, value in data.items():
+            if name == 'alignment':
+                partial = AlignmentMoments.from_dict(value)
+            elif isinstance(value, dict) and 'moments' in value:
+                partial = ErrorAccumulator.from_dict(value)
+            else:
+                continue
+            if name in merged:
+                merged[name].merge(partial)
+            else:
+                merged[name] = partial
+
+    alignment = merged.get('alignment')
+    if alignment is not None and alignment.count >= 3:
+        scale, rotation, translation = alignment.solve()
+        sse = max(alignment.aligned_sse(scale, rotation, translation), 0.0)
+        merged['scale'] = scale
+        merged['joint_ape'] = {'count': alignment.count, 'rmse': math.sqrt(sse / alignment.count),
+                               'sse': sse}
+    return merged
+
+def format_summary(name, stats):
+    """Format one statistics block like evo's console output"""
+    lines = [f"{name}  ({stats.get('count', 0)} values)"]
+    for key in ('max', 'mean', 'median', 'p90', 'p95', 'p99', 'min', 'rmse', 'sse', 'std'):
+        if stats.get(key) is not None:
+            lines.append(f"{key:>10}\t{stats[key]:.6f}")
+    return '\n'.join(lines)
+
+def plot_profile(profile, filepath, title):
+    """Plot the binned mean error with its min/max envelope"""
+    filled = profile.count > 0
+    t = profile.centers()[filled] - profile.start
+    mean = profile.sum[filled] / profile.count[filled]
+
+    fig, ax = plt.subplots(figsize=(14, 5))
+    ax.fill_between(t, profile.min[filled], profile.max[filled], alpha=0.3, color='#3498db',
+                    label='min / max')
+    ax.plot(t, mean, color='#2c3e50', linewidth=1.2, label='mean')
+    ax.set_xlabel('Time since first pose (s)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('APE (m)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(filepath, dpi=150, bbox_inches='tight')
+    plt.close()
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    evaluate = subparsers.add_parser('evaluate', help='streaming Sim(3) APE/RPE of a trajectory')
+    evaluate.add_argument('trajectory', type=Path)
+    evaluate.add_argument('gt', type=Path)
+    evaluate.add_argument('--max-diff', type=float, default=DEFAULT_MAX_DIFF,
+                          help='maximum timestamp difference for association (s)')
+    evaluate.add_argument('--bins', type=int, default=DEFAULT_PROFILE_BINS,
+                          help='time bins of the error profile (default %(default)s)')
+    evaluate.add_argument('--plot', type=Path, default=None, help='save the APE profile plot')
+
+    errors = subparsers.add_parser('errors', help='statistics of stored evo error arrays')
+    errors.add_argument('archives', type=Path, nargs='+', help='ape_results.zip files')
+
+    merge = subparsers.add_parser('merge', help='combine saved partial results')
+    merge.add_argument('partials', type=Path, nargs='+')
+
+    for sub in (evaluate, errors, merge):
+        sub.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                         help='rows read per block (default %(default)s)')
+        sub.add_argument('--relative-accuracy', type=float, default=DEFAULT_RELATIVE_ACCURACY,
+                         help='quantile sketch relative accuracy (default %(default)s)')
+        sub.add_argument('--save', type=Path, default=None, help='save mergeable results as JSON')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'evaluate':
+            results = stream_evaluate(args.trajectory, args.gt, args.chunk_size, args.max_diff,
+                                      args.relative_accuracy, args.bins)
+            print(f"Scale correction: {results['scale']:.6f}")
+            if args.plot:
+                plot_profile(results['ape'].profile, args.plot, f'APE profile: {args.trajectory}')
+                print(f"✓ Saved APE profile: {args.plot}")
+        elif args.command == 'errors':
+            results = {}
+            for archive in args.archives:
+                partial = stream_error_array(archive, args.chunk_size, args.relative_accuracy)
+                print(format_summary(f"APE: {archive}", partial.summary()))
+                print()
+                results.setdefault('ape', ErrorAccumulator(args.relative_accuracy)).merge(partial)
+        else:
+            results = merge_partials(args.partials)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    for name in ('ape', 'rpe'):
+        if name in results:
+            print(format_summary(f"{name.upper()} w.r.t. translation part (m)", results[name].summary()))
+            print()
+    if 'joint_ape' in results:
+        print(f"Scale correction of the merged alignment: {results['scale']:.6f}")
+        print(format_summary("APE under the merged alignment (m)", results['joint_ape']))
+        print()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results_to_dict(results), f)
+        print(f"✓ Saved mergeable results: {args.save}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Tracking coverage and failure analysis
+Reads the per-frame tracking states written by ORB-SLAM2 (tracking_states.bin,
+one byte per processed frame: 0 not initialized, 1 OK, 2 lost,
+3 relocalized) and computes coverage ratios, failure intervals, time to
+initialization and relocalization latency. The states of all runs of a
+campaign are run-length encoded together in one vectorized pass.
+
+Usage:
+    python tracking_states.py [CAMPAIGN_OR_RUN_DIR ...]
+
+Without arguments baseline_output and refine_output are analysed; a CSV and
+charts are written to analysis_output.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from pathlib import Path
+
+from campaign_archive import CampaignArchive, archive_path_for
+
+# Configuration
+CAMPAIGN_DIRS = [Path("baseline_output"), Path("refine_output")]
+OUTPUT_DIR = Path("analysis_output")
+
+# Built by tools/dataset_manifest.py, gives frame counts and frame periods
+DATASET_MANIFEST = Path(__file__).resolve().parent.parent / "INTR6000P" / "manifest.json"
+
+STATES_FILE = 'tracking_states.bin'
+
+# System::eFrameState
+NOT_INITIALIZED, OK, LOST, RELOCALIZED = 0, 1, 2, 3
+STATE_NAMES = ['not initialized', 'ok', 'lost', 'relocalized']
+STATE_COLORS = ['#bdc3c7', '#2ecc71', '#e74c3c', '#f39c12']
+
+# quick_eval_<difficulty>_<sequence>_<YYYYmmdd>_<HHMMSS>[_r<run index>_j<job id>] (tools/work_queue.py)
+RUN_DIR_PATTERN = re.compile(r'^quick_eval_(easy|medium|hard)_(\w+?)_\d{8}_\d{6}(?:_r\d+_j\d+)?$')
+
+# Width of the state timeline chart (frames are binned to this many columns)
+TIMELINE_COLUMNS = 600
+
+def load_sequence_info(manifest=DATASET_MANIFEST):
+    """{(difficulty, sequence): (frames, frame period s)} from the dataset manifest"""
+    if not Path(manifest).exists():
+        return {}
+    with open(manifest, 'r') as f:
+        entries = json.load(f)['sequences']
+    return {(s['difficulty'], s['sequence']):
+            (s['num_timestamps'], s['duration_s'] / max(s['num_timestamps'] - 1, 1)) for s in entries}
+
+def load_states(run_dir=None, archive=None, run=None):
+    """States of a run directory or an archived run, None when not recorded"""
+    if archive is not None:
+        return archive.array(run, 'tracking_states') if archive.has(run, 'tracking_states.npy') else None
+    states_file = Path(run_dir) / STATES_FILE
+    if not states_file.exists():
+        return None
+    return np.fromfile(states_file, dtype=np.uint8)
+
+def run_length_encode(states, run_ids):
+    """
+    Run-length encode the concatenated states of many runs.
+
+    A new segment starts wherever the state or the run changes. run_ids must
+    be non-decreasing (runs without frames simply have no entries). Returns
+    (run id, state, start frame within the run, length) arrays, one entry per
+    segment.
+    """
+    n = len(states)
+    if n == 0:
+        empty = np.zeros(0, dtype=int)
+        return empty, empty, empty, empty
+    change = np.flatnonzero((np.diff(states) != 0) | (np.diff(run_ids) != 0)) + 1
+    starts = np.concatenate([[0], change])
+    lengths = np.diff(np.append(starts, n))
+
+    # First frame of the segment's run: run ids are sorted, so it is the first occurrence
+    seg_run = run_ids[starts]
+    return seg_run, states[starts], starts - np.searchsorted(run_ids, seg_run), lengths
+
+def analyze_campaign(state_arrays, total_frames=None, frame_periods=None):
+    """
+    Coverage and failure metrics of many runs at once.
+
+    state_arrays: list of per-run uint8 state arrays. total_frames: frames of
+    each run's sequence (runs that stopped early count the missing frames as
+    not tracked), defaults to the recorded frames. frame_periods: seconds per
+    frame, used to express frame counts as seconds (NaN when unknown).
+    Returns (list of per-run metric dicts, list of per-run failure intervals).
+    """
+    count = len(state_arrays)
+    recorded = np.array([len(s) for s in state_arrays], dtype=int)
+    total = recorded if total_frames is None else np.maximum(np.asarray(total_frames, dtype=int), recorded)
+    period = np.full(count, np.nan) if frame_periods is None else np.asarray(frame_periods, dtype=float)
+
+    states = np.concatenate(state_arrays).astype(np.int8) if count else np.zeros(0, dtype=np.int8)
+    run_ids = np.repeat(np.arange(count), recorded)
+    seg_run, seg_state, seg_start, seg_len = run_length_encode(states, run_ids)
+
+    # Frames per state and run
+    frames = np.zeros((count, len(STATE_NAMES)), dtype=int)
+    np.add.at(frames, (seg_run, seg_state), seg_len)
+    tracked = frames[:, OK] + frames[:, RELOCALIZED]
+
+    # First tracked frame of each run
+    is_tracked = (seg_state == OK) | (seg_state == RELOCALIZED)
+    never = np.iinfo(np.int64).max
+    first_init = np.full(count, never, dtype=np.int64)
+    np.minimum.at(first_init, seg_run[is_tracked], seg_start[is_tracked])
+    first_init[first_init == never] = -1
+
+    # Lost segments, and whether tracking resumed right after them (same run, relocalized next)
+    lost = np.flatnonzero(seg_state == LOST)
+    lost_run = seg_run[lost]
+    next_seg = np.minimum(lost + 1, len(seg_state) - 1)
+    recovered = (lost + 1 < len(seg_state)) & (seg_run[next_seg] == lost_run) & \
+        (seg_state[next_seg] == RELOCALIZED)
+    failures = np.bincount(lost_run, minlength=count)
+    lost_max = np.zeros(count, dtype=int)
+    np.maximum.at(lost_max, lost_run, seg_len[lost])
+    recoveries = np.bincount(lost_run[recovered], minlength=count)
+    latency_sum = np.bincount(lost_run[recovered], weights=seg_len[lost][recovered], minlength=count)
+    latency_max = np.full(count, -1)
+    np.maximum.at(latency_max, lost_run[recovered], seg_len[lost][recovered])
+
+    # Segments are ordered by run, so the failure intervals of each run are contiguous
+    bounds = np.searchsorted(lost_run, np.arange(1, count))
+    interval_starts = np.split(seg_start[lost], bounds)
+    interval_lengths = np.split(seg_len[lost], bounds)
+
+    # Re-initializations: not initialized segments after the first tracked frame
+    reinit = (seg_state == NOT_INITIALIZED) & (seg_start > first_init[seg_run]) & (first_init[seg_run] >= 0)
+    resets = np.bincount(seg_run[reinit], minlength=count)
+
+    metrics = []
+    for i in range(count):
+        has_period = not np.isnan(period[i])
+        metrics.append({
+            'frames_total': int(total[i]),
+            'frames_recorded': int(recorded[i]),
+            'coverage': tracked[i] / total[i] if total[i] else 0.0,
+            'lost_ratio': frames[i, LOST] / total[i] if total[i] else 0.0,
+            'uninitialized_ratio': (frames[i, NOT_INITIALIZED] + total[i] - recorded[i]) / total[i]
+            if total[i] else 0.0,
+            'time_to_init_frames': int(first_init[i]) if first_init[i] >= 0 else None,
+            'time_to_init_s': float(first_init[i] * period[i])
+            if first_init[i] >= 0 and has_period else None,
+            'failures': int(failures[i]),
+            'recoveries': int(recoveries[i]),
+            'resets': int(resets[i]),
+            'longest_failure_frames': int(lost_max[i]),
+            'reloc_latency_mean_frames': latency_sum[i] / recoveries[i] if recoveries[i] else None,
+            'reloc_latency_max_frames': int(latency_max[i]) if recoveries[i] else None,
+            'reloc_latency_mean_s': latency_sum[i] / recoveries[i] * period[i]
+            if recoveries[i] and has_period else None,
+        })
+    intervals = [list(zip(starts.tolist(), lengths.tolist()))
+                 for starts, lengths in zip(interval_starts, interval_lengths)]
+    return metrics, intervals
+
+def analyze_states(states, total_frames=None, frame_period=None):
+    """Coverage and failure metrics of a single run"""
+    metrics, intervals = analyze_campaign(
+        [states], None if total_frames is None else [total_frames],
+        None if frame_period is None else [frame_period])
+    return dict(metrics[0], failure_intervals=intervals[0])
+
+def sequence_of(run_name):
+    name_match = RUN_DIR_PATTERN.match(run_name)
+    return (name_match.group(1), name_match.group(2)) if name_match else ('unknown', 'unknown')
+
+def collect_states(paths):
+    """(campaign, run, states) of every run with recorded states below the given paths"""
+    found = []
+    for path in paths:
+        path = Path(path)
+        if (path / STATES_FILE).exists():
+            found.append((path.parent.name, path.name, load_states(path)))
+            continue
+
+        archived = set()
+        if archive_path_for(path).exists():
+            with CampaignArchive(archive_path_for(path)) as archive:
+                for run in archive.runs():
+                    states = load_states(archive=archive, run=run)
+                    archived.add(run)
+                    if states is not None:
+                        found.append((path.name, run, states))
+        for states_file in sorted(path.glob(f'**/quick_eval_*/{STATES_FILE}')):
+            if states_file.parent.name not in archived:
+                found.append((path.name, states_file.parent.name, load_states(states_file.parent)))
+    return found
+
+def write_csv(rows, filepath):
+    """Write one row per run"""
+    fields = ['Campaign', 'Difficulty', 'Sequence', 'Run'] + list(rows[0]['metrics'].keys())
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([row['campaign'], row['difficulty'], row['sequence'], row['run']] +
+                            ['' if v is None else (f'{v:.4f}' if isinstance(v, float) else v)
+                             for v in row['metrics'].values()])
+
+def plot_coverage(rows, output_dir):
+    """Stacked tracked / lost / not initialized bars per run"""
+    rows = sorted(rows, key=lambda r: (r['difficulty'], r['sequence'], r['campaign']))
+    labels = [f"{r['difficulty']}_{r['sequence']}\n{r['campaign']}" for r in rows]
+    tracked = np.array([r['metrics']['coverage'] for r in rows]) * 100
+    lost = np.array([r['metrics']['lost_ratio'] for r in rows]) * 100
+    uninit = np.array([r['metrics']['uninitialized_ratio'] for r in rows]) * 100
+
+    fig, ax = plt.subplots(figsize=(max(14, len(rows) * 0.6), 7))
+    x = np.arange(len(rows))
+    ax.bar(x, tracked, color=STATE_COLORS[OK], label='Tracked (OK / relocalized)')
+    ax.bar(x, lost, bottom=tracked, color=STATE_COLORS[LOST], label='Lost')
+    ax.bar(x, uninit, bottom=tracked + lost, color=STATE_COLORS[NOT_INITIALIZED], label='Not initialized')
+    for i, r in enumerate(rows):
+        if r['metrics']['failures']:
+            ax.text(i, 101, str(r['metrics']['failures']), ha='center', fontsize=8)
+
+    ax.set_ylabel('Frames (%)', fontsize=12, fontweight='bold')
+    ax.set_title('Tracking Coverage per Run (number above bar: tracking failures)',
+                 fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+    ax.set_ylim(0, 108)
+    ax.legend(loc='lower right')
+    ax.grid(axis='y', alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(output_dir / 'tracking_coverage.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+def plot_timelines(rows, states_by_run, output_dir):
+    """One state strip per run, frames binned to a fixed width (worst state of a bin wins)"""
+    from matplotlib.colors import ListedColormap
+    from matplotlib.patches import Patch
+
+    rows = sorted(rows, key=lambda r: (r['difficulty'], r['sequence'], r['campaign']))
+    # Ranking used when several frames share a column: lost > relocalized > not initialized > ok
+    severity = np.array([1, 0, 3, 2])
+    image = np.full((len(rows), TIMELINE_COLUMNS), NOT_INITIALIZED)
+    for i, r in enumerate(rows):
+        states = states_by_run[(r['campaign'], r['run'])]
+        total = r['metrics']['frames_total']
+        if not total or not len(states):
+            continue
+        column = np.arange(len(states)) * TIMELINE_COLUMNS // total
+        worst = np.full(TIMELINE_COLUMNS, -1)
+        np.maximum.at(worst, column, severity[states])
+        filled = worst >= 0
+        image[i, filled] = np.argsort(severity)[worst[filled]]
+
+    fig, ax = plt.subplots(figsize=(14, max(3, 0.35 * len(rows) + 1.5)))
+    ax.imshow(image, aspect='auto', interpolation='nearest', cmap=ListedColormap(STATE_COLORS),
+              vmin=0, vmax=len(STATE_COLORS) - 1)
+    ax.set_yticks(np.arange(len(rows)))
+    ax.set_yticklabels([f"{r['campaign']}: {r['difficulty']}_{r['sequence']}" for r in rows], fontsize=8)
+    ax.set_xticks(np.linspace(0, TIMELINE_COLUMNS - 1, 6))
+    ax.set_xticklabels([f'{p:.0f}%' for p in np.linspace(0, 100, 6)])
+    ax.set_xlabel('Position in sequence', fontsize=12, fontweight='bold')
+    ax.set_title('Tracking State Timeline', fontsize=14, fontweight='bold')
+    ax.legend(handles=[Patch(color=c, label=n) for c, n in zip(STATE_COLORS, STATE_NAMES)],
+              loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=4)
+
+    plt.tight_layout()
+    plt.savefig(output_dir / 'tracking_timeline.png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', type=Path, default=CAMPAIGN_DIRS,
+                        help='campaign or run directories (default: baseline and refine output)')
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    found = collect_states(args.paths)
+    if not found:
+        print(f"✗ No {STATES_FILE} found")
+        return 1
+
+    info = load_sequence_info()
+    sequences = [sequence_of(run) for _, run, _ in found]
+    total = [info.get(seq, (0, np.nan))[0] for seq in sequences]
+    period = [info.get(seq, (0, np.nan))[1] for seq in sequences]
+    metrics, intervals = analyze_campaign([states for _, _, states in found], total, period)
+
+    rows = [{'campaign': campaign, 'run': run, 'difficulty': seq[0], 'sequence': seq[1], 'metrics': m}
+            for (campaign, run, _), seq, m in zip(found, sequences, metrics)]
+    for row, run_intervals in zip(rows, intervals):
+        m = row['metrics']
+        print(f"  {row['campaign']}/{row['run']}: coverage {m['coverage'] * 100:.1f}%, "
+              f"{m['failures']} failures ({m['recoveries']} relocalized), "
+              f"init after {m['time_to_init_frames']} frames")
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    write_csv(rows, args.output_dir / 'tracking_coverage.csv')
+    plot_coverage(rows, args.output_dir)
+    plot_timelines(rows, {(c, r): s for c, r, s in found}, args.output_dir)
+    print(f"✓ Analysed {len(rows)} runs: {args.output_dir / 'tracking_coverage.csv'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Batched SE(3) trajectory interpolation
+Densifies a sparse (keyframe) TUM trajectory onto the ground truth
+timestamps: rotations are interpolated with slerp and translations linearly,
+for all query stamps at once with NumPy, so dense APE/RPE can be computed on
+every ground truth pose instead of the keyframes only.
+
+Usage:
+    python trajectory_interp.py trajectory.txt GT.txt dense_trajectory.txt [--max-gap 1.0]
+"""
+
+import argparse
+import sys
+import numpy as np
+from pathlib import Path
+
+from umeyama import windowed_umeyama
+
+# Below this angle between quaternions slerp falls back to normalized lerp
+SLERP_LINEAR_THRESHOLD = 1e-6
+
+def load_tum_trajectory(filepath):
+    """Load a TUM trajectory, returns (stamps, positions, quaternions xyzw)"""
+    data = np.loadtxt(filepath, comments='#', ndmin=2)
+    if data.shape[1] < 8:
+        raise ValueError(f"Not a TUM trajectory (expected 8 columns): {filepath}")
+    return data[:, 0], data[:, 1:4], data[:, 4:8]
+
+def save_tum_trajectory(filepath, stamps, positions, quaternions):
+    """Write a TUM trajectory (timestamp tx ty tz qx qy qz qw)"""
+    data = np.column_stack([stamps, positions, quaternions])
+    np.savetxt(filepath, data, fmt=['%.6f'] + ['%.9f'] * 7)
+
+def slerp(q0, q1, alpha):
+    """Spherical linear interpolation of batches of unit quaternions"""
+    dot = np.einsum('ij,ij->i', q0, q1)
+
+    # q and -q are the same rotation, take the short way round
+    q1 = np.where(dot[:, None] < 0, -q1, q1)
+    dot = np.clip(np.abs(dot), 0.0, 1.0)
+
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    linear = sin_theta < SLERP_LINEAR_THRESHOLD
+    safe_sin = np.where(linear, 1.0, sin_theta)
+
+    w0 = np.where(linear, 1.0 - alpha, np.sin((1.0 - alpha) * theta) / safe_sin)
+    w1 = np.where(linear, alpha, np.sin(alpha * theta) / safe_sin)
+
+    q = w0[:, None] * q0 + w1[:, None] * q1
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+def interpolate_se3(stamps, positions, quaternions, query_stamps, max_gap=None):
+    """
+    Interpolate poses at query_stamps.
+
+    Query stamps outside the trajectory, or between two poses further apart
+    than max_gap seconds (e.g. around tracking failures), are not interpolated.
+    Returns (valid mask over query_stamps, positions, quaternions) where the
+    pose arrays only hold the valid queries.
+    """
+    stamps, unique = np.unique(stamps, return_index=True)
+    positions, quaternions = positions[unique], quaternions[unique]
+    quaternions = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+    query_stamps = np.asarray(query_stamps, dtype=float)
+
+    if len(stamps) < 2:
+        valid = np.isin(query_stamps, stamps)
+        count = int(valid.sum())
+        return valid, np.repeat(positions, count, axis=0), np.repeat(quaternions, count, axis=0)
+
+    valid = (query_stamps >= stamps[0]) & (query_stamps <= stamps[-1])
+    upper = np.clip(np.searchsorted(stamps, query_stamps[valid], side='right'), 1, len(stamps) - 1)
+    lower = upper - 1
+
+    gap = stamps[upper] - stamps[lower]
+    if max_gap is not None:
+        # Queries that coincide with a pose are exact, whatever the gap
+        exact = (query_stamps[valid] == stamps[lower]) | (query_stamps[valid] == stamps[upper])
+        keep = (gap <= max_gap) | exact
+        valid[np.flatnonzero(valid)[~keep]] = False
+        lower, upper, gap = lower[keep], upper[keep], gap[keep]
+
+    alpha = (query_stamps[valid] - stamps[lower]) / gap
+    dense_positions = positions[lower] + alpha[:, None] * (positions[upper] - positions[lower])
+    dense_quaternions = slerp(quaternions[lower], quaternions[upper], alpha)
+    return valid, dense_positions, dense_quaternions
+
+def densify(trajectory_file, gt_file, output_file, max_gap=None):
+    """Interpolate a trajectory onto the ground truth stamps and save it"""
+    stamps, positions, quaternions = load_tum_trajectory(trajectory_file)
+    gt_stamps, gt_positions, _ = load_tum_trajectory(gt_file)
+
+    valid, dense_positions, dense_quaternions = interpolate_se3(
+        stamps, positions, quaternions, gt_stamps, max_gap)
+    save_tum_trajectory(output_file, gt_stamps[valid], dense_positions, dense_quaternions)
+    return valid, dense_positions, gt_positions[valid]
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('trajectory', type=Path, help='sparse TUM trajectory (e.g. trajectory.txt)')
+    parser.add_argument('gt', type=Path, help='ground truth TUM file providing the query stamps')
+    parser.add_argument('output', type=Path, help='dense TUM trajectory to write')
+    parser.add_argument('--max-gap', type=float, default=None, metavar='SECONDS',
+                        help='do not interpolate between poses further apart than this')
+    args = parser.parse_args()
+
+    try:
+        valid, dense, gt = densify(args.trajectory, args.gt, args.output, args.max_gap)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    print(f"✓ Interpolated {int(valid.sum())} of {len(valid)} ground truth poses: {args.output}")
+    if len(dense) >= 3:
+        alignment = windowed_umeyama(dense, gt, len(dense))
+        print(f"  - Dense APE RMSE (Sim(3)): {alignment['rmse'][0]:.6f} m, "
+              f"scale correction {alignment['scale'][0]:.6f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Batched Umeyama alignment
+Sim(3) alignment (Umeyama 1991) of every window of consecutive poses of a
+trajectory onto the ground truth, solved together from cumulative moments.
+A window as long as the trajectory gives the global alignment. Depends on
+NumPy only, so it can be used by scripts that do not plot.
+
+Usage:
+    from umeyama import windowed_umeyama
+    alignment = windowed_umeyama(est, ref, len(est))
+"""
+
+import numpy as np
+
+def window_sums(values, window):
+    """Sums of every run of `window` consecutive rows, via a cumulative sum"""
+    cumulative = np.cumsum(values, axis=0)
+    cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), cumulative])
+    return cumulative[window:] - cumulative[:-window]
+
+def windowed_umeyama(est, ref, window):
+    """
+    Sim(3) alignment of est onto ref for every window of consecutive poses.
+
+    Returns a dict of arrays with one entry per window: scale, rotation (3x3),
+    translation and the RMSE left after the local alignment.
+    """
+    # Centering keeps the cumulative moments well conditioned
+    est_offset, ref_offset = est.mean(axis=0), ref.mean(axis=0)
+    x, y = est - est_offset, ref - ref_offset
+
+    mean_x = window_sums(x, window) / window
+    mean_y = window_sums(y, window) / window
+    var_x = window_sums(np.einsum('ij,ij->i', x, x), window) / window - np.einsum('ij,ij->i', mean_x, mean_x)
+    var_y = window_sums(np.einsum('ij,ij->i', y, y), window) / window - np.einsum('ij,ij->i', mean_y, mean_y)
+    cov = (window_sums(y[:, :, None] * x[:, None, :], window) / window
+           - mean_y[:, :, None] * mean_x[:, None, :])
+
+    u, d, vt = np.linalg.svd(cov)
+    sign = np.ones_like(d)
+    sign[:, 2] = np.sign(np.linalg.det(u) * np.linalg.det(vt))
+    rotation = (u * sign[:, None, :]) @ vt
+
+    trace = np.einsum('ij,ij->i', d, sign)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(var_x > 0, trace / var_x, np.nan)
+        mse = np.where(var_x > 0, var_y - trace * trace / var_x, np.nan)
+
+    translation = (mean_y + ref_offset
+                   - scale[:, None] * np.einsum('nij,nj->ni', rotation, mean_x + est_offset))
+
+    return {
+        'scale': scale,
+        'rotation': rotation,
+        'translation': translation,
+        'rmse': np.sqrt(np.clip(mse, 0, None)),
+        'centroid_est': mean_x + est_offset,
+        'centroid_ref': mean_y + ref_offset,
+    }
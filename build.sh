@@ -23,6 +23,10 @@ cd Vocabulary
 tar -xf ORBvoc.txt.tar.gz
 cd ..
 
+echo "Convert vocabulary to binary format ..."
+
+python3 tools/orbvoc_convert.py convert Vocabulary/ORBvoc.txt Vocabulary/ORBvoc.bin || echo "Binary vocabulary not created, ORBvoc.txt will be used"
+
 echo "Configuring and building ORB_SLAM2 ..."
 
 mkdir build
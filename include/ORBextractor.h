@@ -29,6 +29,8 @@
 namespace ORB_SLAM2
 {
 
+class LevelWorkerPool;
+
 class ExtractorNode
 {
 public:
@@ -48,10 +50,24 @@ public:
     
     enum {HARRIS_SCORE=0, FAST_SCORE=1 };
 
+    // Stages of an extraction, timed per pyramid level
+    enum eStage{
+        STAGE_PYRAMID=0,
+        STAGE_FAST=1,
+        STAGE_DISTRIBUTE=2,
+        STAGE_ORIENTATION=3,
+        STAGE_BLUR=4,
+        STAGE_DESCRIPTORS=5,
+        NUM_STAGES=6
+    };
+
+    // With nThreads > 1 the pyramid levels are processed concurrently on a pool of
+    // nThreads workers (the calling thread included). Keypoints and descriptors are
+    // returned in the same order as with the default sequential extraction.
     ORBextractor(int nfeatures, float scaleFactor, int nlevels,
-                 int iniThFAST, int minThFAST);
+                 int iniThFAST, int minThFAST, int nThreads=1);
 
-    ~ORBextractor(){}
+    ~ORBextractor();
 
     // Compute the ORB features and descriptors on an image.
     // ORB are dispersed on the image using an octree.
@@ -66,6 +82,9 @@ public:
     float inline GetScaleFactor(){
         return scaleFactor;}
 
+    int inline GetNumThreads(){
+        return nThreads;}
+
     std::vector<float> inline GetScaleFactors(){
         return mvScaleFactor;
     }
@@ -82,12 +101,21 @@ public:
         return mvInvLevelSigma2;
     }
 
+    // Wall time in milliseconds of each stage and pyramid level ([stage][level])
+    // of the last extraction (Examples/Benchmark/bench_orb_extractor reports them).
+    // In parallel mode the levels overlap, so their times do not add up to the call.
+    const std::vector<std::vector<double> >& GetStageTimes() const {
+        return mvvStageTimes;
+    }
+
     std::vector<cv::Mat> mvImagePyramid;
 
 protected:
 
     void ComputePyramid(cv::Mat image);
     void ComputeKeyPointsOctTree(std::vector<std::vector<cv::KeyPoint> >& allKeypoints);    
+    void ComputeKeyPointsLevel(const int &level, std::vector<cv::KeyPoint>& keypoints);
+    void ComputeDescriptorsLevel(const int &level, std::vector<cv::KeyPoint>& keypoints, cv::Mat& descriptors);
     std::vector<cv::KeyPoint> DistributeOctTree(const std::vector<cv::KeyPoint>& vToDistributeKeys, const int &minX,
                                            const int &maxX, const int &minY, const int &maxY, const int &nFeatures, const int &level);
 
@@ -99,6 +127,7 @@ protected:
     int nlevels;
     int iniThFAST;
     int minThFAST;
+    int nThreads;
 
     std::vector<int> mnFeaturesPerLevel;
 
@@ -108,6 +137,16 @@ protected:
     std::vector<float> mvInvScaleFactor;    
     std::vector<float> mvLevelSigma2;
     std::vector<float> mvInvLevelSigma2;
+
+    std::vector<std::vector<double> > mvvStageTimes;
+
+    // Workers of the parallel mode, NULL when extracting sequentially
+    LevelWorkerPool* mpWorkerPool;
+
+private:
+    // The worker pool is owned by the extractor
+    ORBextractor(const ORBextractor&);
+    ORBextractor& operator=(const ORBextractor&);
 };
 
 } //namespace ORB_SLAM
@@ -24,6 +24,7 @@
 
 #include<string>
 #include<thread>
+#include<fstream>
 #include<opencv2/core/core.hpp>
 #include <unistd.h>
 
@@ -59,6 +60,14 @@ public:
         RGBD=2
     };
 
+    // Per-frame tracking states written by SetTrackingStateFile (one byte per frame)
+    enum eFrameState{
+        FRAME_NOT_INITIALIZED=0,
+        FRAME_OK=1,
+        FRAME_LOST=2,
+        FRAME_RELOCALIZED=3
+    };
+
 public:
 
     // Initialize the SLAM system. It launches the Local Mapping, Loop Closing and Viewer threads.
@@ -98,7 +107,8 @@ public:
     void Shutdown();
 
     // Save camera trajectory in the TUM RGB-D dataset format.
-    // Only for stereo and RGB-D. This method does not work for monocular.
+    // One pose per tracked frame (frames where tracking was lost are skipped).
+    // For monocular the trajectory is known up to scale, like the keyframe trajectory.
     // Call first Shutdown()
     // See format details at: http://vision.in.tum.de/data/datasets/rgbd-dataset
     void SaveTrajectoryTUM(const string &filename);
@@ -128,6 +138,15 @@ public:
     // Set output directory for tracking failure videos
     void SetFailureVideoOutputDir(const std::string &outputDir);
 
+    // Write the tracking state of every processed frame (eFrameState, one byte per frame) to a file.
+    // The file is flushed after every frame, so it stays complete up to the last processed frame
+    // even when the process exits early (e.g. after saving a failure video).
+    void SetTrackingStateFile(const string &filename);
+
+    // Record scoped timings of the Tracking, Local Mapping, Loop Closing and Viewer threads
+    // (see Tracer.h) and write them to a Chrome trace JSON file on Shutdown.
+    void SetTraceFile(const string &filename);
+
 private:
 
     // Input sensor
@@ -180,6 +199,11 @@ private:
     std::vector<MapPoint*> mTrackedMapPoints;
     std::vector<cv::KeyPoint> mTrackedKeyPointsUn;
     std::mutex mMutexState;
+
+    // Per-frame tracking state output
+    void RecordTrackingState();
+    std::ofstream mTrackingStateFile;
+    int mLastFrameState;
 };
 
 }// namespace ORB_SLAM
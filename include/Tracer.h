@@ -0,0 +1,116 @@
+/**
+* This file is part of ORB-SLAM2.
+*
+* Copyright (C) 2014-2016 Raúl Mur-Artal <raulmur at unizar dot es> (University of Zaragoza)
+* For more information see <https://github.com/raulmur/ORB_SLAM2>
+*
+* ORB-SLAM2 is free software: you can redistribute it and/or modify
+* it under the terms of the GNU General Public License as published by
+* the Free Software Foundation, either version 3 of the License, or
+* (at your option) any later version.
+*
+* ORB-SLAM2 is distributed in the hope that it will be useful,
+* but WITHOUT ANY WARRANTY; without even the implied warranty of
+* MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+* GNU General Public License for more details.
+*
+* You should have received a copy of the GNU General Public License
+* along with ORB-SLAM2. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+#ifndef TRACER_H
+#define TRACER_H
+
+#include<string>
+#include<mutex>
+#include<atomic>
+
+namespace ORB_SLAM2
+{
+
+// Scoped tracing of the SLAM threads, written as a Chrome trace JSON file
+// (chrome://tracing, ui.perfetto.dev, all_result/pipeline_trace.py).
+// Tracing is off unless enabled: a TraceScope then costs one atomic load.
+// While enabled every thread appends to its own event buffer.
+class Tracer
+{
+public:
+
+    // Start recording events, Save writes them to filename
+    static void Enable(const std::string &filename);
+
+    static bool IsEnabled(){
+        return mbEnabled.load(std::memory_order_acquire);
+    }
+
+    // Write all events recorded so far (called by System::Shutdown and at exit).
+    // Does nothing when no event was recorded since the last save.
+    static void Save();
+
+    // Name of the calling thread in the trace
+    static void SetThreadName(const std::string &name);
+
+    // Lock a deferred unique_lock. If the mutex is held by another thread, the
+    // time spent blocked is recorded as a "lock" event named after the mutex.
+    static void Lock(std::unique_lock<std::mutex> &lock, const char* name);
+
+    // Zero-duration event on the calling thread
+    static void Instant(const char* name, const char* category);
+
+    // Nanoseconds since tracing was enabled
+    static long long Now();
+
+    // Complete event on the calling thread, argName may be NULL
+    static void Record(const char* name, const char* category, long long tStart, long long tEnd,
+                       const char* argName, long argValue);
+
+private:
+
+    static std::atomic<bool> mbEnabled;
+};
+
+// Records one event from construction to destruction (or Stop).
+// Names and categories must be string literals.
+class TraceScope
+{
+public:
+
+    TraceScope(const char* name, const char* category):
+        mpName(name), mpCategory(category), mpArgName(NULL), mnArgValue(0),
+        mnStart(0), mbActive(Tracer::IsEnabled())
+    {
+        if(mbActive)
+            mnStart = Tracer::Now();
+    }
+
+    ~TraceScope(){
+        Stop();
+    }
+
+    // Integer argument of the event (frame or keyframe id, flag)
+    void SetArg(const char* argName, long argValue){
+        mpArgName = argName;
+        mnArgValue = argValue;
+    }
+
+    // End the event before the end of the scope
+    void Stop(){
+        if(!mbActive)
+            return;
+        Tracer::Record(mpName, mpCategory, mnStart, Tracer::Now(), mpArgName, mnArgValue);
+        mbActive = false;
+    }
+
+private:
+
+    const char* mpName;
+    const char* mpCategory;
+    const char* mpArgName;
+    long mnArgValue;
+    long long mnStart;
+    bool mbActive;
+};
+
+} //namespace ORB_SLAM
+
+#endif // TRACER_H
@@ -8,6 +8,18 @@
 #
 # Usage: bash quick_eval_intr6000p.sh <difficulty> <sequence>
 # Example: bash quick_eval_intr6000p.sh easy carwelding2
+#
+# Optional early abort of hopeless runs (see tools/run_orbslam.py):
+#   ABORT_LOST_SECONDS=5 ABORT_NO_MAP_FRAMES=300 bash quick_eval_intr6000p.sh hard amusement1
+#
+# Optional per-frame trajectory (one pose per tracked frame, evaluated as well):
+#   FRAME_TRAJECTORY=1 bash quick_eval_intr6000p.sh easy factory1
+#
+# Optional thread timeline (Chrome trace, summarised by all_result/pipeline_trace.py):
+#   ORBSLAM_TRACE=1 bash quick_eval_intr6000p.sh easy factory1
+#
+# Optional full-resolution evo plots (in addition to the downsampled ape_plot.png/trajectory_plot.png):
+#   EVO_PLOT=1 bash quick_eval_intr6000p.sh easy factory1
 ################################################################################
 
 # Colors for output
@@ -25,10 +37,9 @@ log_error() { echo -e "${RED}[ERROR]${NC} $1"; }
 if [[ $# -ne 2 ]]; then
     log_error "Usage: $0 <difficulty> <sequence>"
     echo "Example: $0 easy carwelding2"
-    echo "Available sequences:"
-    echo "  easy: carwelding2, factory1, hospital"
-    echo "  medium: factory2, factory6"
-    echo "  hard: amusement1, amusement2"
+    echo "Available sequences (difficulty sequence):"
+    python3 "$(dirname "${BASH_SOURCE[0]}")/tools/dataset_manifest.py" \
+        --dataset-root "${DATASET_ROOT:-$(dirname "${BASH_SOURCE[0]}")/INTR6000P}" list --details | sed 's/^/  /'
     exit 1
 fi
 
@@ -38,13 +49,20 @@ SEQUENCE="$2"
 # Base paths
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 ORBSLAM_ROOT="$SCRIPT_DIR"
-DATASET_ROOT="$SCRIPT_DIR/INTR6000P"
+# Host specific locations can be overridden from the environment (tools/work_queue.py does)
+DATASET_ROOT="${DATASET_ROOT:-$SCRIPT_DIR/INTR6000P}"
+OUTPUT_ROOT="${OUTPUT_ROOT:-$SCRIPT_DIR/output}"
+OUTPUT_ROOT="$(mkdir -p "$OUTPUT_ROOT" && cd "$OUTPUT_ROOT" && pwd)"
 
 # Configuration
 ORBSLAM_EXEC="$ORBSLAM_ROOT/Examples/Monocular/mono_euroc"
-VOCABULARY="$ORBSLAM_ROOT/Vocabulary/ORBvoc.txt"
+# Prefer the binary vocabulary (tools/orbvoc_convert.py), it loads much faster
+VOCABULARY="$ORBSLAM_ROOT/Vocabulary/ORBvoc.bin"
+if [[ ! -f "$VOCABULARY" ]]; then
+    VOCABULARY="$ORBSLAM_ROOT/Vocabulary/ORBvoc.txt"
+fi
 # CAMERA_CONFIG="$DATASET_ROOT/tartanair_1.yaml"
-CAMERA_CONFIG="/home/hz/intr6000/ORB_SLAM2/tartanair.yaml"
+CAMERA_CONFIG="${CAMERA_CONFIG:-/home/hz/intr6000/ORB_SLAM2/tartanair.yaml}"
 GT_ROOT="$DATASET_ROOT/INTR6000P_GT_POSES"
 
 # Paths for this sequence
@@ -54,11 +72,17 @@ TIMESTAMPS_FILE="$SEQ_PATH/timestamps.txt"
 GT_FILE="$GT_ROOT/$DIFFICULTY/${SEQUENCE}.txt"
 
 # Output paths
-TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-OUTPUT_DIR="$SCRIPT_DIR/output/quick_eval_${DIFFICULTY}_${SEQUENCE}_${TIMESTAMP}"
+# tools/campaign_journal.py picks the timestamp so it knows the run directory in advance,
+# tools/work_queue.py appends the run index and job id so concurrent repeats do not collide
+TIMESTAMP="${RUN_TIMESTAMP:-$(date +%Y%m%d_%H%M%S)}"
+OUTPUT_DIR="$OUTPUT_ROOT/quick_eval_${DIFFICULTY}_${SEQUENCE}_${TIMESTAMP}"
 TRAJ_FILE="$OUTPUT_DIR/trajectory.txt"
 LOG_FILE="$OUTPUT_DIR/orbslam.log"
 EVO_STATS="$OUTPUT_DIR/evo_statistics.txt"
+FRAME_TRAJ_FILE="$OUTPUT_DIR/frame_trajectory.txt"
+DENSE_TRAJ_FILE="$OUTPUT_DIR/dense_trajectory.txt"
+# Keyframes further apart than this (seconds) are not interpolated
+DENSE_MAX_GAP="${DENSE_MAX_GAP:-1.0}"
 
 # Check uv is available
 if ! command -v uv &> /dev/null; then
@@ -86,6 +110,25 @@ fi
 # Create output directory
 mkdir -p "$OUTPUT_DIR"
 
+# Record how quick_eval ended in run_status.json: the run is complete from then on
+# (all_result/campaign_archive.py only packs complete runs)
+record_exit() {
+    local code=$?
+    if [[ -f "$OUTPUT_DIR/run_status.json" ]]; then
+        python3 - "$OUTPUT_DIR/run_status.json" "$code" <<'EOF_STATUS'
+import json, os, sys
+path, code = sys.argv[1], int(sys.argv[2])
+with open(path, 'r') as f:
+    status = json.load(f)
+status['quick_eval_exit'] = code
+with open(path + '.tmp', 'w') as f:
+    json.dump(status, f, indent=2)
+os.replace(path + '.tmp', path)
+EOF_STATUS
+    fi
+}
+trap record_exit EXIT
+
 log_info "============================================"
 log_info "Quick Evaluation: $DIFFICULTY/$SEQUENCE"
 log_info "============================================"
@@ -98,17 +141,38 @@ echo ""
 log_info "Step 1: Running ORB_SLAM2..."
 cd "$ORBSLAM_ROOT"
 
-"$ORBSLAM_EXEC" "$VOCABULARY" "$CAMERA_CONFIG" "$IMAGES_PATH" "$TIMESTAMPS_FILE" "$OUTPUT_DIR" > "$LOG_FILE" 2>&1 || {
+# Streams the output into $LOG_FILE and keeps $OUTPUT_DIR/run_status.json up to date.
+# ORB_SLAM2 runs inside $OUTPUT_DIR so concurrent runs do not share trajectory files.
+RUNNER_ARGS=()
+if [[ -n "$ABORT_LOST_SECONDS" ]]; then
+    RUNNER_ARGS+=(--abort-lost-after "$ABORT_LOST_SECONDS")
+fi
+if [[ -n "$ABORT_NO_MAP_FRAMES" ]]; then
+    RUNNER_ARGS+=(--abort-no-map-after "$ABORT_NO_MAP_FRAMES")
+fi
+if [[ "$FRAME_TRAJECTORY" == "1" ]]; then
+    RUNNER_ARGS+=(--frame-trajectory "$FRAME_TRAJ_FILE")
+fi
+
+python3 "$ORBSLAM_ROOT/tools/run_orbslam.py" --exec "$ORBSLAM_EXEC" \
+    --vocabulary "$VOCABULARY" --settings "$CAMERA_CONFIG" \
+    --images "$IMAGES_PATH" --timestamps "$TIMESTAMPS_FILE" \
+    --output-dir "$OUTPUT_DIR" --cwd "$OUTPUT_DIR" "${RUNNER_ARGS[@]}"
+RUN_STATUS=$?
+if [[ $RUN_STATUS -eq 3 ]]; then
+    log_error "ORB_SLAM2 run aborted early! Check status: $OUTPUT_DIR/run_status.json"
+    exit 1
+elif [[ $RUN_STATUS -ne 0 ]]; then
     log_error "ORB_SLAM2 failed! Check log: $LOG_FILE"
     exit 1
-}
+fi
 
 # Check for trajectory output
-if [[ -f "KeyFrameTrajectory.txt" ]]; then
-    mv "KeyFrameTrajectory.txt" "$TRAJ_FILE"
+if [[ -f "$OUTPUT_DIR/KeyFrameTrajectory.txt" ]]; then
+    mv "$OUTPUT_DIR/KeyFrameTrajectory.txt" "$TRAJ_FILE"
     log_success "Trajectory saved: $TRAJ_FILE"
-elif [[ -f "CameraTrajectory.txt" ]]; then
-    mv "CameraTrajectory.txt" "$TRAJ_FILE"
+elif [[ -f "$OUTPUT_DIR/CameraTrajectory.txt" ]]; then
+    mv "$OUTPUT_DIR/CameraTrajectory.txt" "$TRAJ_FILE"
     log_success "Trajectory saved: $TRAJ_FILE"
 else
     log_error "No trajectory file generated!"
@@ -133,12 +197,32 @@ uv run --with evo evo_ape tum "$GT_FILE" "$TRAJ_FILE" \
 }
 
 echo 'Generating and saving plots...'
-PLOT_FILE="$OUTPUT_DIR/trajectory_plot.png"
-log_info "Running: uv run evo_ape tum \"$GT_FILE\" \"$TRAJ_FILE\" -r trans_part --plot --plot_mode xyz --save_plot \"$PLOT_FILE\" --serialize_plot \"$OUTPUT_DIR/plot_data.zip\" -as"
-uv run evo_ape tum "$GT_FILE" "$TRAJ_FILE" -r trans_part --plot --plot_mode xyz --save_plot "$PLOT_FILE" --serialize_plot "$OUTPUT_DIR/plot_data.zip" -as || true
+# Downsampled APE-over-time and aligned trajectory plots from ape_results.zip
+uv run python "$ORBSLAM_ROOT/all_result/campaign_archive.py" plot-run "$OUTPUT_DIR" || log_error "Plotting failed"
+if [[ "$EVO_PLOT" == "1" ]]; then
+    PLOT_FILE="$OUTPUT_DIR/evo_plot.png"
+    log_info "Running: uv run evo_ape tum \"$GT_FILE\" \"$TRAJ_FILE\" -r trans_part --plot --plot_mode xyz --save_plot \"$PLOT_FILE\" --serialize_plot \"$OUTPUT_DIR/plot_data.zip\" -as"
+    uv run evo_ape tum "$GT_FILE" "$TRAJ_FILE" -r trans_part --plot --plot_mode xyz --save_plot "$PLOT_FILE" --serialize_plot "$OUTPUT_DIR/plot_data.zip" -as || true
+fi
 
 
 log_success "EVO evaluation completed"
+
+echo 'Running dense EVO APE (keyframes interpolated onto ground truth stamps)...'
+uv run python "$ORBSLAM_ROOT/all_result/trajectory_interp.py" "$TRAJ_FILE" "$GT_FILE" "$DENSE_TRAJ_FILE" \
+    --max-gap "$DENSE_MAX_GAP" && \
+uv run --with evo evo_ape tum "$GT_FILE" "$DENSE_TRAJ_FILE" -r trans_part -as \
+    --verbose > "$OUTPUT_DIR/evo_dense_statistics.txt" 2>&1 || log_error "Dense evaluation failed"
+
+if [[ -f "$FRAME_TRAJ_FILE" ]]; then
+    echo 'Running EVO APE on the per-frame trajectory...'
+    uv run --with evo evo_ape tum "$GT_FILE" "$FRAME_TRAJ_FILE" -r trans_part -as \
+        --verbose > "$OUTPUT_DIR/evo_frame_statistics.txt" 2>&1 || log_error "Per-frame evaluation failed"
+fi
+
+echo 'Analysing scale drift along the trajectory...'
+uv run python "$ORBSLAM_ROOT/all_result/scale_drift.py" "$OUTPUT_DIR" --gt "$GT_FILE" \
+    --output-dir "$OUTPUT_DIR" || log_error "Scale drift analysis failed"
 echo ""
 
 # Step 3: Display results
@@ -156,22 +240,24 @@ log_info "Output files:"
 log_info "  - Trajectory: $TRAJ_FILE"
 log_info "  - EVO stats: $EVO_STATS"
 log_info "  - ORB_SLAM2 log: $LOG_FILE"
+log_info "  - Run status: $OUTPUT_DIR/run_status.json"
+log_info "  - Tracking states: $OUTPUT_DIR/tracking_states.bin (all_result/tracking_states.py)"
 log_info "  - Results: $OUTPUT_DIR/ape_results.zip"
-if [[ -f "$OUTPUT_DIR/trajectory_plot.pdf" ]]; then
-    log_info "  - Plot: $OUTPUT_DIR/trajectory_plot.pdf"
+log_info "  - Scale drift: $OUTPUT_DIR/scale_drift.json"
+log_info "  - Dense EVO stats: $OUTPUT_DIR/evo_dense_statistics.txt"
+if [[ -f "$FRAME_TRAJ_FILE" ]]; then
+    log_info "  - Per-frame trajectory: $FRAME_TRAJ_FILE"
+fi
+if [[ -f "$OUTPUT_DIR/trace.json" ]]; then
+    log_info "  - Thread trace: $OUTPUT_DIR/trace.json (chrome://tracing, ui.perfetto.dev)"
+fi
+if [[ -f "$OUTPUT_DIR/trajectory_plot.png" ]]; then
+    log_info "  - Plots: $OUTPUT_DIR/ape_plot.png, $OUTPUT_DIR/trajectory_plot.png"
 fi
 echo ""
 
 log_success "Evaluation complete!"
 
 
-# Easy 难度：
-# ./quick_eval_intr6000p.sh easy carwelding2
-# ./quick_eval_intr6000p.sh easy factory1
-# ./quick_eval_intr6000p.sh easy hospital
-# Medium 难度：
-# ./quick_eval_intr6000p.sh medium factory2
-# ./quick_eval_intr6000p.sh medium factory6
-# Hard 难度：
-# ./quick_eval_intr6000p.sh hard amusement1
-# ./quick_eval_intr6000p.sh hard amusement2
\ No newline at end of file
+# 所有序列（难度 序列）：
+# python3 tools/dataset_manifest.py list --details
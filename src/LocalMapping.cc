@@ -22,6 +22,7 @@
 #include "LoopClosing.h"
 #include "ORBmatcher.h"
 #include "Optimizer.h"
+#include "Tracer.h"
 
 #include<mutex>
 
@@ -46,6 +47,7 @@ void LocalMapping::SetTracker(Tracking *pTracker)
 
 void LocalMapping::Run()
 {
+    Tracer::SetThreadName("LocalMapping");
 
     mbFinished = false;
 
@@ -78,7 +80,11 @@ void LocalMapping::Run()
             {
                 // Local BA
                 if(mpMap->KeyFramesInMap()>2)
+                {
+                    TraceScope traceBA("LocalBA","mapping");
                     Optimizer::LocalBundleAdjustment(mpCurrentKeyFrame,&mbAbortBA, mpMap);
+                    traceBA.SetArg("aborted",mbAbortBA);
+                }
 
                 // Check redundant local Keyframes
                 KeyFrameCulling();
@@ -127,11 +133,14 @@ bool LocalMapping::CheckNewKeyFrames()
 
 void LocalMapping::ProcessNewKeyFrame()
 {
+    TraceScope trace("ProcessNewKeyFrame","mapping");
+
     {
         unique_lock<mutex> lock(mMutexNewKFs);
         mpCurrentKeyFrame = mlNewKeyFrames.front();
         mlNewKeyFrames.pop_front();
     }
+    trace.SetArg("keyframe",mpCurrentKeyFrame->mnId);
 
     // Compute Bags of Words structures
     mpCurrentKeyFrame->ComputeBoW();
@@ -169,6 +178,8 @@ void LocalMapping::ProcessNewKeyFrame()
 
 void LocalMapping::MapPointCulling()
 {
+    TraceScope trace("MapPointCulling","mapping");
+
     // Check Recent Added MapPoints
     list<MapPoint*>::iterator lit = mlpRecentAddedMapPoints.begin();
     const unsigned long int nCurrentKFid = mpCurrentKeyFrame->mnId;
@@ -206,6 +217,8 @@ void LocalMapping::MapPointCulling()
 
 void LocalMapping::CreateNewMapPoints()
 {
+    TraceScope trace("CreateNewMapPoints","mapping");
+
     // Retrieve neighbor keyframes in covisibility graph
     int nn = 10;
     if(mbMonocular)
@@ -453,6 +466,8 @@ void LocalMapping::CreateNewMapPoints()
 
 void LocalMapping::SearchInNeighbors()
 {
+    TraceScope trace("SearchInNeighbors","mapping");
+
     // Retrieve neighbor keyframes
     int nn = 10;
     if(mbMonocular)
@@ -627,10 +642,13 @@ bool LocalMapping::SetNotStop(bool flag)
 void LocalMapping::InterruptBA()
 {
     mbAbortBA = true;
+    Tracer::Instant("InterruptBA","mapping");
 }
 
 void LocalMapping::KeyFrameCulling()
 {
+    TraceScope trace("KeyFrameCulling","mapping");
+
     // Check redundant keyframes (only local keyframes)
     // A keyframe is considered redundant if the 90% of the MapPoints it sees, are seen
     // in at least other 3 keyframes (in the same or finer scale)
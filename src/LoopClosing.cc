@@ -28,6 +28,8 @@
 
 #include "ORBmatcher.h"
 
+#include "Tracer.h"
+
 #include<mutex>
 #include<thread>
 
@@ -56,6 +58,8 @@ void LoopClosing::SetLocalMapper(LocalMapping *pLocalMapper)
 
 void LoopClosing::Run()
 {
+    Tracer::SetThreadName("LoopClosing");
+
     mbFinished =false;
 
     while(1)
@@ -102,6 +106,8 @@ bool LoopClosing::CheckNewKeyFrames()
 
 bool LoopClosing::DetectLoop()
 {
+    TraceScope trace("DetectLoop","loop");
+
     {
         unique_lock<mutex> lock(mMutexLoopQueue);
         mpCurrentKF = mlpLoopKeyFrameQueue.front();
@@ -230,6 +236,8 @@ bool LoopClosing::DetectLoop()
 
 bool LoopClosing::ComputeSim3()
 {
+    TraceScope trace("ComputeSim3","loop");
+
     // For each consistent loop candidate we try to compute a Sim3
 
     const int nInitialCandidates = mvpEnoughConsistentCandidates.size();
@@ -401,6 +409,9 @@ bool LoopClosing::ComputeSim3()
 
 void LoopClosing::CorrectLoop()
 {
+    TraceScope trace("CorrectLoop","loop");
+    trace.SetArg("keyframe",mpCurrentKF->mnId);
+
     cout << "Loop detected!" << endl;
 
     // Send a stop signal to Local Mapping
@@ -423,10 +434,12 @@ void LoopClosing::CorrectLoop()
     }
 
     // Wait until Local Mapping has effectively stopped
+    TraceScope traceWait("WaitLocalMapping","lock");
     while(!mpLocalMapper->isStopped())
     {
         usleep(1000);
     }
+    traceWait.Stop();
 
     // Ensure current keyframe is updated
     mpCurrentKF->UpdateConnections();
@@ -442,7 +455,8 @@ void LoopClosing::CorrectLoop()
 
     {
         // Get Map Mutex
-        unique_lock<mutex> lock(mpMap->mMutexMapUpdate);
+        unique_lock<mutex> lock(mpMap->mMutexMapUpdate, defer_lock);
+        Tracer::Lock(lock,"MapUpdate");
 
         for(vector<KeyFrame*>::iterator vit=mvpCurrentConnectedKFs.begin(), vend=mvpCurrentConnectedKFs.end(); vit!=vend; vit++)
         {
@@ -564,7 +578,9 @@ void LoopClosing::CorrectLoop()
     }
 
     // Optimize graph
+    TraceScope traceGraph("OptimizeEssentialGraph","loop");
     Optimizer::OptimizeEssentialGraph(mpMap, mpMatchedKF, mpCurrentKF, NonCorrectedSim3, CorrectedSim3, LoopConnections, mbFixScale);
+    traceGraph.Stop();
 
     mpMap->InformNewBigChange();
 
@@ -599,7 +615,8 @@ void LoopClosing::SearchAndFuse(const KeyFrameAndPose &CorrectedPosesMap)
         matcher.Fuse(pKF,cvScw,mvpLoopMapPoints,4,vpReplacePoints);
 
         // Get Map Mutex
-        unique_lock<mutex> lock(mpMap->mMutexMapUpdate);
+        unique_lock<mutex> lock(mpMap->mMutexMapUpdate, defer_lock);
+        Tracer::Lock(lock,"MapUpdate");
         const int nLP = mvpLoopMapPoints.size();
         for(int i=0; i<nLP;i++)
         {
@@ -644,10 +661,14 @@ void LoopClosing::ResetIfRequested()
 
 void LoopClosing::RunGlobalBundleAdjustment(unsigned long nLoopKF)
 {
+    Tracer::SetThreadName("GlobalBA");
     cout << "Starting Global Bundle Adjustment" << endl;
 
     int idx =  mnFullBAIdx;
+    TraceScope traceBA("GlobalBA","loop");
     Optimizer::GlobalBundleAdjustemnt(mpMap,10,&mbStopGBA,nLoopKF,false);
+    traceBA.SetArg("aborted",mbStopGBA);
+    traceBA.Stop();
 
     // Update all MapPoints and KeyFrames
     // Local Mapping was active during BA, that means that there might be new keyframes
@@ -671,7 +692,8 @@ void LoopClosing::RunGlobalBundleAdjustment(unsigned long nLoopKF)
             }
 
             // Get Map Mutex
-            unique_lock<mutex> lock(mpMap->mMutexMapUpdate);
+            unique_lock<mutex> lock(mpMap->mMutexMapUpdate, defer_lock);
+            Tracer::Lock(lock,"MapUpdate");
 
             // Correct keyframes starting at map first keyframe
             list<KeyFrame*> lpKFtoCheck(mpMap->mvpKeyFrameOrigins.begin(),mpMap->mvpKeyFrameOrigins.end());
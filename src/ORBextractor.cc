@@ -59,6 +59,12 @@
 #include <opencv2/features2d/features2d.hpp>
 #include <opencv2/imgproc/imgproc.hpp>
 #include <vector>
+#include <chrono>
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <functional>
+#include <exception>
 
 #include "ORBextractor.h"
 
@@ -73,6 +79,132 @@ const int PATCH_SIZE = 31;
 const int HALF_PATCH_SIZE = 15;
 const int EDGE_THRESHOLD = 19;
 
+#ifdef COMPILEDWITHC11
+typedef std::chrono::steady_clock StageClock;
+#else
+typedef std::chrono::monotonic_clock StageClock;
+#endif
+
+static double ElapsedMs(const StageClock::time_point &tStart)
+{
+    return std::chrono::duration<double, std::milli>(StageClock::now() - tStart).count();
+}
+
+// Fixed pool of threads running the tasks 0..nTasks-1 of one Run at a time, lower
+// indices first. The calling thread takes tasks as well, so a pool of nThreads
+// starts nThreads-1 workers. An exception thrown by a task is rethrown by Run,
+// tasks that have not started yet are skipped.
+class LevelWorkerPool
+{
+public:
+    LevelWorkerPool(int nThreads):
+        mpTask(NULL), mnTasks(0), mnNextTask(0), mnPending(0), mbStop(false), mpException()
+    {
+        for(int i=1; i<nThreads; i++)
+            mvWorkers.push_back(thread(&LevelWorkerPool::WorkerLoop, this));
+    }
+
+    ~LevelWorkerPool()
+    {
+        {
+            unique_lock<mutex> lock(mMutex);
+            mbStop = true;
+        }
+        mcvWork.notify_all();
+        for(size_t i=0; i<mvWorkers.size(); i++)
+            mvWorkers[i].join();
+    }
+
+    // Returns when task(i) has finished for every i
+    void Run(int nTasks, const function<void(int)> &task)
+    {
+        {
+            unique_lock<mutex> lock(mMutex);
+            mpTask = &task;
+            mnTasks = nTasks;
+            mnNextTask = 0;
+            mnPending = nTasks;
+            mpException = exception_ptr();
+        }
+        mcvWork.notify_all();
+
+        RunTasks();
+
+        unique_lock<mutex> lock(mMutex);
+        while(mnPending>0)
+            mcvDone.wait(lock);
+        mpTask = NULL;
+
+        if(mpException)
+        {
+            exception_ptr pException = mpException;
+            mpException = exception_ptr();
+            lock.unlock();
+            rethrow_exception(pException);
+        }
+    }
+
+private:
+    // Take tasks of the current Run until none is left
+    void RunTasks()
+    {
+        unique_lock<mutex> lock(mMutex);
+        while(mnNextTask<mnTasks)
+        {
+            const int i = mnNextTask++;
+            const function<void(int)>* pTask = mpTask;
+            lock.unlock();
+            exception_ptr pException;
+            try
+            {
+                (*pTask)(i);
+            }
+            catch(...)
+            {
+                pException = current_exception();
+            }
+            lock.lock();
+            if(pException)
+            {
+                // Keep the first exception for Run and drop the tasks not started yet
+                if(!mpException)
+                    mpException = pException;
+                mnPending -= mnTasks-mnNextTask;
+                mnNextTask = mnTasks;
+            }
+            if(--mnPending==0)
+                mcvDone.notify_all();
+        }
+    }
+
+    void WorkerLoop()
+    {
+        unique_lock<mutex> lock(mMutex);
+        while(true)
+        {
+            while(!mbStop && mnNextTask>=mnTasks)
+                mcvWork.wait(lock);
+            if(mbStop)
+                return;
+            lock.unlock();
+            RunTasks();
+            lock.lock();
+        }
+    }
+
+    vector<thread> mvWorkers;
+    mutex mMutex;
+    condition_variable mcvWork;
+    condition_variable mcvDone;
+
+    const function<void(int)>* mpTask;
+    int mnTasks;
+    int mnNextTask;
+    int mnPending;
+    bool mbStop;
+    exception_ptr mpException;
+};
+
 
 static float IC_Angle(const Mat& image, Point2f pt,  const vector<int> & u_max)
 {
@@ -408,9 +540,10 @@ static int bit_pattern_31_[256*4] =
 };
 
 ORBextractor::ORBextractor(int _nfeatures, float _scaleFactor, int _nlevels,
-         int _iniThFAST, int _minThFAST):
+         int _iniThFAST, int _minThFAST, int _nThreads):
     nfeatures(_nfeatures), scaleFactor(_scaleFactor), nlevels(_nlevels),
-    iniThFAST(_iniThFAST), minThFAST(_minThFAST)
+    iniThFAST(_iniThFAST), minThFAST(_minThFAST), nThreads(max(_nThreads,1)),
+    mpWorkerPool(static_cast<LevelWorkerPool*>(NULL))
 {
     mvScaleFactor.resize(nlevels);
     mvLevelSigma2.resize(nlevels);
@@ -431,6 +564,7 @@ ORBextractor::ORBextractor(int _nfeatures, float _scaleFactor, int _nlevels,
     }
 
     mvImagePyramid.resize(nlevels);
+    mvvStageTimes.assign(NUM_STAGES, vector<double>(nlevels, 0.0));
 
     mnFeaturesPerLevel.resize(nlevels);
     float factor = 1.0f / scaleFactor;
@@ -467,6 +601,15 @@ ORBextractor::ORBextractor(int _nfeatures, float _scaleFactor, int _nlevels,
         umax[v] = v0;
         ++v0;
     }
+
+    // No point in more workers than levels
+    if(min(nThreads,nlevels)>1)
+        mpWorkerPool = new LevelWorkerPool(min(nThreads,nlevels));
+}
+
+ORBextractor::~ORBextractor()
+{
+    delete mpWorkerPool;
 }
 
 static void computeOrientation(const Mat& image, vector<KeyPoint>& keypoints, const vector<int>& umax)
@@ -766,90 +909,102 @@ void ORBextractor::ComputeKeyPointsOctTree(vector<vector<KeyPoint> >& allKeypoin
 {
     allKeypoints.resize(nlevels);
 
+    for (int level = 0; level < nlevels; ++level)
+        ComputeKeyPointsLevel(level, allKeypoints[level]);
+}
+
+// FAST, octree distribution and orientation of one pyramid level. Only reads the
+// pyramid and writes to its own level, so levels can be processed concurrently.
+void ORBextractor::ComputeKeyPointsLevel(const int &level, vector<KeyPoint>& keypoints)
+{
     const float W = 30;
 
-    for (int level = 0; level < nlevels; ++level)
-    {
-        const int minBorderX = EDGE_THRESHOLD-3;
-        const int minBorderY = minBorderX;
-        const int maxBorderX = mvImagePyramid[level].cols-EDGE_THRESHOLD+3;
-        const int maxBorderY = mvImagePyramid[level].rows-EDGE_THRESHOLD+3;
+    StageClock::time_point tStage = StageClock::now();
 
-        vector<cv::KeyPoint> vToDistributeKeys;
-        vToDistributeKeys.reserve(nfeatures*10);
+    const int minBorderX = EDGE_THRESHOLD-3;
+    const int minBorderY = minBorderX;
+    const int maxBorderX = mvImagePyramid[level].cols-EDGE_THRESHOLD+3;
+    const int maxBorderY = mvImagePyramid[level].rows-EDGE_THRESHOLD+3;
 
-        const float width = (maxBorderX-minBorderX);
-        const float height = (maxBorderY-minBorderY);
+    vector<cv::KeyPoint> vToDistributeKeys;
+    vToDistributeKeys.reserve(nfeatures*10);
 
-        const int nCols = width/W;
-        const int nRows = height/W;
-        const int wCell = ceil(width/nCols);
-        const int hCell = ceil(height/nRows);
+    const float width = (maxBorderX-minBorderX);
+    const float height = (maxBorderY-minBorderY);
 
-        for(int i=0; i<nRows; i++)
-        {
-            const float iniY =minBorderY+i*hCell;
-            float maxY = iniY+hCell+6;
+    const int nCols = width/W;
+    const int nRows = height/W;
+    const int wCell = ceil(width/nCols);
+    const int hCell = ceil(height/nRows);
+
+    for(int i=0; i<nRows; i++)
+    {
+        const float iniY =minBorderY+i*hCell;
+        float maxY = iniY+hCell+6;
 
-            if(iniY>=maxBorderY-3)
+        if(iniY>=maxBorderY-3)
+            continue;
+        if(maxY>maxBorderY)
+            maxY = maxBorderY;
+
+        for(int j=0; j<nCols; j++)
+        {
+            const float iniX =minBorderX+j*wCell;
+            float maxX = iniX+wCell+6;
+            if(iniX>=maxBorderX-6)
                 continue;
-            if(maxY>maxBorderY)
-                maxY = maxBorderY;
+            if(maxX>maxBorderX)
+                maxX = maxBorderX;
 
-            for(int j=0; j<nCols; j++)
-            {
-                const float iniX =minBorderX+j*wCell;
-                float maxX = iniX+wCell+6;
-                if(iniX>=maxBorderX-6)
-                    continue;
-                if(maxX>maxBorderX)
-                    maxX = maxBorderX;
+            vector<cv::KeyPoint> vKeysCell;
+            FAST(mvImagePyramid[level].rowRange(iniY,maxY).colRange(iniX,maxX),
+                 vKeysCell,iniThFAST,true);
 
-                vector<cv::KeyPoint> vKeysCell;
+            if(vKeysCell.empty())
+            {
                 FAST(mvImagePyramid[level].rowRange(iniY,maxY).colRange(iniX,maxX),
-                     vKeysCell,iniThFAST,true);
-
-                if(vKeysCell.empty())
-                {
-                    FAST(mvImagePyramid[level].rowRange(iniY,maxY).colRange(iniX,maxX),
-                         vKeysCell,minThFAST,true);
-                }
+                     vKeysCell,minThFAST,true);
+            }
 
-                if(!vKeysCell.empty())
+            if(!vKeysCell.empty())
+            {
+                for(vector<cv::KeyPoint>::iterator vit=vKeysCell.begin(); vit!=vKeysCell.end();vit++)
                 {
-                    for(vector<cv::KeyPoint>::iterator vit=vKeysCell.begin(); vit!=vKeysCell.end();vit++)
-                    {
-                        (*vit).pt.x+=j*wCell;
-                        (*vit).pt.y+=i*hCell;
-                        vToDistributeKeys.push_back(*vit);
-                    }
+                    (*vit).pt.x+=j*wCell;
+                    (*vit).pt.y+=i*hCell;
+                    vToDistributeKeys.push_back(*vit);
                 }
-
             }
+
         }
+    }
 
-        vector<KeyPoint> & keypoints = allKeypoints[level];
-        keypoints.reserve(nfeatures);
+    mvvStageTimes[STAGE_FAST][level] = ElapsedMs(tStage);
+    tStage = StageClock::now();
 
-        keypoints = DistributeOctTree(vToDistributeKeys, minBorderX, maxBorderX,
-                                      minBorderY, maxBorderY,mnFeaturesPerLevel[level], level);
+    keypoints.reserve(nfeatures);
 
-        const int scaledPatchSize = PATCH_SIZE*mvScaleFactor[level];
+    keypoints = DistributeOctTree(vToDistributeKeys, minBorderX, maxBorderX,
+                                  minBorderY, maxBorderY,mnFeaturesPerLevel[level], level);
 
-        // Add border to coordinates and scale information
-        const int nkps = keypoints.size();
-        for(int i=0; i<nkps ; i++)
-        {
-            keypoints[i].pt.x+=minBorderX;
-            keypoints[i].pt.y+=minBorderY;
-            keypoints[i].octave=level;
-            keypoints[i].size = scaledPatchSize;
-        }
+    const int scaledPatchSize = PATCH_SIZE*mvScaleFactor[level];
+
+    // Add border to coordinates and scale information
+    const int nkps = keypoints.size();
+    for(int i=0; i<nkps ; i++)
+    {
+        keypoints[i].pt.x+=minBorderX;
+        keypoints[i].pt.y+=minBorderY;
+        keypoints[i].octave=level;
+        keypoints[i].size = scaledPatchSize;
     }
 
+    mvvStageTimes[STAGE_DISTRIBUTE][level] = ElapsedMs(tStage);
+
     // compute orientations
-    for (int level = 0; level < nlevels; ++level)
-        computeOrientation(mvImagePyramid[level], allKeypoints[level], umax);
+    tStage = StageClock::now();
+    computeOrientation(mvImagePyramid[level], keypoints, umax);
+    mvvStageTimes[STAGE_ORIENTATION][level] = ElapsedMs(tStage);
 }
 
 void ORBextractor::ComputeKeyPointsOld(std::vector<std::vector<KeyPoint> > &allKeypoints)
@@ -1040,6 +1195,27 @@ static void computeDescriptors(const Mat& image, vector<KeyPoint>& keypoints, Ma
         computeOrbDescriptor(keypoints[i], image, &pattern[0], descriptors.ptr((int)i));
 }
 
+// Blur and descriptors of the keypoints of one pyramid level, nothing for a level
+// without keypoints
+void ORBextractor::ComputeDescriptorsLevel(const int &level, vector<KeyPoint>& keypoints, Mat& descriptors)
+{
+    mvvStageTimes[STAGE_BLUR][level] = 0.0;
+    mvvStageTimes[STAGE_DESCRIPTORS][level] = 0.0;
+    if(keypoints.empty())
+        return;
+
+    // preprocess the resized image
+    StageClock::time_point tStage = StageClock::now();
+    Mat workingMat = mvImagePyramid[level].clone();
+    GaussianBlur(workingMat, workingMat, Size(7, 7), 2, 2, BORDER_REFLECT_101);
+    mvvStageTimes[STAGE_BLUR][level] = ElapsedMs(tStage);
+
+    // Compute the descriptors
+    tStage = StageClock::now();
+    computeDescriptors(workingMat, keypoints, descriptors, pattern);
+    mvvStageTimes[STAGE_DESCRIPTORS][level] = ElapsedMs(tStage);
+}
+
 void ORBextractor::operator()( InputArray _image, InputArray _mask, vector<KeyPoint>& _keypoints,
                       OutputArray _descriptors)
 { 
@@ -1053,7 +1229,22 @@ void ORBextractor::operator()( InputArray _image, InputArray _mask, vector<KeyPo
     ComputePyramid(image);
 
     vector < vector<KeyPoint> > allKeypoints;
-    ComputeKeyPointsOctTree(allKeypoints);
+    vector<Mat> vLevelDescriptors;
+    if(mpWorkerPool)
+    {
+        // Once the pyramid is built the levels are independent: each worker takes
+        // whole levels, largest first, into its own keypoint and descriptor buffers,
+        // which are concatenated in level order below
+        allKeypoints.resize(nlevels);
+        vLevelDescriptors.resize(nlevels);
+        mpWorkerPool->Run(nlevels, [&](int level)
+        {
+            ComputeKeyPointsLevel(level, allKeypoints[level]);
+            ComputeDescriptorsLevel(level, allKeypoints[level], vLevelDescriptors[level]);
+        });
+    }
+    else
+        ComputeKeyPointsOctTree(allKeypoints);
     //ComputeKeyPointsOld(allKeypoints);
 
     Mat descriptors;
@@ -1078,17 +1269,19 @@ void ORBextractor::operator()( InputArray _image, InputArray _mask, vector<KeyPo
         vector<KeyPoint>& keypoints = allKeypoints[level];
         int nkeypointsLevel = (int)keypoints.size();
 
+        if(!mpWorkerPool)
+        {
+            Mat desc;
+            if(nkeypointsLevel>0)
+                desc = descriptors.rowRange(offset, offset + nkeypointsLevel);
+            ComputeDescriptorsLevel(level, keypoints, desc);
+        }
+        else if(nkeypointsLevel>0)
+            vLevelDescriptors[level].copyTo(descriptors.rowRange(offset, offset + nkeypointsLevel));
+
         if(nkeypointsLevel==0)
             continue;
 
-        // preprocess the resized image
-        Mat workingMat = mvImagePyramid[level].clone();
-        GaussianBlur(workingMat, workingMat, Size(7, 7), 2, 2, BORDER_REFLECT_101);
-
-        // Compute the descriptors
-        Mat desc = descriptors.rowRange(offset, offset + nkeypointsLevel);
-        computeDescriptors(workingMat, keypoints, desc, pattern);
-
         offset += nkeypointsLevel;
 
         // Scale keypoint coordinates
@@ -1108,6 +1301,8 @@ void ORBextractor::ComputePyramid(cv::Mat image)
 {
     for (int level = 0; level < nlevels; ++level)
     {
+        StageClock::time_point tStage = StageClock::now();
+
         float scale = mvInvScaleFactor[level];
         Size sz(cvRound((float)image.cols*scale), cvRound((float)image.rows*scale));
         Size wholeSize(sz.width + EDGE_THRESHOLD*2, sz.height + EDGE_THRESHOLD*2);
@@ -1127,6 +1322,8 @@ void ORBextractor::ComputePyramid(cv::Mat image)
             copyMakeBorder(image, temp, EDGE_THRESHOLD, EDGE_THRESHOLD, EDGE_THRESHOLD, EDGE_THRESHOLD,
                            BORDER_REFLECT_101);            
         }
+
+        mvvStageTimes[STAGE_PYRAMID][level] = ElapsedMs(tStage);
     }
 
 }
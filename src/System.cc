@@ -22,6 +22,7 @@
 
 #include "System.h"
 #include "Converter.h"
+#include "Tracer.h"
 #include <thread>
 #include <pangolin/pangolin.h>
 #include <iomanip>
@@ -31,8 +32,11 @@ namespace ORB_SLAM2
 
 System::System(const string &strVocFile, const string &strSettingsFile, const eSensor sensor,
                const bool bUseViewer):mSensor(sensor), mpViewer(static_cast<Viewer*>(NULL)), mbReset(false),mbActivateLocalizationMode(false),
-        mbDeactivateLocalizationMode(false)
+        mbDeactivateLocalizationMode(false), mLastFrameState(FRAME_NOT_INITIALIZED)
 {
+    // Tracking runs in the thread that constructs the system
+    Tracer::SetThreadName("Tracking");
+
     // Output welcome message
     cout << endl <<
     "ORB-SLAM2 Copyright (C) 2014-2016 Raul Mur-Artal, University of Zaragoza." << endl <<
@@ -62,7 +66,12 @@ System::System(const string &strVocFile, const string &strSettingsFile, const eS
     cout << endl << "Loading ORB Vocabulary. This could take a while..." << endl;
 
     mpVocabulary = new ORBVocabulary();
-    bool bVocLoad = mpVocabulary->loadFromTextFile(strVocFile);
+    bool bVocLoad = false;
+    // Binary vocabularies (see tools/orbvoc_convert.py) load much faster than the text ones
+    if(strVocFile.size()>4 && strVocFile.compare(strVocFile.size()-4,4,".bin")==0)
+        bVocLoad = mpVocabulary->loadFromBinaryFile(strVocFile);
+    else
+        bVocLoad = mpVocabulary->loadFromTextFile(strVocFile);
     if(!bVocLoad)
     {
         cerr << "Wrong path to vocabulary. " << endl;
@@ -161,6 +170,7 @@ cv::Mat System::TrackStereo(const cv::Mat &imLeft, const cv::Mat &imRight, const
     mTrackingState = mpTracker->mState;
     mTrackedMapPoints = mpTracker->mCurrentFrame.mvpMapPoints;
     mTrackedKeyPointsUn = mpTracker->mCurrentFrame.mvKeysUn;
+    RecordTrackingState();
     return Tcw;
 }
 
@@ -212,6 +222,7 @@ cv::Mat System::TrackRGBD(const cv::Mat &im, const cv::Mat &depthmap, const doub
     mTrackingState = mpTracker->mState;
     mTrackedMapPoints = mpTracker->mCurrentFrame.mvpMapPoints;
     mTrackedKeyPointsUn = mpTracker->mCurrentFrame.mvKeysUn;
+    RecordTrackingState();
     return Tcw;
 }
 
@@ -263,6 +274,7 @@ cv::Mat System::TrackMonocular(const cv::Mat &im, const double &timestamp)
     mTrackingState = mpTracker->mState;
     mTrackedMapPoints = mpTracker->mCurrentFrame.mvpMapPoints;
     mTrackedKeyPointsUn = mpTracker->mCurrentFrame.mvKeysUn;
+    RecordTrackingState();
 
     return Tcw;
 }
@@ -315,6 +327,8 @@ void System::Shutdown()
         usleep(5000);
     }
 
+    Tracer::Save();
+
     if(mpViewer)
         pangolin::BindToContext("ORB-SLAM2: Map Viewer");
 }
@@ -322,13 +336,13 @@ void System::Shutdown()
 void System::SaveTrajectoryTUM(const string &filename)
 {
     cout << endl << "Saving camera trajectory to " << filename << " ..." << endl;
-    if(mSensor==MONOCULAR)
+
+    vector<KeyFrame*> vpKFs = mpMap->GetAllKeyFrames();
+    if(vpKFs.empty())
     {
-        cerr << "ERROR: SaveTrajectoryTUM cannot be used for monocular." << endl;
+        cerr << "ERROR: no keyframes in the map, camera trajectory not saved." << endl;
         return;
     }
-
-    vector<KeyFrame*> vpKFs = mpMap->GetAllKeyFrames();
     sort(vpKFs.begin(),vpKFs.end(),KeyFrame::lId);
 
     // Transform all keyframes so that the first keyframe is at the origin.
@@ -494,4 +508,32 @@ void System::SetFailureVideoOutputDir(const std::string &outputDir)
     mpTracker->SetFailureVideoOutputDir(outputDir);
 }
 
+void System::SetTrackingStateFile(const string &filename)
+{
+    mTrackingStateFile.open(filename.c_str(), ios::out | ios::binary | ios::trunc);
+    if(!mTrackingStateFile.is_open())
+        cerr << "Failed to open tracking state file: " << filename << endl;
+}
+
+void System::SetTraceFile(const string &filename)
+{
+    Tracer::Enable(filename);
+}
+
+void System::RecordTrackingState()
+{
+    if(!mTrackingStateFile.is_open())
+        return;
+
+    int state = FRAME_NOT_INITIALIZED;
+    if(mTrackingState==Tracking::OK)
+        state = (mLastFrameState==FRAME_LOST) ? FRAME_RELOCALIZED : FRAME_OK;
+    else if(mTrackingState==Tracking::LOST)
+        state = FRAME_LOST;
+    mLastFrameState = state;
+
+    mTrackingStateFile.put(static_cast<char>(state));
+    mTrackingStateFile.flush();
+}
+
 } //namespace ORB_SLAM
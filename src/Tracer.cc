@@ -0,0 +1,242 @@
+/**
+* This file is part of ORB-SLAM2.
+*
+* Copyright (C) 2014-2016 Raúl Mur-Artal <raulmur at unizar dot es> (University of Zaragoza)
+* For more information see <https://github.com/raulmur/ORB_SLAM2>
+*
+* ORB-SLAM2 is free software: you can redistribute it and/or modify
+* it under the terms of the GNU General Public License as published by
+* the Free Software Foundation, either version 3 of the License, or
+* (at your option) any later version.
+*
+* ORB-SLAM2 is distributed in the hope that it will be useful,
+* but WITHOUT ANY WARRANTY; without even the implied warranty of
+* MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+* GNU General Public License for more details.
+*
+* You should have received a copy of the GNU General Public License
+* along with ORB-SLAM2. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+#include "Tracer.h"
+
+#include<vector>
+#include<chrono>
+#include<fstream>
+#include<sstream>
+#include<iostream>
+#include<iomanip>
+#include<cstdio>
+#include<cstdlib>
+
+using namespace std;
+
+namespace ORB_SLAM2
+{
+
+#ifdef COMPILEDWITHC11
+typedef std::chrono::steady_clock TraceClock;
+#else
+typedef std::chrono::monotonic_clock TraceClock;
+#endif
+
+struct TraceEvent
+{
+    const char* name;
+    const char* category;
+    long long start;
+    long long end;
+    const char* argName;
+    long argValue;
+    bool instant;
+};
+
+// Events of one thread. Only its thread appends, Save reads it under the mutex.
+struct ThreadBuffer
+{
+    int tid;
+    string name;
+    mutex mMutex;
+    vector<TraceEvent> vEvents;
+};
+
+atomic<bool> Tracer::mbEnabled(false);
+
+static mutex gMutexTracer;
+static vector<ThreadBuffer*> gvpBuffers;
+static string gTraceFile;
+static TraceClock::time_point gTraceStart;
+static size_t gnSavedEvents = 0;
+static bool gbSaved = false;
+
+// Buffer of the calling thread, created on first use (buffers outlive their threads)
+static ThreadBuffer* GetThreadBuffer()
+{
+    static thread_local ThreadBuffer* pBuffer = NULL;
+    if(!pBuffer)
+    {
+        unique_lock<mutex> lock(gMutexTracer);
+        pBuffer = new ThreadBuffer();
+        pBuffer->tid = gvpBuffers.size()+1;
+        pBuffer->vEvents.reserve(4096);
+        gvpBuffers.push_back(pBuffer);
+    }
+    return pBuffer;
+}
+
+static string EscapeJson(const string &s)
+{
+    string escaped;
+    for(size_t i=0; i<s.size(); i++)
+    {
+        if(s[i]=='"' || s[i]=='\\')
+            escaped += '\\';
+        escaped += s[i];
+    }
+    return escaped;
+}
+
+// Runs that end with exit() (e.g. after the failure video) still write their trace
+static void SaveAtExit()
+{
+    Tracer::Save();
+}
+
+void Tracer::Enable(const string &filename)
+{
+    unique_lock<mutex> lock(gMutexTracer);
+    gTraceFile = filename;
+    if(!IsEnabled())
+    {
+        gTraceStart = TraceClock::now();
+        atexit(SaveAtExit);
+    }
+    mbEnabled.store(true, memory_order_release);
+}
+
+void Tracer::SetThreadName(const string &name)
+{
+    ThreadBuffer* pBuffer = GetThreadBuffer();
+    unique_lock<mutex> lock(pBuffer->mMutex);
+    pBuffer->name = name;
+}
+
+long long Tracer::Now()
+{
+    return chrono::duration_cast<chrono::nanoseconds>(TraceClock::now() - gTraceStart).count();
+}
+
+void Tracer::Record(const char* name, const char* category, long long tStart, long long tEnd,
+                    const char* argName, long argValue)
+{
+    TraceEvent event = {name, category, tStart, tEnd, argName, argValue, false};
+    ThreadBuffer* pBuffer = GetThreadBuffer();
+    unique_lock<mutex> lock(pBuffer->mMutex);
+    pBuffer->vEvents.push_back(event);
+}
+
+void Tracer::Instant(const char* name, const char* category)
+{
+    if(!IsEnabled())
+        return;
+    TraceEvent event = {name, category, Now(), 0, NULL, 0, true};
+    ThreadBuffer* pBuffer = GetThreadBuffer();
+    unique_lock<mutex> lock(pBuffer->mMutex);
+    pBuffer->vEvents.push_back(event);
+}
+
+void Tracer::Lock(unique_lock<mutex> &lock, const char* name)
+{
+    if(!IsEnabled() || lock.try_lock())
+    {
+        if(!lock.owns_lock())
+            lock.lock();
+        return;
+    }
+
+    long long tStart = Now();
+    lock.lock();
+    Record(name, "lock", tStart, Now(), NULL, 0);
+}
+
+void Tracer::Save()
+{
+    if(!IsEnabled())
+        return;
+
+    unique_lock<mutex> lock(gMutexTracer);
+
+    // Nothing recorded since the last save (Shutdown followed by exit)
+    size_t nRecorded = 0;
+    for(size_t i=0; i<gvpBuffers.size(); i++)
+    {
+        unique_lock<mutex> lockBuffer(gvpBuffers[i]->mMutex);
+        nRecorded += gvpBuffers[i]->vEvents.size();
+    }
+    if(gbSaved && nRecorded==gnSavedEvents)
+        return;
+
+    // Written next to the target and renamed, so the file is never partial
+    const string tmpFile = gTraceFile + ".tmp";
+    ofstream f(tmpFile.c_str());
+    if(!f.is_open())
+    {
+        cerr << "Failed to open trace file: " << gTraceFile << endl;
+        return;
+    }
+
+    size_t nEvents = 0;
+    f << fixed << setprecision(3);
+    f << "{\"displayTimeUnit\":\"ms\",\"traceEvents\":[" << endl;
+    f << "{\"name\":\"process_name\",\"ph\":\"M\",\"pid\":1,\"tid\":0,\"args\":{\"name\":\"ORB-SLAM2\"}}";
+    for(size_t i=0; i<gvpBuffers.size(); i++)
+    {
+        ThreadBuffer* pBuffer = gvpBuffers[i];
+        string name;
+        vector<TraceEvent> vEvents;
+        {
+            unique_lock<mutex> lockBuffer(pBuffer->mMutex);
+            name = pBuffer->name;
+            vEvents = pBuffer->vEvents;
+        }
+        if(name.empty())
+        {
+            stringstream ss;
+            ss << "Thread " << pBuffer->tid;
+            name = ss.str();
+        }
+
+        f << "," << endl << "{\"name\":\"thread_name\",\"ph\":\"M\",\"pid\":1,\"tid\":" << pBuffer->tid
+          << ",\"args\":{\"name\":\"" << EscapeJson(name) << "\"}}";
+        f << "," << endl << "{\"name\":\"thread_sort_index\",\"ph\":\"M\",\"pid\":1,\"tid\":" << pBuffer->tid
+          << ",\"args\":{\"sort_index\":" << pBuffer->tid << "}}";
+
+        for(size_t j=0; j<vEvents.size(); j++)
+        {
+            const TraceEvent &e = vEvents[j];
+            f << "," << endl << "{\"name\":\"" << e.name << "\",\"cat\":\"" << e.category << "\"";
+            if(e.instant)
+                f << ",\"ph\":\"i\",\"s\":\"t\"";
+            else
+                f << ",\"ph\":\"X\",\"dur\":" << (e.end-e.start)*1e-3;
+            f << ",\"pid\":1,\"tid\":" << pBuffer->tid << ",\"ts\":" << e.start*1e-3;
+            if(e.argName)
+                f << ",\"args\":{\"" << e.argName << "\":" << e.argValue << "}";
+            f << "}";
+        }
+        nEvents += vEvents.size();
+    }
+    f << endl << "]}" << endl;
+    f.close();
+
+    if(rename(tmpFile.c_str(), gTraceFile.c_str())!=0)
+    {
+        cerr << "Failed to write trace file: " << gTraceFile << endl;
+        return;
+    }
+    gbSaved = true;
+    gnSavedEvents = nEvents;
+    cout << endl << "Trace with " << nEvents << " events saved to " << gTraceFile << endl;
+}
+
+} //namespace ORB_SLAM
@@ -33,6 +33,7 @@
 
 #include"Optimizer.h"
 #include"PnPsolver.h"
+#include"Tracer.h"
 
 #include<iostream>
 #include<ctime>
@@ -120,7 +121,13 @@ Tracking::Tracking(System *pSys, ORBVocabulary* pVoc, FrameDrawer *pFrameDrawer,
     int fIniThFAST = fSettings["ORBextractor.iniThFAST"];
     int fMinThFAST = fSettings["ORBextractor.minThFAST"];
 
-    mpORBextractorLeft = new ORBextractor(nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST);
+    // Optional: process the pyramid levels concurrently on this many threads
+    int nExtractorThreads = 1;
+    cv::FileNode nodeExtractorThreads = fSettings["ORBextractor.nThreads"];
+    if(!nodeExtractorThreads.empty())
+        nExtractorThreads = (int)nodeExtractorThreads;
+
+    mpORBextractorLeft = new ORBextractor(nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST,nExtractorThreads);
 
     // Read initialization parameters (ORB-SLAM3 style)
     cv::FileNode nodeInitMaxAttempts = fSettings["Initialization.MaxAttempts"];
@@ -136,10 +143,10 @@ Tracking::Tracking(System *pSys, ORBVocabulary* pVoc, FrameDrawer *pFrameDrawer,
     cout << "- Max Reference Age: " << mnMaxReferenceAge << endl;
 
     if(sensor==System::STEREO)
-        mpORBextractorRight = new ORBextractor(nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST);
+        mpORBextractorRight = new ORBextractor(nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST,nExtractorThreads);
 
     if(sensor==System::MONOCULAR)
-        mpIniORBextractor = new ORBextractor(2*nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST);
+        mpIniORBextractor = new ORBextractor(2*nFeatures,fScaleFactor,nLevels,fIniThFAST,fMinThFAST,nExtractorThreads);
 
     cout << endl  << "ORB Extractor Parameters: " << endl;
     cout << "- Number of Features: " << nFeatures << endl;
@@ -147,6 +154,7 @@ Tracking::Tracking(System *pSys, ORBVocabulary* pVoc, FrameDrawer *pFrameDrawer,
     cout << "- Scale Factor: " << fScaleFactor << endl;
     cout << "- Initial Fast Threshold: " << fIniThFAST << endl;
     cout << "- Minimum Fast Threshold: " << fMinThFAST << endl;
+    cout << "- Extraction Threads: " << mpORBextractorLeft->GetNumThreads() << endl;
 
     if(sensor==System::STEREO || sensor==System::RGBD)
     {
@@ -221,7 +229,10 @@ cv::Mat Tracking::GrabImageStereo(const cv::Mat &imRectLeft, const cv::Mat &imRe
         }
     }
 
+    TraceScope traceFrame("ExtractFrame","tracking");
     mCurrentFrame = Frame(mImGray,imGrayRight,timestamp,mpORBextractorLeft,mpORBextractorRight,mpORBVocabulary,mK,mDistCoef,mbf,mThDepth);
+    traceFrame.SetArg("frame",mCurrentFrame.mnId);
+    traceFrame.Stop();
 
     Track();
 
@@ -252,7 +263,10 @@ cv::Mat Tracking::GrabImageRGBD(const cv::Mat &imRGB,const cv::Mat &imD, const d
     if((fabs(mDepthMapFactor-1.0f)>1e-5) || imDepth.type()!=CV_32F)
         imDepth.convertTo(imDepth,CV_32F,mDepthMapFactor);
 
+    TraceScope traceFrame("ExtractFrame","tracking");
     mCurrentFrame = Frame(mImGray,imDepth,timestamp,mpORBextractorLeft,mpORBVocabulary,mK,mDistCoef,mbf,mThDepth);
+    traceFrame.SetArg("frame",mCurrentFrame.mnId);
+    traceFrame.Stop();
 
     Track();
 
@@ -279,10 +293,13 @@ cv::Mat Tracking::GrabImageMonocular(const cv::Mat &im, const double &timestamp)
             cvtColor(mImGray,mImGray,CV_BGRA2GRAY);
     }
 
+    TraceScope traceFrame("ExtractFrame","tracking");
     if(mState==NOT_INITIALIZED || mState==NO_IMAGES_YET)
         mCurrentFrame = Frame(mImGray,timestamp,mpIniORBextractor,mpORBVocabulary,mK,mDistCoef,mbf,mThDepth);
     else
         mCurrentFrame = Frame(mImGray,timestamp,mpORBextractorLeft,mpORBVocabulary,mK,mDistCoef,mbf,mThDepth);
+    traceFrame.SetArg("frame",mCurrentFrame.mnId);
+    traceFrame.Stop();
 
     Track();
 
@@ -291,6 +308,9 @@ cv::Mat Tracking::GrabImageMonocular(const cv::Mat &im, const double &timestamp)
 
 void Tracking::Track()
 {
+    TraceScope trace("Track","tracking");
+    trace.SetArg("frame",mCurrentFrame.mnId);
+
     if(mState==NO_IMAGES_YET)
     {
         mState = NOT_INITIALIZED;
@@ -299,7 +319,8 @@ void Tracking::Track()
     mLastProcessedState=mState;
 
     // Get Map Mutex -> Map cannot be changed
-    unique_lock<mutex> lock(mpMap->mMutexMapUpdate);
+    unique_lock<mutex> lock(mpMap->mMutexMapUpdate, defer_lock);
+    Tracer::Lock(lock,"MapUpdate");
 
     if(mState==NOT_INITIALIZED)
     {
@@ -319,6 +340,7 @@ void Tracking::Track()
         bool bOK;
 
         // Initial camera pose estimation using motion model or relocalization (if tracking is lost)
+        TraceScope tracePose("TrackPose","tracking");
         if(!mbOnlyTracking)
         {
             // Local Mapping is activated. This is the normal behaviour, unless
@@ -417,6 +439,9 @@ void Tracking::Track()
             }
         }
 
+        tracePose.SetArg("ok",bOK);
+        tracePose.Stop();
+
         mCurrentFrame.mpReferenceKF = mpReferenceKF;
 
         // If we have an initial estimation of the camera pose and matching. Track the local map.
@@ -450,13 +475,22 @@ void Tracking::Track()
         }
 
         // Detect transition from OK to LOST - start recording post-failure frames
-        if(mbTrackingWasOK && mState == LOST && !mVideoOutputDir.empty())
+        if(mbTrackingWasOK && mState == LOST)
         {
-            cout << "Tracking lost! Recording post-failure frames..." << endl;
-            mbRecordingPostFailure = true;
-            mPostFailureFrameCount = 0;
+            if(!mVideoOutputDir.empty())
+            {
+                cout << "Tracking lost! Recording post-failure frames..." << endl;
+                mbRecordingPostFailure = true;
+                mPostFailureFrameCount = 0;
+            }
+            else
+                cout << "Tracking lost!" << endl;
         }
 
+        // Detect transition from LOST to OK (relocalization)
+        if(mLastProcessedState == LOST && mState == OK)
+            cout << "Relocalized! Tracking resumed." << endl;
+
         // If recording post-failure frames, check if we've recorded enough
         if(mbRecordingPostFailure && mState == LOST)
         {
@@ -474,6 +508,10 @@ void Tracking::Track()
 
                 SaveFailureVideo(videoPath);
 
+                // Shutdown waits for the other threads while this one holds the map,
+                // keep the trace even if it never returns
+                Tracer::Save();
+
                 // Request shutdown after saving video
                 cout << "Video saved. Requesting system shutdown..." << endl;
                 mpSystem->Shutdown();
@@ -575,6 +613,8 @@ void Tracking::Track()
 
 void Tracking::StereoInitialization()
 {
+    TraceScope trace("Initialization","tracking");
+
     if(mCurrentFrame.N>500)
     {
         // Set Frame pose to the origin
@@ -629,6 +669,8 @@ void Tracking::StereoInitialization()
 
 void Tracking::MonocularInitialization()
 {
+    TraceScope trace("Initialization","tracking");
+
     // ORB-SLAM3 style: Improved initialization with multiple attempts and reference frame aging
 
     if(!mpInitializer)
@@ -1105,6 +1147,8 @@ bool Tracking::TrackWithMotionModel()
 
 bool Tracking::TrackLocalMap()
 {
+    TraceScope trace("TrackLocalMap","tracking");
+
     // We have an estimation of the camera pose and some map points tracked in the frame.
     // We retrieve the local map and try to find matches to points in the local map.
 
@@ -1238,6 +1282,8 @@ bool Tracking::NeedNewKeyFrame()
 
 void Tracking::CreateNewKeyFrame()
 {
+    TraceScope trace("CreateNewKeyFrame","tracking");
+
     if(!mpLocalMapper->SetNotStop(true))
         return;
 
@@ -1516,6 +1562,8 @@ void Tracking::UpdateLocalKeyFrames()
 
 bool Tracking::Relocalization()
 {
+    TraceScope trace("Relocalization","tracking");
+
     // Compute Bag of Words Vector
     mCurrentFrame.ComputeBoW();
 
@@ -19,6 +19,7 @@
 */
 
 #include "Viewer.h"
+#include "Tracer.h"
 #include <pangolin/pangolin.h>
 
 #include <mutex>
@@ -53,6 +54,8 @@ Viewer::Viewer(System* pSystem, FrameDrawer *pFrameDrawer, MapDrawer *pMapDrawer
 
 void Viewer::Run()
 {
+    Tracer::SetThreadName("Viewer");
+
     mbFinished = false;
     mbStopped = false;
 
@@ -94,6 +97,8 @@ void Viewer::Run()
 
     while(1)
     {
+        TraceScope traceDraw("Draw","viewer");
+
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT);
 
         mpMapDrawer->GetCurrentOpenGLCameraMatrix(Twc);
@@ -136,6 +141,7 @@ void Viewer::Run()
 
         cv::Mat im = mpFrameDrawer->DrawFrame();
         cv::imshow("ORB-SLAM2: Current Frame",im);
+        traceDraw.Stop();
         cv::waitKey(mT);
 
         if(menuReset)
@@ -1,10 +1,9 @@
-# Easy 难度：
-./quick_eval_intr6000p.sh easy carwelding2
-./quick_eval_intr6000p.sh easy factory1
-./quick_eval_intr6000p.sh easy hospital
-# Medium 难度：
-./quick_eval_intr6000p.sh medium factory2
-./quick_eval_intr6000p.sh medium factory6
-# Hard 难度：
-./quick_eval_intr6000p.sh hard amusement1
-./quick_eval_intr6000p.sh hard amusement2
\ No newline at end of file
+#!/bin/bash
+# Runs quick_eval_intr6000p.sh on every sequence of the dataset manifest
+# (tools/dataset_manifest.py), longest sequences first for better packing.
+# Progress is journaled (tools/campaign_journal.py): running this again after
+# a crash resumes the campaign, only interrupted jobs are run again.
+#   OUTPUT_ROOT=output_refine bash test_all.sh [--retry-failed]
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+python3 "$SCRIPT_DIR/tools/campaign_journal.py" --output-root "${OUTPUT_ROOT:-$SCRIPT_DIR/output}" run "$@"
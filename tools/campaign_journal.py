@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Resumable evaluation campaign journal
+Runs quick_eval_intr6000p.sh over the dataset manifest and records every job
+state transition (pending, running, done, failed) in an append-only journal,
+OUTPUT_ROOT/campaign_journal.jsonl. Every record is flushed and fsync'd
+before the step it announces is taken, so after a crash or reboot the
+journal says exactly which run directory was in flight.
+
+Running the campaign again resumes it: done (and, unless --retry-failed,
+failed) jobs are skipped, the half-finished run directories of interrupted
+jobs are removed so the analysis does not count them as failed, and those
+jobs are run again.
+
+Usage:
+    python tools/campaign_journal.py run [--output-root output] [--retry-failed]
+    python tools/campaign_journal.py status [--output-root output]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from dataset_manifest import DATASET_ROOT, build_manifest, ordered_sequences
+
+ORBSLAM_ROOT = Path(__file__).resolve().parent.parent
+QUICK_EVAL = ORBSLAM_ROOT / 'quick_eval_intr6000p.sh'
+
+JOURNAL_FILE = 'campaign_journal.jsonl'
+JOB_STATES = ['pending', 'running', 'done', 'failed']
+
+class JournalLocked(Exception):
+    """Another process is running the campaign"""
+
+class CampaignJournal:
+    """Append-only job journal; the latest record of a job is its state"""
+
+    def __init__(self, output_root):
+        self.output_root = Path(output_root)
+        self.path = self.output_root / JOURNAL_FILE
+        self.jobs = {}
+        self.lock_file = None
+        if self.path.exists():
+            self._replay()
+
+    def _replay(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.jobs = {}
+        # End of the last complete record: a torn tail after it is cut off by lock()
+        self.valid_size = len(data)
+        lines = data.split(b'\n')
+        offset = 0
+        for number, line in enumerate(lines, 1):
+            start = offset
+            offset += len(line) + 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final record (crash during the write) never took effect
+                if number == len(lines):
+                    self.valid_size = start
+                    break
+                raise ValueError(f"Corrupt journal record at {self.path}:{number}")
+            self.jobs.setdefault(record['job'], {}).update(record)
+
+    def lock(self):
+        """Hold an exclusive lock on the journal for as long as this process runs"""
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        self.lock_file = open(self.path, 'a')
+        try:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise JournalLocked(f"Campaign is already running: {self.path}")
+
+        # Replay again under the lock and drop a torn tail, otherwise the next
+        # record would be appended to it and corrupt the journal for good
+        self._replay()
+        if self.valid_size < os.path.getsize(self.path):
+            os.truncate(self.lock_file.fileno(), self.valid_size)
+        if self.valid_size:
+            with open(self.path, 'rb') as f:
+                f.seek(self.valid_size - 1)
+                terminated = f.read(1) == b'\n'
+            if not terminated:
+                self.lock_file.write('\n')
+        self.lock_file.flush()
+        os.fsync(self.lock_file.fileno())
+
+        # Make the journal file itself durable
+        dir_fd = os.open(self.output_root, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def record(self, job, state, **fields):
+        """Durably append a state transition of a job"""
+        entry = {'job': job, 'state': state, 'at': datetime.now().isoformat(timespec='seconds'), **fields}
+        self.lock_file.write(json.dumps(entry) + '\n')
+        self.lock_file.flush()
+        os.fsync(self.lock_file.fileno())
+        self.jobs.setdefault(job, {}).update(entry)
+
+    def counts(self):
+        counts = dict.fromkeys(JOB_STATES, 0)
+        for job in self.jobs.values():
+            counts[job['state']] += 1
+        return counts
+
+def job_key(difficulty, sequence):
+    return f"{difficulty}/{sequence}"
+
+def remove_run_dir(output_root, run):
+    """Remove a run directory left behind by an interrupted or retried job"""
+    run_dir = Path(output_root) / run
+    if run_dir.is_dir():
+        shutil.rmtree(run_dir)
+        return True
+    return False
+
+def plan_jobs(journal, dataset_root):
+    """Add manifest sequences the journal does not know yet as pending jobs"""
+    manifest, _ = build_manifest(dataset_root)
+    if manifest is None:
+        raise FileNotFoundError(f"No dataset manifest for {dataset_root}")
+
+    order = []
+    for entry in ordered_sequences(manifest, longest_first=True):
+        key = job_key(entry['difficulty'], entry['sequence'])
+        if key not in journal.jobs:
+            journal.record(key, 'pending', difficulty=entry['difficulty'], sequence=entry['sequence'])
+        order.append(key)
+    return order
+
+def recover(journal, retry_failed=False):
+    """Return interrupted (and optionally failed) jobs to pending, removing their run directories"""
+    recovered = []
+    for key, job in journal.jobs.items():
+        if job['state'] == 'running' or (retry_failed and job['state'] == 'failed'):
+            if job.get('run'):
+                # Removed before the journal says so: repeating this after a crash is harmless
+                remove_run_dir(journal.output_root, job['run'])
+            journal.record(key, 'pending', previous=job['state'])
+            recovered.append(key)
+    return recovered
+
+def run_job(journal, key, dataset_root, env_overrides):
+    """Run quick_eval for one job, returns True on success"""
+    job = journal.jobs[key]
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    run = f"quick_eval_{job['difficulty']}_{job['sequence']}_{stamp}"
+    journal.record(key, 'running', run=run, host=socket.gethostname(), pid=os.getpid())
+
+    env = dict(os.environ, OUTPUT_ROOT=str(journal.output_root.resolve()),
+               DATASET_ROOT=str(dataset_root), RUN_TIMESTAMP=stamp, **env_overrides)
+    started = time.monotonic()
+    returncode = subprocess.call(['bash', str(QUICK_EVAL), job['difficulty'], job['sequence']], env=env)
+    duration = round(time.monotonic() - started, 1)
+
+    if returncode == 0:
+        journal.record(key, 'done', duration_s=duration)
+    else:
+        journal.record(key, 'failed', exit_code=returncode, duration_s=duration)
+    return returncode == 0
+
+def run_campaign(args):
+    """Run (or resume) the campaign of an output root"""
+    journal = CampaignJournal(args.output_root)
+    journal.lock()
+
+    order = plan_jobs(journal, args.dataset_root)
+    recovered = recover(journal, args.retry_failed)
+    counts = journal.counts()
+    print(f"Campaign {journal.path}: {counts['done']} done, {counts['failed']} failed, "
+          f"{counts['pending']} to run" + (f" ({len(recovered)} interrupted or retried)" if recovered else ""))
+
+    env_overrides = {'CAMERA_CONFIG': str(args.config.resolve())} if args.config else {}
+    pending = [key for key in order if journal.jobs[key]['state'] == 'pending']
+    for index, key in enumerate(pending, 1):
+        print(f"→ [{index}/{len(pending)}] {key}")
+        success = run_job(journal, key, args.dataset_root, env_overrides)
+        print(f"  {'✓' if success else '✗'} {key}")
+
+    counts = journal.counts()
+    print(f"\n✓ Campaign finished: {counts['done']} done, {counts['failed']} failed")
+    return 0
+
+def print_status(output_root):
+    """Print the state of every job of a campaign"""
+    journal = CampaignJournal(output_root)
+    if not journal.jobs:
+        print(f"✗ No campaign journal in {output_root}")
+        return 1
+
+    counts = journal.counts()
+    print(f"Campaign {journal.path}")
+    print('  ' + ', '.join(f"{counts[state]} {state}" for state in JOB_STATES))
+    for key, job in sorted(journal.jobs.items()):
+        if job['state'] == 'running':
+            detail = f"{job['run']} on {job['host']} (pid {job['pid']}), interrupted unless still running"
+        elif job['state'] == 'failed':
+            detail = f"{job['run']}, exit code {job['exit_code']}"
+        elif job['state'] == 'done':
+            detail = f"{job['run']}, {job['duration_s']:.0f}s"
+        else:
+            detail = ''
+        print(f"  {job['state']:<8} {key:<32} {detail}")
+    return 0
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output-root', type=Path, default=ORBSLAM_ROOT / 'output',
+                        help='campaign output directory holding the journal (default %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='run the campaign, resuming it if a journal exists')
+    run.add_argument('--dataset-root', type=Path, default=DATASET_ROOT)
+    run.add_argument('--config', type=Path, default=None, help='settings YAML (default: quick_eval\'s)')
+    run.add_argument('--retry-failed', action='store_true', help='also run failed jobs again')
+
+    subparsers.add_parser('status', help='show the state of every job')
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        return print_status(args.output_root)
+
+    try:
+        return run_campaign(args)
+    except (JournalLocked, FileNotFoundError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n✗ Interrupted, run again to resume the campaign")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+INTR6000P dataset manifest
+Scans the dataset root once and caches, per sequence, its difficulty, image
+count, timestamp range, ground truth pose count, file sizes and content
+hashes in INTR6000P/manifest.json. Runners, schedulers and the analysis read
+the manifest instead of hardcoded sequence lists or re-walking image folders.
+
+Only sequences whose timestamps, ground truth or image folder changed (by
+size / mtime) are rescanned when the manifest is refreshed, which `list`
+does on every call with a few stat() calls per sequence. On a read-only
+dataset `list` still works from the refreshed manifest, it is just not
+cached (use --manifest to cache it elsewhere).
+
+Usage:
+    python tools/dataset_manifest.py build [--hash-images]
+    python tools/dataset_manifest.py list [--longest-first]
+    python tools/dataset_manifest.py verify
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+DATASET_ROOT = Path(__file__).resolve().parent.parent / "INTR6000P"
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+
+DIFFICULTIES = ['easy', 'medium', 'hard']
+GT_DIR = 'INTR6000P_GT_POSES'
+IMAGE_DIR = 'image_left'
+TIMESTAMPS_FILE = 'timestamps.txt'
+IMAGE_EXTENSION = '.png'
+
+HASH_BLOCK = 1 << 20
+
+def file_hash(filepath):
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def stat_signature(path):
+    """(size, mtime_ns) used to detect changed files and folders"""
+    if not path.exists():
+        return None
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+def sequence_paths(dataset_root, difficulty, sequence):
+    seq_dir = dataset_root / difficulty / sequence
+    return {
+        'images': seq_dir / IMAGE_DIR,
+        'timestamps': seq_dir / TIMESTAMPS_FILE,
+        'ground_truth': dataset_root / GT_DIR / difficulty / f"{sequence}.txt",
+    }
+
+def scan_sequence(dataset_root, difficulty, sequence, hash_images=False):
+    """Collect the manifest entry of one sequence (walks its image folder)"""
+    paths = sequence_paths(dataset_root, difficulty, sequence)
+
+    stamps = []
+    with open(paths['timestamps'], 'r') as f:
+        for line in f:
+            fields = line.split()
+            if fields:
+                stamps.append(float(fields[0]) / 1e9)
+
+    images = sorted((entry for entry in os.scandir(paths['images'])
+                     if entry.is_file() and entry.name.endswith(IMAGE_EXTENSION)),
+                    key=lambda entry: entry.name)
+    listing = hashlib.sha256()
+    image_bytes = 0
+    for entry in images:
+        size = entry.stat().st_size
+        image_bytes += size
+        listing.update(f"{entry.name} {size}\n".encode())
+        if hash_images:
+            listing.update(file_hash(entry.path).encode())
+
+    gt_poses = 0
+    if paths['ground_truth'].exists():
+        with open(paths['ground_truth'], 'r') as f:
+            gt_poses = sum(1 for line in f if line.strip() and not line.startswith('#'))
+
+    return {
+        'difficulty': difficulty,
+        'sequence': sequence,
+        'num_images': len(images),
+        'num_timestamps': len(stamps),
+        'start_time': stamps[0] if stamps else None,
+        'end_time': stamps[-1] if stamps else None,
+        'duration_s': stamps[-1] - stamps[0] if stamps else 0.0,
+        'gt_poses': gt_poses,
+        'image_bytes': image_bytes,
+        'timestamps_bytes': paths['timestamps'].stat().st_size,
+        'gt_bytes': paths['ground_truth'].stat().st_size if gt_poses else 0,
+        'timestamps_sha256': file_hash(paths['timestamps']),
+        'gt_sha256': file_hash(paths['ground_truth']) if gt_poses else None,
+        'images_sha256': listing.hexdigest(),
+        'images_hash_mode': 'content' if hash_images else 'listing',
+        'signature': {name: stat_signature(path) for name, path in paths.items()},
+    }
+
+def discover_sequences(dataset_root):
+    """(difficulty, sequence) pairs that have images and timestamps"""
+    found = []
+    for difficulty in DIFFICULTIES:
+        diff_dir = dataset_root / difficulty
+        if not diff_dir.is_dir():
+            continue
+        for seq_dir in sorted(p for p in diff_dir.iterdir() if p.is_dir()):
+            if (seq_dir / IMAGE_DIR).is_dir() and (seq_dir / TIMESTAMPS_FILE).exists():
+                found.append((difficulty, seq_dir.name))
+    return found
+
+def manifest_path_for(dataset_root, manifest=None):
+    return Path(manifest) if manifest else Path(dataset_root) / MANIFEST_NAME
+
+def load_manifest(dataset_root=DATASET_ROOT, manifest=None):
+    """Cached manifest, or None when it has not been built"""
+    path = manifest_path_for(dataset_root, manifest)
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data if data.get('format') == FORMAT_VERSION else None
+
+def build_manifest(dataset_root=DATASET_ROOT, manifest=None, hash_images=False, force=False, strict=False):
+    """
+    Refresh the manifest, rescanning only new or changed sequences. When the
+    manifest cannot be written (e.g. a read-only dataset mount) the refreshed
+    manifest is returned with a warning, or the OSError raised when strict.
+    """
+    dataset_root = Path(dataset_root)
+    previous = load_manifest(dataset_root, manifest)
+    if not dataset_root.is_dir():
+        # Analysis machines may only have the manifest, not the images
+        return previous, 0
+    cached = {} if force or previous is None else {
+        f"{s['difficulty']}/{s['sequence']}": s for s in previous['sequences']}
+
+    sequences, rescanned = [], 0
+    for difficulty, sequence in discover_sequences(dataset_root):
+        entry = cached.get(f"{difficulty}/{sequence}")
+        paths = sequence_paths(dataset_root, difficulty, sequence)
+        signature = {name: stat_signature(path) for name, path in paths.items()}
+        hash_mode = 'content' if hash_images else 'listing'
+        if entry is None or entry['signature'] != signature or entry['images_hash_mode'] != hash_mode:
+            entry = scan_sequence(dataset_root, difficulty, sequence, hash_images)
+            rescanned += 1
+        sequences.append(entry)
+
+    if previous is not None and not rescanned and len(sequences) == len(cached):
+        return previous, 0
+
+    data = {
+        'format': FORMAT_VERSION,
+        'dataset_root': str(dataset_root),
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+        'sequences': sequences,
+    }
+    path = manifest_path_for(dataset_root, manifest)
+    tmp_path = Path(f"{path}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        if strict:
+            raise
+        print(f"⚠ Manifest not cached ({e}), pass --manifest to cache it elsewhere", file=sys.stderr)
+    return data, rescanned
+
+def ordered_sequences(data, longest_first=False):
+    """Manifest entries in dataset order, or longest (most images) first"""
+    sequences = list(data['sequences'])
+    if longest_first:
+        sequences.sort(key=lambda s: (s['num_timestamps'], s['duration_s']), reverse=True)
+    return sequences
+
+def expected_sequences(data):
+    """{difficulty: [sequence, ...]} of a manifest"""
+    expected = {}
+    for entry in data['sequences']:
+        expected.setdefault(entry['difficulty'], []).append(entry['sequence'])
+    return expected
+
+def verify_manifest(dataset_root=DATASET_ROOT, manifest=None):
+    """Rescan every sequence and return a list of differences to the manifest"""
+    data = load_manifest(dataset_root, manifest)
+    if data is None:
+        return ["manifest not built"]
+
+    differences = []
+    on_disk = set(discover_sequences(Path(dataset_root)))
+    for entry in data['sequences']:
+        key = (entry['difficulty'], entry['sequence'])
+        if key not in on_disk:
+            differences.append(f"{'/'.join(key)}: missing on disk")
+            continue
+        on_disk.discard(key)
+        fresh = scan_sequence(Path(dataset_root), *key, hash_images=entry['images_hash_mode'] == 'content')
+        for field in ('num_images', 'num_timestamps', 'gt_poses', 'timestamps_sha256',
+                      'gt_sha256', 'images_sha256'):
+            if fresh[field] != entry[field]:
+                differences.append(f"{'/'.join(key)}: {field} changed")
+    differences.extend(f"{'/'.join(key)}: not in manifest" for key in sorted(on_disk))
+    return differences
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset-root', type=Path, default=DATASET_ROOT)
+    parser.add_argument('--manifest', type=Path, default=None,
+                        help=f'manifest file (default DATASET_ROOT/{MANIFEST_NAME})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='scan new or changed sequences into the manifest')
+    build.add_argument('--hash-images', action='store_true',
+                       help='hash image contents (default: names and sizes only)')
+    build.add_argument('--force', action='store_true', help='rescan every sequence')
+
+    listing = subparsers.add_parser('list', help='print "difficulty sequence" lines')
+    listing.add_argument('--longest-first', action='store_true',
+                         help='order by image count, longest first (job packing)')
+    listing.add_argument('--details', action='store_true', help='also print images, duration and GT poses')
+
+    subparsers.add_parser('verify', help='rescan everything and report differences')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not args.dataset_root.is_dir():
+            print(f"✗ Dataset not found: {args.dataset_root}")
+            return 1
+        try:
+            data, rescanned = build_manifest(args.dataset_root, args.manifest, args.hash_images, args.force,
+                                             strict=True)
+        except OSError as e:
+            print(f"✗ Could not write the manifest: {e}")
+            return 1
+        print(f"✓ Manifest holds {len(data['sequences'])} sequences ({rescanned} rescanned): "
+              f"{manifest_path_for(args.dataset_root, args.manifest)}")
+        return 0
+
+    if args.command == 'verify':
+        differences = verify_manifest(args.dataset_root, args.manifest)
+        if differences:
+            print("✗ Manifest is out of date:")
+            for d in differences:
+                print(f"  - {d}")
+            return 1
+        print("✓ Manifest matches the dataset")
+        return 0
+
+    data, _ = build_manifest(args.dataset_root, args.manifest)
+    if data is None:
+        print(f"✗ Dataset not found: {args.dataset_root}", file=sys.stderr)
+        return 1
+    for entry in ordered_sequences(data, args.longest_first):
+        line = f"{entry['difficulty']} {entry['sequence']}"
+        if args.details:
+            line += (f" {entry['num_timestamps']} images {entry['duration_s']:.1f}s "
+                     f"{entry['gt_poses']} gt_poses")
+        print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+ORB extraction micro-benchmark harness
+Runs Examples/Benchmark/bench_orb_extractor over frames sampled from a
+sequence for every combination of a grid of ORBextractor settings, and
+aggregates its per-call CSV into per-stage and per-pyramid-level timings
+(pyramid, FAST, octree distribution, orientation, blur, descriptors).
+With ORBextractor.nThreads > 1 the levels run concurrently, so the stage
+times add up to more than the call (negative 'other'), and the benchmark
+fails if the parallel extraction differs from the sequential one.
+
+Every configuration is stored as OUTPUT_DIR/<sequence>/<configuration>.json
+next to the raw CSV, and OUTPUT_DIR/extractor_benchmark.csv lists all stored
+results with the ORBextractor parameters as columns, so the cost of a
+setting can be put next to its accuracy from an evaluation campaign.
+
+Usage:
+    python tools/extractor_bench.py run --sequence easy/carwelding2 \\
+        --nfeatures 1000 1500 2000 --levels 6 8 --frames 50 --repeats 5
+    python tools/extractor_bench.py run --sequence easy/carwelding2 --threads 1 2 4
+    python tools/extractor_bench.py show [--levels RESULT_JSON]
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from dataset_manifest import DATASET_ROOT, sequence_paths
+
+ORBSLAM_ROOT = Path(__file__).resolve().parent.parent
+BENCH_EXEC = ORBSLAM_ROOT / 'Examples' / 'Benchmark' / 'bench_orb_extractor'
+DEFAULT_SETTINGS = ORBSLAM_ROOT / 'tartanair.yaml'
+OUTPUT_DIR = ORBSLAM_ROOT / 'output' / 'extractor_bench'
+
+SUMMARY_FILE = 'extractor_benchmark.csv'
+FORMAT_VERSION = 1
+
+# Columns of the benchmark CSV, in the order of ORBextractor::eStage
+STAGES = ['pyramid', 'fast', 'distribute', 'orientation', 'blur', 'descriptors']
+
+# Grid option -> settings key
+PARAMETERS = [
+    ('nfeatures', 'ORBextractor.nFeatures', int),
+    ('scale_factor', 'ORBextractor.scaleFactor', float),
+    ('levels', 'ORBextractor.nLevels', int),
+    ('ini_fast', 'ORBextractor.iniThFAST', int),
+    ('min_fast', 'ORBextractor.minThFAST', int),
+    ('threads', 'ORBextractor.nThreads', int),
+]
+
+# Value of an optional setting missing from the settings YAML
+DEFAULTS = {'ORBextractor.nThreads': 1}
+
+SETTING_PATTERN = r'^({key})\s*:\s*(\S+)'
+
+def read_settings(settings_file):
+    """ORBextractor values of a settings YAML"""
+    text = Path(settings_file).read_text()
+    values = dict(DEFAULTS)
+    for _, key, cast in PARAMETERS:
+        setting_match = re.search(SETTING_PATTERN.format(key=re.escape(key)), text, re.MULTILINE)
+        if setting_match:
+            values[key] = cast(setting_match.group(2))
+    return values
+
+def write_settings(base_file, overrides, target):
+    """Copy of a settings YAML with some ORBextractor values replaced"""
+    text = Path(base_file).read_text()
+    for key, value in overrides.items():
+        pattern = SETTING_PATTERN.format(key=re.escape(key))
+        if re.search(pattern, text, re.MULTILINE):
+            text = re.sub(pattern, lambda m: f"{m.group(1)}: {value}", text, count=1, flags=re.MULTILINE)
+        else:
+            text += f"\n{key}: {value}\n"
+    Path(target).write_text(text)
+
+def config_name(parameters):
+    """File name of a configuration, e.g. f2000_s1.2_l8_t20-7 (with _p4 for 4 threads)"""
+    threads = parameters.get('ORBextractor.nThreads', 1)
+    return (f"f{parameters['ORBextractor.nFeatures']}_s{parameters['ORBextractor.scaleFactor']}"
+            f"_l{parameters['ORBextractor.nLevels']}"
+            f"_t{parameters['ORBextractor.iniThFAST']}-{parameters['ORBextractor.minThFAST']}"
+            + (f"_p{threads}" if threads != 1 else ''))
+
+def parameter_grid(args, base):
+    """Every combination of the grid options, unset options taken from the base settings"""
+    axes = []
+    for option, key, _ in PARAMETERS:
+        values = getattr(args, option)
+        if values is None:
+            if key not in base:
+                raise ValueError(f"{key} missing from {args.settings} and not given")
+            values = [base[key]]
+        axes.append([(key, value) for value in values])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+def load_timings(csv_file):
+    """(frame, keypoints, total ms, stage ms) arrays shaped [call, level] of a benchmark CSV"""
+    with open(csv_file, 'r') as f:
+        header = f.readline().strip().split(',')
+    data = np.loadtxt(csv_file, delimiter=',', skiprows=1, ndmin=2)
+    levels = int(data[:, header.index('level')].max()) + 1
+    calls = data.reshape(-1, levels, len(header))
+    stage_ms = np.stack([calls[:, :, header.index(f'{stage}_ms')] for stage in STAGES], axis=-1)
+    return (calls[:, 0, header.index('frame')].astype(int), calls[:, :, header.index('keypoints')],
+            calls[:, 0, header.index('total_ms')], stage_ms)
+
+def distribution(values):
+    return {
+        'median': float(np.median(values)),
+        'mean': float(np.mean(values)),
+        'p90': float(np.percentile(values, 90)),
+        'min': float(np.min(values)),
+    }
+
+def summarize(csv_file):
+    """Per-call totals, per-stage and per-level statistics of a benchmark CSV"""
+    frames, keypoints, total_ms, stage_ms = load_timings(csv_file)
+    per_call = stage_ms.sum(axis=1)
+    return {
+        'calls': len(total_ms),
+        'frames': len(np.unique(frames)),
+        'keypoints_mean': float(keypoints.sum(axis=1).mean()),
+        'total_ms': distribution(total_ms),
+        # Time of operator() outside the timed stages (allocation, keypoint copies)
+        'other_ms': distribution(total_ms - per_call.sum(axis=1)),
+        'stages_ms': {stage: distribution(per_call[:, i]) for i, stage in enumerate(STAGES)},
+        'levels': [{
+            'level': level,
+            'keypoints_mean': float(keypoints[:, level].mean()),
+            'total_median_ms': float(np.median(stage_ms[:, level].sum(axis=1))),
+            'stages_median_ms': {stage: float(np.median(stage_ms[:, level, i])) for i, stage in enumerate(STAGES)},
+        } for level in range(keypoints.shape[1])],
+    }
+
+def atomic_write_json(data, target):
+    tmp = target.with_name(f".{target.name}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, target)
+
+def run_config(args, parameters, images, timestamps, sequence_dir):
+    """Benchmark one configuration, returns its result record"""
+    name = config_name(parameters)
+    csv_file = sequence_dir / f"{name}.csv"
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as settings:
+        settings_file = Path(settings.name)
+    try:
+        write_settings(args.settings, parameters, settings_file)
+        with open(sequence_dir / f"{name}.log", 'w') as log:
+            returncode = subprocess.call(
+                [str(args.exec), str(settings_file), str(images), str(timestamps), str(csv_file),
+                 str(args.frames), str(args.warmup), str(args.repeats)],
+                stdout=log, stderr=subprocess.STDOUT)
+    finally:
+        settings_file.unlink()
+    if returncode != 0:
+        raise RuntimeError(f"{args.exec.name} failed with exit code {returncode}, see {sequence_dir / name}.log")
+
+    record = {
+        'format_version': FORMAT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': socket.gethostname(),
+        'cpu_count': os.cpu_count(),
+        'sequence': args.sequence or str(images),
+        'settings': str(args.settings),
+        'parameters': parameters,
+        'warmup': args.warmup,
+        'repeats': args.repeats,
+        'raw': csv_file.name,
+        **summarize(csv_file),
+    }
+    atomic_write_json(record, sequence_dir / f"{name}.json")
+    return record
+
+def load_results(output_dir):
+    """All stored result records below an output directory"""
+    results = []
+    for result_file in sorted(Path(output_dir).glob('*/*.json')):
+        with open(result_file, 'r') as f:
+            record = json.load(f)
+        if record.get('format_version') == FORMAT_VERSION:
+            record['path'] = result_file
+            results.append(record)
+    return results
+
+def write_summary(output_dir):
+    """Rewrite the summary CSV from the stored results"""
+    results = load_results(output_dir)
+    summary_file = Path(output_dir) / SUMMARY_FILE
+    with open(summary_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['sequence'] + [key for _, key, _ in PARAMETERS]
+                        + ['calls', 'keypoints_mean', 'total_median_ms', 'total_p90_ms']
+                        + [f'{stage}_median_ms' for stage in STAGES]
+                        + ['other_median_ms', 'host', 'created'])
+        for record in results:
+            writer.writerow([record['sequence']]
+                            + [record['parameters'].get(key, DEFAULTS.get(key)) for _, key, _ in PARAMETERS]
+                            + [record['calls'], round(record['keypoints_mean'], 1),
+                               round(record['total_ms']['median'], 4), round(record['total_ms']['p90'], 4)]
+                            + [round(record['stages_ms'][stage]['median'], 4) for stage in STAGES]
+                            + [round(record['other_ms']['median'], 4), record['host'], record['created']])
+    return summary_file
+
+def run_grid(args):
+    """Benchmark every configuration of the grid"""
+    if args.sequence:
+        difficulty, _, sequence = args.sequence.partition('/')
+        paths = sequence_paths(args.dataset_root, difficulty, sequence)
+        images, timestamps = paths['images'], paths['timestamps']
+        sequence_tag = f"{difficulty}_{sequence}"
+    elif args.images and args.timestamps:
+        images, timestamps = args.images, args.timestamps
+        sequence_tag = Path(images).resolve().parent.name
+    else:
+        print("✗ Give --sequence DIFFICULTY/SEQUENCE or --images and --timestamps")
+        return 1
+    for path, what in ((args.exec, 'benchmark executable'), (images, 'image folder'), (timestamps, 'timestamps')):
+        if not Path(path).exists():
+            print(f"✗ {what} not found: {path}")
+            return 1
+
+    grid = parameter_grid(args, read_settings(args.settings))
+    sequence_dir = args.output_dir / sequence_tag
+    sequence_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Benchmarking {len(grid)} configuration(s) on {sequence_tag}: "
+          f"{args.frames} frames, {args.warmup} warm-up and {args.repeats} timed calls each")
+    for index, parameters in enumerate(grid, 1):
+        name = config_name(parameters)
+        print(f"→ [{index}/{len(grid)}] {name}")
+        record = run_config(args, parameters, images, timestamps, sequence_dir)
+        stages = ', '.join(f"{stage} {record['stages_ms'][stage]['median']:.2f}" for stage in STAGES)
+        print(f"  ✓ median {record['total_ms']['median']:.2f} ms ({stages}), "
+              f"{record['keypoints_mean']:.0f} keypoints")
+
+    print(f"\n✓ Summary: {write_summary(args.output_dir)}")
+    return 0
+
+def print_results(output_dir):
+    """Print all stored results, fastest first"""
+    results = load_results(output_dir)
+    if not results:
+        print(f"✗ No benchmark results in {output_dir}")
+        return 1
+
+    print(f"{'sequence':<24} {'configuration':<24} {'median':>8} {'p90':>8} "
+          + ' '.join(f"{stage[:8]:>8}" for stage in STAGES) + f" {'kpts':>6}")
+    for record in sorted(results, key=lambda r: (r['sequence'], r['total_ms']['median'])):
+        print(f"{record['sequence']:<24} {config_name(record['parameters']):<24} "
+              f"{record['total_ms']['median']:8.2f} {record['total_ms']['p90']:8.2f} "
+              + ' '.join(f"{record['stages_ms'][stage]['median']:8.2f}" for stage in STAGES)
+              + f" {record['keypoints_mean']:6.0f}")
+    print("\nTimes in ms per extraction (median over all timed calls)")
+    return 0
+
+def print_levels(result_file):
+    """Print the per-level breakdown of one result"""
+    with open(result_file, 'r') as f:
+        record = json.load(f)
+    print(f"{record['sequence']} {config_name(record['parameters'])}, {record['calls']} calls")
+    print(f"{'level':>5} {'kpts':>6} {'total':>8} " + ' '.join(f"{stage[:8]:>8}" for stage in STAGES))
+    for level in record['levels']:
+        print(f"{level['level']:>5} {level['keypoints_mean']:6.0f} {level['total_median_ms']:8.3f} "
+              + ' '.join(f"{level['stages_median_ms'][stage]:8.3f}" for stage in STAGES))
+    return 0
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR,
+                        help='benchmark results directory (default %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='benchmark a grid of extractor settings')
+    run.add_argument('--exec', type=Path, default=BENCH_EXEC)
+    run.add_argument('--settings', type=Path, default=DEFAULT_SETTINGS,
+                     help='settings YAML providing the values not in the grid (default %(default)s)')
+    run.add_argument('--dataset-root', type=Path, default=DATASET_ROOT)
+    run.add_argument('--sequence', help='DIFFICULTY/SEQUENCE of the dataset')
+    run.add_argument('--images', type=Path, help='image folder (instead of --sequence)')
+    run.add_argument('--timestamps', type=Path, help='timestamps file (instead of --sequence)')
+    run.add_argument('--nfeatures', type=int, nargs='+')
+    run.add_argument('--scale-factor', type=float, nargs='+')
+    run.add_argument('--levels', type=int, nargs='+')
+    run.add_argument('--ini-fast', type=int, nargs='+')
+    run.add_argument('--min-fast', type=int, nargs='+')
+    run.add_argument('--threads', type=int, nargs='+', help='extraction threads (1 = sequential)')
+    run.add_argument('--frames', type=int, default=50, help='frames sampled evenly from the sequence')
+    run.add_argument('--warmup', type=int, default=2, help='untimed extractions per frame')
+    run.add_argument('--repeats', type=int, default=5, help='timed extractions per frame')
+
+    show = subparsers.add_parser('show', help='list stored results')
+    show.add_argument('--levels', type=Path, metavar='RESULT_JSON', help='per-level breakdown of one result')
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        return print_levels(args.levels) if args.levels else print_results(args.output_dir)
+
+    try:
+        return run_grid(args)
+    except (RuntimeError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
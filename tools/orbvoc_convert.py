@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+ORB vocabulary converter
+Converts the DBoW2 text vocabulary (Vocabulary/ORBvoc.txt) into the compact
+binary format read by TemplatedVocabulary::loadFromBinaryFile, and verifies
+that both files describe the same tree (nodes, words, descriptors, weights).
+
+Usage:
+    python tools/orbvoc_convert.py convert Vocabulary/ORBvoc.txt Vocabulary/ORBvoc.bin
+    python tools/orbvoc_convert.py verify Vocabulary/ORBvoc.txt Vocabulary/ORBvoc.bin
+"""
+
+import argparse
+import struct
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+# Binary layout, must match TemplatedVocabulary.h
+MAGIC = b'ORBVBIN1'
+HEADER = struct.Struct('<8s4i2I')
+DESCRIPTOR_BYTES = 32
+NODE_DTYPE = np.dtype([
+    ('parent', '<u4'),
+    ('is_leaf', 'u1'),
+    ('descriptor', 'u1', (DESCRIPTOR_BYTES,)),
+    ('weight', '<f8'),
+])
+
+# Limits checked by the C++ loaders
+MAX_K, MAX_L, MAX_SCORING, MAX_WEIGHTING = 20, 10, 5, 3
+
+TEXT_CHUNK_LINES = 100000
+
+def check_header(k, L, scoring, weighting):
+    """Validate vocabulary parameters the same way the C++ loaders do"""
+    if not (0 <= k <= MAX_K and 1 <= L <= MAX_L and
+            0 <= scoring <= MAX_SCORING and 0 <= weighting <= MAX_WEIGHTING):
+        raise ValueError(f"Invalid vocabulary header: k={k} L={L} "
+                         f"scoring={scoring} weighting={weighting}")
+
+def _parse_text_chunk(lines, out):
+    """Parse node lines into a NODE_DTYPE array"""
+    values = np.array(' '.join(lines).split(), dtype=np.float64)
+    columns = 3 + DESCRIPTOR_BYTES
+    if values.size != len(lines) * columns:
+        raise ValueError("Malformed node line in text vocabulary")
+    values = values.reshape(len(lines), columns)
+
+    chunk = np.empty(len(lines), dtype=NODE_DTYPE)
+    chunk['parent'] = values[:, 0]
+    chunk['is_leaf'] = values[:, 1] > 0
+    chunk['descriptor'] = values[:, 2:2 + DESCRIPTOR_BYTES]
+    chunk['weight'] = values[:, -1]
+    out.append(chunk)
+
+def load_text_vocabulary(filepath):
+    """Load a DBoW2 text vocabulary, returns (header, nodes)"""
+    chunks = []
+    with open(filepath, 'r') as f:
+        k, L, scoring, weighting = (int(v) for v in f.readline().split())
+        check_header(k, L, scoring, weighting)
+
+        lines = []
+        for line in f:
+            # Blank lines (e.g. the trailing newline) are not nodes
+            if line.strip():
+                lines.append(line)
+            if len(lines) == TEXT_CHUNK_LINES:
+                _parse_text_chunk(lines, chunks)
+                lines = []
+        if lines:
+            _parse_text_chunk(lines, chunks)
+
+    nodes = np.concatenate(chunks) if chunks else np.empty(0, dtype=NODE_DTYPE)
+    return (k, L, scoring, weighting), nodes
+
+def load_binary_vocabulary(filepath):
+    """Memory-map a binary vocabulary, returns (header, nodes)"""
+    with open(filepath, 'rb') as f:
+        raw = f.read(HEADER.size)
+    if len(raw) != HEADER.size:
+        raise ValueError(f"Truncated binary vocabulary: {filepath}")
+
+    magic, k, L, scoring, weighting, num_nodes, desc_bytes = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"Not a binary ORB vocabulary: {filepath}")
+    if desc_bytes != DESCRIPTOR_BYTES:
+        raise ValueError(f"Unexpected descriptor length {desc_bytes} in {filepath}")
+    check_header(k, L, scoring, weighting)
+
+    expected_size = HEADER.size + num_nodes * NODE_DTYPE.itemsize
+    if Path(filepath).stat().st_size != expected_size:
+        raise ValueError(f"Binary vocabulary size mismatch: {filepath}")
+
+    nodes = np.memmap(filepath, dtype=NODE_DTYPE, mode='r',
+                      offset=HEADER.size, shape=(num_nodes,))
+    return (k, L, scoring, weighting), nodes
+
+def save_binary_vocabulary(filepath, header, nodes):
+    """Write a binary vocabulary"""
+    k, L, scoring, weighting = header
+    with open(filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, k, L, scoring, weighting, len(nodes), DESCRIPTOR_BYTES))
+        np.ascontiguousarray(nodes, dtype=NODE_DTYPE).tofile(f)
+
+def check_tree(nodes):
+    """Return a list of structural problems in the node table"""
+    problems = []
+    node_ids = np.arange(1, len(nodes) + 1)
+    parents = nodes['parent'].astype(np.int64)
+
+    if np.any(parents >= node_ids):
+        problems.append("parent id does not precede node id")
+        return problems
+
+    has_children = np.zeros(len(nodes) + 1, dtype=bool)
+    has_children[parents] = True
+    is_leaf = nodes['is_leaf'] > 0
+    if np.any(is_leaf & has_children[1:]):
+        problems.append("leaf nodes with children")
+    if np.any(~is_leaf & ~has_children[1:]):
+        problems.append("inner nodes without children")
+    return problems
+
+def compare_vocabularies(text_voc, binary_voc):
+    """Compare two (header, nodes) pairs, returns a list of differences"""
+    (text_header, text_nodes), (bin_header, bin_nodes) = text_voc, binary_voc
+    differences = []
+
+    if text_header != bin_header:
+        differences.append(f"header: text={text_header} binary={bin_header}")
+    if len(text_nodes) != len(bin_nodes):
+        differences.append(f"node count: text={len(text_nodes)} binary={len(bin_nodes)}")
+        return differences
+
+    for field in ('parent', 'is_leaf', 'weight'):
+        mismatched = np.flatnonzero(text_nodes[field] != bin_nodes[field])
+        if mismatched.size:
+            differences.append(f"{field}: {mismatched.size} nodes differ "
+                               f"(first node id {mismatched[0] + 1})")
+
+    desc_mismatch = np.flatnonzero(np.any(text_nodes['descriptor'] != bin_nodes['descriptor'], axis=1))
+    if desc_mismatch.size:
+        differences.append(f"descriptor: {desc_mismatch.size} nodes differ "
+                           f"(first node id {desc_mismatch[0] + 1})")
+
+    # Word ids are assigned to leaves in file order, so identical leaf flags
+    # imply identical word ids; report the counts for completeness.
+    text_words = int(np.count_nonzero(text_nodes['is_leaf']))
+    bin_words = int(np.count_nonzero(bin_nodes['is_leaf']))
+    if text_words != bin_words:
+        differences.append(f"word count: text={text_words} binary={bin_words}")
+
+    return differences
+
+def convert(text_path, binary_path):
+    """Convert a text vocabulary into the binary format"""
+    start = time.time()
+    header, nodes = load_text_vocabulary(text_path)
+    problems = check_tree(nodes)
+    if problems:
+        print(f"✗ Text vocabulary is inconsistent: {', '.join(problems)}")
+        return 1
+
+    save_binary_vocabulary(binary_path, header, nodes)
+    print(f"✓ Converted {len(nodes)} nodes ({int(np.count_nonzero(nodes['is_leaf']))} words) "
+          f"in {time.time() - start:.1f}s: {binary_path}")
+    return verify(text_path, binary_path, text_voc=(header, nodes))
+
+def verify(text_path, binary_path, text_voc=None):
+    """Check node/word equivalence between a text and a binary vocabulary"""
+    if text_voc is None:
+        text_voc = load_text_vocabulary(text_path)
+    binary_voc = load_binary_vocabulary(binary_path)
+
+    differences = compare_vocabularies(text_voc, binary_voc)
+    differences.extend(f"binary tree: {p}" for p in check_tree(binary_voc[1]))
+    if differences:
+        print(f"✗ {binary_path} does not match {text_path}:")
+        for d in differences:
+            print(f"  - {d}")
+        return 1
+
+    nodes = binary_voc[1]
+    print(f"✓ Verified {len(nodes)} nodes and {int(np.count_nonzero(nodes['is_leaf']))} words "
+          f"match between {text_path} and {binary_path}")
+    return 0
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in (('convert', 'convert a text vocabulary to binary and verify it'),
+                            ('verify', 'verify a binary vocabulary against its text version')):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('text', type=Path, help='DBoW2 text vocabulary (ORBvoc.txt)')
+        sub.add_argument('binary', type=Path, help='binary vocabulary (ORBvoc.bin)')
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'convert':
+            return convert(args.text, args.binary)
+        return verify(args.text, args.binary)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
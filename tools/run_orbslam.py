@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Streaming ORB-SLAM2 runner
+Runs an ORB-SLAM2 example (mono_euroc by default), streams stdout/stderr line
+by line into orbslam.log, parses tracking events live and keeps a JSON run
+status file up to date. Optional abort policies stop hopeless runs early.
+
+Usage:
+    python tools/run_orbslam.py --exec Examples/Monocular/mono_euroc \\
+        --vocabulary Vocabulary/ORBvoc.bin --settings tartanair.yaml \\
+        --images SEQ/image_left --timestamps SEQ/timestamps.txt \\
+        --output-dir output/run --abort-lost-after 5 --abort-no-map-after 300 \\
+        --frame-trajectory output/run/frame_trajectory.txt
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import re
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+STATUS_FILE = 'run_status.json'
+LOG_FILE = 'orbslam.log'
+
+# One byte per processed frame, written and flushed by System (see all_result/tracking_states.py)
+STATES_FILE = 'tracking_states.bin'
+
+# Exit code used when a run is stopped by an abort policy
+EXIT_ABORTED = 3
+
+# Seconds between policy checks / status refreshes and before SIGKILL
+WATCHDOG_PERIOD = 0.5
+TERMINATE_GRACE = 5.0
+
+# Log lines printed by System, Tracking and mono_euroc
+EVENT_PATTERNS = [
+    ('vocabulary_loading', re.compile(r'^Loading ORB Vocabulary')),
+    ('vocabulary_loaded', re.compile(r'^Vocabulary loaded!')),
+    ('images_total', re.compile(r'^Images in the sequence: (\d+)')),
+    ('processing', re.compile(r'^Start processing sequence')),
+    ('map_created', re.compile(r'^New [Mm]ap created with (\d+) points')),
+    ('init_attempt', re.compile(r'^\[Init\] Attempt (\d+): (.*)')),
+    ('init_message', re.compile(r'^\[Init\] (.*)')),
+    ('lost', re.compile(r'^Tracking lost!')),
+    ('relocalized', re.compile(r'^Relocalized!')),
+    ('reset', re.compile(r'^(System Reseting|Track lost soon after initialisation|Wrong initialization)')),
+    ('median_tracking_time', re.compile(r'^median tracking time: ([\d.eE+-]+)')),
+    ('mean_tracking_time', re.compile(r'^mean tracking time: ([\d.eE+-]+)')),
+]
+
+def load_timestamps(filepath):
+    """Load frame timestamps (seconds) the same way mono_euroc does"""
+    timestamps = []
+    with open(filepath, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if fields:
+                timestamps.append(float(fields[0]) / 1e9)
+    return timestamps
+
+def atomic_write_json(filepath, data):
+    """Write JSON through a temporary file so readers never see a partial file"""
+    tmp_path = Path(f"{filepath}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, filepath)
+
+class RunMonitor:
+    """Tracks the state of a running ORB-SLAM2 process from its log lines"""
+
+    def __init__(self, timestamps=None, abort_lost_after=None, abort_no_map_after=None, states_path=None):
+        self.timestamps = timestamps or []
+        self.states_path = states_path
+        self.abort_lost_after = abort_lost_after
+        self.abort_no_map_after = abort_no_map_after
+
+        self.started = time.monotonic()
+        self.processing_started = None
+        self.lost_since = None
+        self.status = {
+            'state': 'starting',
+            'pid': None,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'updated_at': None,
+            'elapsed_s': 0.0,
+            'images_total': None,
+            'frames_estimate': 0,
+            'frames_processed': None,
+            'maps_created': 0,
+            'map_points': None,
+            'lost_events': 0,
+            'relocalizations': 0,
+            'resets': 0,
+            'lost_for_s': None,
+            'init_attempts': 0,
+            'last_init_message': None,
+            'median_tracking_time': None,
+            'mean_tracking_time': None,
+            'abort_reason': None,
+            'returncode': None,
+        }
+
+    def processed_frames(self):
+        """Frames tracked so far (size of the tracking state file), None when it is not written"""
+        if self.states_path is None:
+            return None
+        if self.processing_started is None:
+            return 0
+        try:
+            return os.path.getsize(self.states_path)
+        except OSError:
+            return None
+
+    def estimate_frames(self, now):
+        """
+        Upper bound of the frames replayed so far from the wall-clock time;
+        mono_euroc paces frames by their timestamps but only waits when
+        tracking is faster than real time
+        """
+        if self.processing_started is None:
+            return 0
+        elapsed = now - self.processing_started
+        if not self.timestamps:
+            return None
+        return bisect.bisect_right(self.timestamps, self.timestamps[0] + elapsed)
+
+    def feed(self, line):
+        """Update the status from one log line, returns the event name or None"""
+        line = line.strip()
+        for event, pattern in EVENT_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                self._apply(event, match)
+                return event
+        return None
+
+    def _apply(self, event, match):
+        now = time.monotonic()
+        status = self.status
+
+        if event == 'vocabulary_loading':
+            status['state'] = 'loading'
+        elif event == 'images_total':
+            status['images_total'] = int(match.group(1))
+        elif event == 'processing':
+            status['state'] = 'processing'
+            self.processing_started = now
+        elif event == 'map_created':
+            status['state'] = 'tracking'
+            status['maps_created'] += 1
+            status['map_points'] = int(match.group(1))
+            self.lost_since = None
+        elif event == 'init_attempt':
+            status['init_attempts'] = int(match.group(1))
+            status['last_init_message'] = match.group(0)
+        elif event == 'init_message':
+            status['last_init_message'] = match.group(0)
+        elif event == 'lost':
+            status['state'] = 'lost'
+            status['lost_events'] += 1
+            self.lost_since = now
+        elif event == 'relocalized':
+            status['state'] = 'tracking'
+            status['relocalizations'] += 1
+            self.lost_since = None
+        elif event == 'reset':
+            status['state'] = 'processing'
+            status['resets'] += 1
+            self.lost_since = None
+        elif event in ('median_tracking_time', 'mean_tracking_time'):
+            status[event] = float(match.group(1))
+
+    def refresh(self):
+        """Update time-dependent fields"""
+        now = time.monotonic()
+        self.status['elapsed_s'] = round(now - self.started, 3)
+        self.status['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        self.status['frames_estimate'] = self.estimate_frames(now)
+        self.status['frames_processed'] = self.processed_frames()
+        self.status['lost_for_s'] = round(now - self.lost_since, 3) if self.lost_since else None
+
+    def abort_reason(self):
+        """Return why the run should be aborted, or None to keep going"""
+        self.refresh()
+        status = self.status
+
+        if (self.abort_lost_after is not None and status['lost_for_s'] is not None and
+                status['lost_for_s'] > self.abort_lost_after):
+            return f"lost for more than {self.abort_lost_after:g}s"
+
+        # Frames really processed; the wall-clock estimate over-counts slow runs
+        frames = status['frames_processed']
+        if frames is None:
+            frames = status['frames_estimate']
+        if (self.abort_no_map_after is not None and status['maps_created'] == 0 and
+                frames is not None and frames > self.abort_no_map_after):
+            return f"no map after {self.abort_no_map_after} frames"
+
+        return None
+
+async def _pump(stream, log, monitor, on_event):
+    """Copy a process stream into the log, feeding every line to the monitor"""
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            break
+        line = raw.decode(errors='replace')
+        log.write(line)
+        log.flush()
+        if monitor.feed(line):
+            on_event()
+
+async def _terminate(proc):
+    """Stop the process group, escalating to SIGKILL after a grace period"""
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(proc.wait(), TERMINATE_GRACE)
+        except asyncio.TimeoutError:
+            os.killpg(proc.pid, signal.SIGKILL)
+            await proc.wait()
+    except ProcessLookupError:
+        pass
+
+async def run_streaming(cmd, log_path, status_path, monitor, cwd=None):
+    """Run cmd, streaming its output to log_path and its status to status_path"""
+
+    def write_status():
+        monitor.refresh()
+        atomic_write_json(status_path, monitor.status)
+
+    with open(log_path, 'w') as log:
+        proc = await asyncio.create_subprocess_exec(
+            *[str(c) for c in cmd], cwd=cwd, start_new_session=True,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        monitor.status['pid'] = proc.pid
+        write_status()
+
+        pumps = asyncio.gather(_pump(proc.stdout, log, monitor, write_status),
+                               _pump(proc.stderr, log, monitor, write_status))
+
+        # ORB-SLAM2 runs in its own session: stop it when this runner is stopped
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stopped.set)
+
+        while not pumps.done():
+            await asyncio.wait([pumps], timeout=WATCHDOG_PERIOD)
+            if stopped.is_set():
+                reason = 'runner stopped by a signal'
+            else:
+                reason = monitor.abort_reason() if not pumps.done() else None
+            if reason:
+                monitor.status['abort_reason'] = reason
+                log.write(f"[run_orbslam] Aborting run: {reason}\n")
+                await _terminate(proc)
+                break
+            write_status()
+
+        await pumps
+        returncode = await proc.wait()
+
+    status = monitor.status
+    status['returncode'] = returncode
+    if status['abort_reason']:
+        status['state'] = 'aborted'
+    elif returncode == 0:
+        status['state'] = 'finished'
+    else:
+        status['state'] = 'failed'
+    write_status()
+    return status
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--exec', dest='executable', type=Path, required=True,
+                        help='ORB-SLAM2 example executable (e.g. mono_euroc)')
+    parser.add_argument('--vocabulary', type=Path, required=True)
+    parser.add_argument('--settings', type=Path, required=True)
+    parser.add_argument('--images', type=Path, required=True)
+    parser.add_argument('--timestamps', type=Path, required=True)
+    parser.add_argument('--output-dir', type=Path, required=True)
+    parser.add_argument('--cwd', type=Path, default=None,
+                        help='working directory (trajectory files are written here)')
+    parser.add_argument('--abort-lost-after', type=float, default=None, metavar='SECONDS',
+                        help='abort when tracking stays lost for longer than this')
+    parser.add_argument('--abort-no-map-after', type=int, default=None, metavar='FRAMES',
+                        help='abort when no map exists after this many frames')
+    parser.add_argument('--frame-trajectory', type=Path, default=None, metavar='FILE',
+                        help='also save one pose per tracked frame (SaveTrajectoryTUM) to FILE')
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    cmd = [args.executable, args.vocabulary, args.settings,
+           args.images, args.timestamps, args.output_dir]
+    if args.frame_trajectory:
+        cmd.append(args.frame_trajectory.resolve())
+
+    monitor = RunMonitor(load_timestamps(args.timestamps),
+                         abort_lost_after=args.abort_lost_after,
+                         abort_no_map_after=args.abort_no_map_after,
+                         states_path=args.output_dir / STATES_FILE)
+    status = asyncio.run(run_streaming(cmd, args.output_dir / LOG_FILE,
+                                       args.output_dir / STATUS_FILE, monitor, cwd=args.cwd))
+
+    if status['state'] == 'aborted':
+        print(f"✗ Run aborted: {status['abort_reason']}")
+        return EXIT_ABORTED
+    return status['returncode']
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Multi-node evaluation work queue
+A SQLite job queue kept in a shared results store (e.g. an NFS mount). Jobs
+are (campaign, sequence, config, run index) tuples; workers on any number of
+hosts lease jobs, renew the lease with heartbeats while quick_eval runs,
+retry failed or abandoned jobs and upload finished run directories into the
+store, where the analysis scripts read them:
+
+    STORE/queue.sqlite
+    STORE/<campaign>/quick_eval_<difficulty>_<sequence>_<stamp>_r<run index>_j<job id>/
+
+The run index and job id keep the run directories of repeated runs (--runs)
+apart when workers start them in the same second. The comparison scripts
+use one run of each sequence; regression_gate.py uses all repeats.
+
+Usage:
+    python tools/work_queue.py --store /shared/results enqueue --campaign refine_output \\
+        --config tartanair.yaml --runs 3
+    python tools/work_queue.py --store /shared/results worker --dataset-root /data/INTR6000P
+    python tools/work_queue.py --store /shared/results status
+
+    cd /shared/results && python ORB_SLAM2/all_result/create_complete_comparison.py
+
+The database uses SQLite's rollback journal (not WAL, which needs shared
+memory and does not work across hosts) and BEGIN IMMEDIATE transactions, so
+the shared filesystem must support POSIX locks.
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from dataset_manifest import DATASET_ROOT, build_manifest, ordered_sequences
+
+ORBSLAM_ROOT = Path(__file__).resolve().parent.parent
+QUICK_EVAL = ORBSLAM_ROOT / 'quick_eval_intr6000p.sh'
+
+QUEUE_DB = 'queue.sqlite'
+
+# Seconds a lease is valid without a heartbeat, between heartbeats and between polls
+DEFAULT_LEASE = 600
+DEFAULT_HEARTBEAT = 60
+DEFAULT_POLL = 30
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Seconds a stopped job gets to exit after SIGTERM before it is killed
+TERMINATE_GRACE = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    campaign TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    sequence TEXT NOT NULL,
+    config TEXT NOT NULL,
+    run_index INTEGER NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    heartbeat_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    UNIQUE (campaign, difficulty, sequence, config, run_index)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority);
+"""
+
+JOB_STATES = ['pending', 'leased', 'done', 'failed']
+
+def connect(store):
+    """Open the queue database of a results store"""
+    store = Path(store)
+    store.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(store / QUEUE_DB), timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.executescript(SCHEMA)
+    return conn
+
+class Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on errors"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, *exc):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+def enqueue(conn, campaign, config, sequences, runs=1, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Add jobs, (difficulty, sequence, priority) tuples; returns the number added"""
+    added = 0
+    with Transaction(conn):
+        for difficulty, sequence, priority in sequences:
+            for run_index in range(runs):
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO jobs (campaign, difficulty, sequence, config, run_index, '
+                    'priority, max_attempts) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (campaign, difficulty, sequence, config, run_index, priority, max_attempts))
+                added += cursor.rowcount
+    return added
+
+def reclaim_expired(conn, now):
+    """Return jobs whose lease ran out to the queue (or fail them)"""
+    conn.execute(
+        "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+        "error = 'lease expired on ' || worker, worker = NULL, lease_expires = NULL "
+        "WHERE state = 'leased' AND lease_expires < ?", (now,))
+
+def claim(conn, worker, lease=DEFAULT_LEASE):
+    """Lease the highest priority pending job, returns its row or None"""
+    now = time.time()
+    with Transaction(conn):
+        reclaim_expired(conn, now)
+        job = conn.execute("SELECT * FROM jobs WHERE state = 'pending' "
+                           "ORDER BY priority DESC, id LIMIT 1").fetchone()
+        if job is None:
+            return None
+        conn.execute("UPDATE jobs SET state = 'leased', worker = ?, attempts = attempts + 1, "
+                     "lease_expires = ?, heartbeat_at = ?, started_at = ?, error = NULL WHERE id = ?",
+                     (worker, now + lease, now, now, job['id']))
+    return conn.execute('SELECT * FROM jobs WHERE id = ?', (job['id'],)).fetchone()
+
+def heartbeat(conn, job_id, worker, lease=DEFAULT_LEASE):
+    """Extend a lease, returns False when the lease was lost"""
+    now = time.time()
+    with Transaction(conn):
+        cursor = conn.execute("UPDATE jobs SET lease_expires = ?, heartbeat_at = ? "
+                              "WHERE id = ? AND worker = ? AND state = 'leased'",
+                              (now + lease, now, job_id, worker))
+    return cursor.rowcount == 1
+
+def finish(conn, job_id, worker, success, result=None, error=None):
+    """Record the outcome of a leased job; failures are retried while attempts remain"""
+    with Transaction(conn):
+        cursor = conn.execute(
+            "UPDATE jobs SET state = CASE WHEN ? THEN 'done' WHEN attempts >= max_attempts "
+            "THEN 'failed' ELSE 'pending' END, finished_at = ?, result = ?, error = ?, "
+            "worker = NULL, lease_expires = NULL WHERE id = ? AND worker = ? AND state = 'leased'",
+            (success, time.time(), result, error, job_id, worker))
+    return cursor.rowcount == 1
+
+def remaining_attempts(conn, job_id):
+    job = conn.execute('SELECT attempts, max_attempts FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    return job['max_attempts'] - job['attempts']
+
+def upload_run(run_dir, store, campaign):
+    """Copy a run directory into the store; the final rename makes it appear atomically"""
+    target_dir = Path(store) / campaign
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / run_dir.name
+    if target.exists():
+        raise FileExistsError(f"Result already in store: {target}")
+
+    incoming = target_dir / f".incoming-{run_dir.name}-{socket.gethostname()}-{os.getpid()}"
+    shutil.copytree(run_dir, incoming)
+    os.rename(incoming, target)
+    return target
+
+def stop_process_group(proc):
+    """SIGTERM the process group of proc, SIGKILL it after TERMINATE_GRACE"""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout=TERMINATE_GRACE)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+    except ProcessLookupError:
+        pass
+
+def terminate_worker(signum, frame):
+    """SIGTERM handler: unwind like Ctrl-C so running jobs are stopped and cleaned up"""
+    raise KeyboardInterrupt
+
+def run_job(conn, job, args, worker):
+    """Run quick_eval for one job, heartbeating while it runs; returns (success, result, error)"""
+    config = Path(job['config'])
+    if not config.is_absolute():
+        config = ORBSLAM_ROOT / config
+
+    scratch = Path(tempfile.mkdtemp(prefix=f"job{job['id']}_", dir=args.scratch))
+    stamp = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_r{job['run_index']}_j{job['id']}"
+    env = dict(os.environ, DATASET_ROOT=str(args.dataset_root), OUTPUT_ROOT=str(scratch),
+               CAMERA_CONFIG=str(config), RUN_TIMESTAMP=stamp)
+
+    try:
+        with open(scratch / 'worker.log', 'w') as log:
+            proc = subprocess.Popen(['bash', str(QUICK_EVAL), job['difficulty'], job['sequence']],
+                                    env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+            lease_lost = False
+            try:
+                while True:
+                    try:
+                        returncode = proc.wait(timeout=args.heartbeat)
+                        break
+                    except subprocess.TimeoutExpired:
+                        if not heartbeat(conn, job['id'], worker, args.lease):
+                            lease_lost = True
+                            os.killpg(proc.pid, signal.SIGTERM)
+            finally:
+                # The job runs in its own session: stop it when the worker is interrupted
+                if proc.poll() is None:
+                    stop_process_group(proc)
+
+        if lease_lost:
+            return False, None, 'lease lost'
+
+        run_dirs = sorted(scratch.glob('quick_eval_*'))
+        success = returncode == 0
+        error = None if success else f"quick_eval exited with {returncode}"
+
+        # Failed runs are uploaded once no retries are left, the analysis reports them as failed
+        result = None
+        if run_dirs and (success or remaining_attempts(conn, job['id']) <= 0):
+            result = str(upload_run(run_dirs[-1], args.store, job['campaign']))
+        elif success:
+            success, error = False, 'quick_eval produced no run directory'
+        return success, result, error
+    finally:
+        if not args.keep_scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+def worker_loop(args):
+    """Pull and run jobs until the queue is empty (or forever with --wait)"""
+    conn = connect(args.store)
+    worker = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Worker {worker} using {args.store / QUEUE_DB}")
+
+    completed = 0
+    while args.max_jobs is None or completed < args.max_jobs:
+        job = claim(conn, worker, args.lease)
+        if job is None:
+            leased = conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'leased'").fetchone()[0]
+            if not args.wait and leased == 0:
+                break
+            time.sleep(args.poll)
+            continue
+
+        label = f"{job['campaign']}/{job['difficulty']}_{job['sequence']}#{job['run_index']}"
+        print(f"→ Job {job['id']} {label} (attempt {job['attempts']}/{job['max_attempts']})")
+        try:
+            success, result, error = run_job(conn, job, args, worker)
+        except OSError as e:
+            success, result, error = False, None, str(e)
+
+        finish(conn, job['id'], worker, success, result, error)
+        completed += 1
+        print(f"  {'✓' if success else '✗'} {label}: {result or error}")
+
+    conn.close()
+    return 0
+
+def print_status(conn):
+    """Print job counts per campaign and state, and the failed jobs"""
+    rows = conn.execute('SELECT campaign, state, COUNT(*) AS n FROM jobs GROUP BY campaign, state').fetchall()
+    counts = {}
+    for row in rows:
+        counts.setdefault(row['campaign'], {})[row['state']] = row['n']
+
+    print(f"{'Campaign':<24}" + ''.join(f"{state:>9}" for state in JOB_STATES))
+    for campaign in sorted(counts):
+        print(f"{campaign:<24}" + ''.join(f"{counts[campaign].get(state, 0):>9}" for state in JOB_STATES))
+
+    for job in conn.execute("SELECT * FROM jobs WHERE state IN ('failed', 'leased') ORDER BY id"):
+        detail = job['error'] if job['state'] == 'failed' else \
+            f"{job['worker']}, heartbeat {time.time() - job['heartbeat_at']:.0f}s ago"
+        print(f"  {job['state']:<7} #{job['id']} {job['campaign']}/{job['difficulty']}_{job['sequence']}"
+              f"#{job['run_index']}: {detail}")
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--store', type=Path, required=True, help='shared results store directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add = subparsers.add_parser('enqueue', help='add (sequence, config, run index) jobs')
+    add.add_argument('--campaign', required=True, help='campaign name, e.g. refine_output')
+    add.add_argument('--config', required=True,
+                     help='settings YAML, relative paths resolve against each worker\'s ORB_SLAM2 root')
+    add.add_argument('--runs', type=int, default=1, help='runs per sequence (default %(default)s)')
+    add.add_argument('--sequences', nargs='*', default=None, metavar='DIFFICULTY/SEQUENCE',
+                     help='subset of the manifest sequences (default: all)')
+    add.add_argument('--dataset-root', type=Path, default=DATASET_ROOT)
+    add.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+
+    work = subparsers.add_parser('worker', help='pull and run jobs')
+    work.add_argument('--dataset-root', type=Path, default=DATASET_ROOT,
+                      help='INTR6000P location on this host')
+    work.add_argument('--scratch', type=Path, default=None, help='local directory for running jobs')
+    work.add_argument('--lease', type=float, default=DEFAULT_LEASE)
+    work.add_argument('--heartbeat', type=float, default=DEFAULT_HEARTBEAT)
+    work.add_argument('--poll', type=float, default=DEFAULT_POLL)
+    work.add_argument('--max-jobs', type=int, default=None)
+    work.add_argument('--wait', action='store_true', help='keep polling when the queue is empty')
+    work.add_argument('--keep-scratch', action='store_true')
+
+    subparsers.add_parser('status', help='show queue progress')
+
+    retry = subparsers.add_parser('retry', help='return failed jobs to the queue')
+    retry.add_argument('--campaign', default=None)
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        args.dataset_root = args.dataset_root.resolve()
+        if args.scratch:
+            args.scratch.mkdir(parents=True, exist_ok=True)
+        signal.signal(signal.SIGTERM, terminate_worker)
+        try:
+            return worker_loop(args)
+        except KeyboardInterrupt:
+            print("\n✗ Worker stopped, its leased job returns to the queue when the lease expires")
+            return 1
+
+    conn = connect(args.store)
+    if args.command == 'enqueue':
+        manifest, _ = build_manifest(args.dataset_root)
+        if manifest is None:
+            print(f"✗ No dataset manifest for {args.dataset_root}")
+            return 1
+        # Longest sequences first packs the campaign better across workers
+        sequences = [(s['difficulty'], s['sequence'], s['num_timestamps'])
+                     for s in ordered_sequences(manifest, longest_first=True)
+                     if args.sequences is None or f"{s['difficulty']}/{s['sequence']}" in args.sequences]
+        added = enqueue(conn, args.campaign, args.config, sequences, args.runs, args.max_attempts)
+        print(f"✓ Enqueued {added} jobs ({len(sequences)} sequences x {args.runs} runs)")
+    elif args.command == 'retry':
+        with Transaction(conn):
+            cursor = conn.execute("UPDATE jobs SET state = 'pending', attempts = 0 WHERE state = 'failed' "
+                                  "AND (? IS NULL OR campaign = ?)", (args.campaign, args.campaign))
+        print(f"✓ Requeued {cursor.rowcount} failed jobs")
+    else:
+        print_status(conn)
+    conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())